@@ -0,0 +1,65 @@
+"""!
+Benchmark of the construction of the spatial index of a 2D mesh
+
+Usage: python -m benchmarks.bench_mesh_index [--input FILE] [--nodes NB_NODES]
+Without input file, a synthetic 2D Serafin file is generated in a temporary folder.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from rtree.index import Index
+from shapely.geometry import Polygon
+
+from benchmarks.util import write_synthetic_slf
+from slf import Serafin
+from slf.mesh2D import Mesh2D
+
+
+def construct_index_by_insertion(mesh):
+    """Reference construction: one shapely triangle and one insertion per element"""
+    mesh.index = Index()
+    triangles = {}
+    for i, j, k in mesh.ikle:
+        t = Polygon([mesh.points[i], mesh.points[j], mesh.points[k]])
+        triangles[i, j, k] = t
+        mesh.index.insert(i, t.bounds, obj=(i, j, k))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--input', help='existing 2D Serafin file')
+    parser.add_argument('--nodes', type=int, default=200000, help='number of nodes of the synthetic mesh')
+    args = parser.parse_args()
+
+    folder = None
+    filename = args.input
+    if filename is None:
+        folder = tempfile.mkdtemp()
+        filename = os.path.join(folder, 'synthetic.slf')
+        write_synthetic_slf(filename, args.nodes, 0, nb_frames=1)
+    try:
+        with Serafin.Read(filename, 'fr') as f:
+            f.read_header()
+            header = f.header
+        mesh = Mesh2D(header)
+        print('%d triangles' % mesh.nb_triangles)
+
+        start = time.perf_counter()
+        construct_index_by_insertion(mesh)
+        ref = time.perf_counter() - start
+        start = time.perf_counter()
+        mesh._construct_index()
+        bulk = time.perf_counter() - start
+        print('insertion of shapely triangles: %.3f s' % ref)
+        print('bulk loading of bounding boxes: %.3f s (x%.1f)' % (bulk, ref / bulk))
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""!
+Benchmark of the location of points in a 2D mesh (as in the projection of a mesh on another, or along lines)
+
+Usage: python -m benchmarks.bench_point_location [--input FILE] [--nodes NB_NODES] [--points NB_POINTS]
+Without input file, a synthetic 2D Serafin file is generated in a temporary folder.
+"""
+
+import argparse
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.util import write_synthetic_slf
+from slf import Serafin
+from slf.interpolation import Interpolator, MeshInterpolator
+
+
+def locate_points_one_by_one(mesh, points):
+    """Reference location: one index query and one Interpolator per candidate triangle, for each point"""
+    elements = np.full(len(points), -1, dtype=np.int64)
+    for index, (x, y) in enumerate(points):
+        for element in mesh.index.intersection((x, y, x, y)):
+            if Interpolator(mesh.triangles[tuple(mesh.ikle[element])]).is_in_triangle(x, y)[0]:
+                elements[index] = element
+                break
+    return elements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--input', help='existing 2D Serafin file')
+    parser.add_argument('--nodes', type=int, default=200000, help='number of nodes of the synthetic mesh')
+    parser.add_argument('--points', type=int, default=20000, help='number of random points to locate')
+    args = parser.parse_args()
+
+    folder = None
+    filename = args.input
+    if filename is None:
+        folder = tempfile.mkdtemp()
+        filename = os.path.join(folder, 'synthetic.slf')
+        write_synthetic_slf(filename, args.nodes, 0, nb_frames=1)
+    try:
+        with Serafin.Read(filename, 'fr') as f:
+            f.read_header()
+            header = f.header
+        mesh = MeshInterpolator(header, True)
+        random = np.random.RandomState(0)
+        points = np.stack([random.uniform(mesh.x.min(), mesh.x.max(), args.points),
+                           random.uniform(mesh.y.min(), mesh.y.max(), args.points)], axis=1)
+        print('%d triangles, %d points' % (mesh.nb_triangles, args.points))
+
+        start = time.perf_counter()
+        ref = locate_points_one_by_one(mesh, points)
+        ref_time = time.perf_counter() - start
+        start = time.perf_counter()
+        elements, _ = mesh.locate_points(points)
+        batch_time = time.perf_counter() - start
+        print('point by point: %.3f s' % ref_time)
+        print('batched: %.3f s (x%.1f), %d points located' % (batch_time, ref_time / batch_time,
+                                                              np.count_nonzero(elements >= 0)))
+        print('same inside/outside status: %s' % np.array_equal(ref >= 0, elements >= 0))
+
+        # a resampled line crossing the mesh, located by walking from triangle to triangle
+        line = np.column_stack((np.linspace(mesh.x.min(), mesh.x.max(), args.points),
+                                np.linspace(mesh.y.min(), mesh.y.max(), args.points)))
+        mesh.topology
+        start = time.perf_counter()
+        walked, _ = mesh.walk_to_points(line)
+        walk_time = time.perf_counter() - start
+        start = time.perf_counter()
+        elements, _ = mesh.locate_points(line)
+        batch_time = time.perf_counter() - start
+        print('line of %d points: walking %.3f s, batched %.3f s, same inside/outside status: %s'
+              % (args.points, walk_time, batch_time, np.array_equal(walked >= 0, elements >= 0)))
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""!
+Benchmark of the Serafin header parsers (startup time before any frame is read)
+
+Usage: python -m benchmarks.bench_serafin_header [--input FILE] [--nodes NB_NODES_2D] [--planes NB_PLANES]
+Without input file, a synthetic 3D Serafin file is generated in a temporary folder.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.util import write_synthetic_slf
+from slf import Serafin
+
+
+def time_header(filename, fast, repeat):
+    file_size = os.path.getsize(filename)
+    best = float('Inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with open(filename, 'rb') as f:
+            Serafin.SerafinHeader(f, file_size, 'fr', fast=fast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--input', help='existing Serafin file')
+    parser.add_argument('--nodes', type=int, default=200000, help='number of 2D nodes of the synthetic mesh')
+    parser.add_argument('--planes', type=int, default=5, help='number of planes of the synthetic mesh')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    folder = None
+    filename = args.input
+    if filename is None:
+        folder = tempfile.mkdtemp()
+        filename = os.path.join(folder, 'synthetic.slf')
+        write_synthetic_slf(filename, args.nodes, args.planes, nb_frames=1)
+    try:
+        ref = time_header(filename, False, args.repeat)
+        fast = time_header(filename, True, args.repeat)
+        print('reference parser: %.3f s' % ref)
+        print('fast parser:      %.3f s (x%.1f)' % (fast, ref / fast))
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
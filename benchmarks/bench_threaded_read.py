@@ -0,0 +1,70 @@
+"""!
+Benchmark of the frame reads overlapped with computations by Serafin.Read.map_frames
+
+Usage: python -m benchmarks.bench_threaded_read [--input FILE] [--nodes NB_NODES_2D] [--frames NB_FRAMES]
+                                                [--threads NB_THREADS]
+Without input file, a synthetic 2D Serafin file is generated in a temporary folder.
+The page cache of the file is dropped before each run (when os.posix_fadvise is available) to measure cold reads.
+"""
+
+import argparse
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.util import write_synthetic_slf
+from slf import Serafin
+
+
+def drop_cache(filename):
+    if hasattr(os, 'posix_fadvise'):
+        with open(filename, 'rb') as f:
+            os.fsync(f.fileno())  # dirty pages cannot be dropped
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def time_frames(filename, nb_threads):
+    drop_cache(filename)
+    start = time.perf_counter()
+    with Serafin.Read(filename, 'fr') as input_stream:
+        input_stream.read_header()
+        input_stream.get_time()
+        var_IDs = input_stream.header.var_IDs
+
+        def compute(time_index):  # read all variables then do some NumPy work (which releases the GIL)
+            values = input_stream.read_vars_in_frames([time_index], var_IDs)[0]
+            return np.sqrt(np.abs(values) + 1).sum()
+
+        for _ in input_stream.map_frames(compute, range(input_stream.header.nb_frames), nb_threads):
+            pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--input', help='existing Serafin file')
+    parser.add_argument('--nodes', type=int, default=500000, help='number of nodes of the synthetic mesh')
+    parser.add_argument('--frames', type=int, default=50, help='number of frames of the synthetic file')
+    parser.add_argument('--threads', type=int, default=Serafin.Read.NB_THREADS)
+    args = parser.parse_args()
+
+    folder = None
+    filename = args.input
+    if filename is None:
+        folder = tempfile.mkdtemp()
+        filename = os.path.join(folder, 'synthetic.slf')
+        write_synthetic_slf(filename, args.nodes, 0, nb_frames=args.frames)
+    try:
+        sequential = time_frames(filename, 1)
+        threaded = time_frames(filename, args.threads)
+        print('sequential reads:         %.3f s' % sequential)
+        print('%2d threads (map_frames): %.3f s (x%.1f)' % (args.threads, threaded, sequential / threaded))
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
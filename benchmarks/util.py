@@ -0,0 +1,65 @@
+"""!
+Synthetic Serafin files for benchmarks
+"""
+
+import numpy as np
+
+from slf import Serafin
+
+
+class SyntheticHeader:
+    """!
+    @brief Minimal header (with the attributes used by Serafin.Write) of a structured triangular mesh
+    """
+    def __init__(self, nb_nodes_2d, nb_planes, nb_var):
+        nx = max(2, int(np.sqrt(nb_nodes_2d)))
+        ny = max(2, nb_nodes_2d // nx)
+        nb_nodes_2d = nx * ny
+
+        index = np.arange(nb_nodes_2d).reshape(ny, nx)
+        a, b, c, d = index[:-1, :-1].ravel(), index[:-1, 1:].ravel(), index[1:, 1:].ravel(), index[1:, :-1].ravel()
+        ikle_2d = np.vstack((np.column_stack((a, b, c)), np.column_stack((a, c, d)))) + 1
+
+        self.title = bytes('SYNTHETIC SERAFIN', 'utf-8').ljust(72)
+        self.file_type = bytes('SERAFIN', 'utf-8').ljust(8)
+        self.float_type = 'f'
+        self.float_size = 4
+        self.np_float_type = np.float32
+        self.nb_var = nb_var
+        self.nb_var_quadratic = 0
+        self.params = [0] * 10
+        self.nb_planes = nb_planes
+        self.is_2d = nb_planes == 0
+        if self.is_2d:
+            names = ['VITESSE U', 'VITESSE V', 'HAUTEUR D\'EAU', 'SURFACE LIBRE', 'FOND']
+            self.nb_nodes = nb_nodes_2d
+            self.nb_nodes_per_elem = 3
+            self.ikle = ikle_2d.flatten()
+        else:
+            names = ['COTE Z', 'VITESSE U', 'VITESSE V', 'VITESSE W']
+            self.params[6] = nb_planes
+            self.nb_nodes = nb_nodes_2d * nb_planes
+            self.nb_nodes_per_elem = 6
+            self.ikle = np.vstack([np.hstack((ikle_2d + i * nb_nodes_2d, ikle_2d + (i+1) * nb_nodes_2d))
+                                   for i in range(nb_planes - 1)]).flatten()
+        self.var_names = [bytes(names[i % len(names)] if i < len(names) else 'VAR %d' % i, 'utf-8').ljust(16)
+                          for i in range(nb_var)]
+        self.var_units = [bytes('-', 'utf-8').ljust(16)] * nb_var
+        self.nb_elements = self.ikle.shape[0] // self.nb_nodes_per_elem
+        self.nb_nodes_2d = nb_nodes_2d
+        self.ipobo = np.zeros(self.nb_nodes, dtype=int)
+        self.x = np.tile(np.tile(np.arange(nx, dtype=np.float64), ny), max(1, nb_planes))
+        self.y = np.tile(np.repeat(np.arange(ny, dtype=np.float64), nx), max(1, nb_planes))
+
+
+def write_synthetic_slf(filename, nb_nodes_2d, nb_planes, nb_frames, nb_var=4):
+    """!
+    @brief Write a synthetic Serafin file with random values
+    """
+    header = SyntheticHeader(nb_nodes_2d, nb_planes, nb_var)
+    random = np.random.RandomState(0)
+    with Serafin.Write(filename, 'fr') as f:
+        f.write_header(header)
+        for time in range(nb_frames):
+            f.write_entire_frame(header, time, random.uniform(-1, 1, (nb_var, header.nb_nodes)))
+    return header
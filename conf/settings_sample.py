@@ -1,5 +1,6 @@
 import logging
 from multiprocessing import cpu_count
+import os
 
 
 # ~> GENERAL CONFIGURATION
@@ -11,10 +12,28 @@ LOGGING_LEVEL = logging.INFO
 # CPU Cores for parallel computation (workflow multi-folder view)
 NCSIZE = cpu_count()
 
+# Number of processes sharing the computation of a single output Serafin file (workflow multi-folder view)
+NCSIZE_PER_FILE = 1
+
 # ~> SERAFIN
 
 # Serafin extensions for file name filtering (default extension is the first)
-SERAFIN_EXT = ['.srf', '.slf', '.res', '.geo']
+SERAFIN_EXT = ['.srf', '.slf', '.res', '.geo', '.slfz']
+
+# Store the time series of read files in cache files to reopen them faster
+SERAFIN_CACHE = False
+
+# Folder of the cache files of read Serafin files (one file for each Serafin file)
+SERAFIN_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'PyTelTools', 'serafin')
+
+# Number of threads reading the frames of a Serafin file in advance (1 to read them in the calling thread)
+SERAFIN_NB_THREADS = min(cpu_count(), 4)
+
+# Folder of the cache of mesh indexes, shared by the files with the same mesh (None to disable the cache)
+MESH_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'PyTelTools', 'meshes')
+
+# Maximal size (in MB) of the cache of mesh indexes (the least recently used meshes are removed first)
+MESH_CACHE_SIZE = 1024
 
 # Language (for variables detection)
 LANG = 'fr'
@@ -37,11 +37,13 @@ class VolumeCalculatorThread(OutputThread):
         logging.info('Finished processing the mesh')
 
         result = []
-        for i, time_index in enumerate(self.calculator.time_indices):
+        # the frames are read in advance by a pool of threads
+        frames = self.calculator.input_stream.map_frames(self.calculator.read_values_in_frame,
+                                                         self.calculator.time_indices)
+        for i, (time_index, values) in enumerate(zip(self.calculator.time_indices, frames)):
             if self.canceled:
                 return []
             i_result = [str(self.calculator.input_stream.time[time_index])]
-            values = self.calculator.read_values_in_frame(time_index)
 
             for j in range(len(self.calculator.polygons)):
                 if self.canceled:
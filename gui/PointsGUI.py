@@ -32,22 +32,23 @@ class WriteCSVProcess(OutputThread):
 
         nb_selected_vars = len(selected_vars)
         nb_frames = len(output_time)
+        nodes = [node for (i, j, k), interpolator in point_interpolators for node in (i, j, k)]
+        values = input_stream.read_vars_at_nodes(range(nb_frames), selected_vars, nodes)
 
         for index, time in enumerate(output_time):
             if self.canceled:
                 return
             output_stream.write(str(time))
 
-            var_values = []
-            for var in selected_vars:
-                var_values.append(input_stream.read_var_in_frame(index, var))
+            var_values = values[index]
 
-            for (i, j, k), interpolator in point_interpolators:
+            for index_point, (_, interpolator) in enumerate(point_interpolators):
                 if self.canceled:
                     return
                 for index_var in range(nb_selected_vars):
                     output_stream.write(self.separator)
-                    output_stream.write(self.format_string.format(interpolator.dot(var_values[index_var][[i, j, k]])))
+                    point_values = var_values[index_var, 3*index_point:3*index_point+3]
+                    output_stream.write(self.format_string.format(interpolator.dot(point_values)))
 
             output_stream.write('\n')
             self.tick.emit(int(100 * (index+1) / nb_frames))
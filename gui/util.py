@@ -4,7 +4,6 @@ import numpy as np
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-import shapely
 import struct
 import os
 
@@ -18,17 +17,23 @@ from matplotlib.colors import Normalize, colorConverter
 import matplotlib.lines as mlines
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
-from conf.settings import CSV_SEPARATOR, DIGITS, LANG, LOGGING_LEVEL, MAP_SIZE, MAP_OUT_DPI, NB_COLOR_LEVELS, \
-    SERAFIN_EXT, X_AXIS_LABEL, Y_AXIS_LABEL
+from conf.settings import CSV_SEPARATOR, DIGITS, LANG, LOGGING_LEVEL, MAP_SIZE, MAP_OUT_DPI, MESH_CACHE_DIR, \
+    MESH_CACHE_SIZE, NB_COLOR_LEVELS, SERAFIN_CACHE, SERAFIN_CACHE_DIR, SERAFIN_EXT, SERAFIN_NB_THREADS, \
+    X_AXIS_LABEL, Y_AXIS_LABEL
 from geom import BlueKenue, Shapefile
 from slf.comparison import ReferenceMesh
 from slf.datatypes import SerafinData
 from slf.flux import TriangularVectorField
 from slf.interpolation import MeshInterpolator
+from slf.mesh_cache import MeshCache
 import slf.misc as operations
 from slf import Serafin
 from slf.volume import TruncatedTriangularPrisms, VolumeCalculator
 
+Serafin.Read.USE_CACHE, Serafin.SerafinIndex.DIRECTORY = SERAFIN_CACHE, SERAFIN_CACHE_DIR
+Serafin.Read.NB_THREADS = SERAFIN_NB_THREADS
+MeshCache.DIRECTORY, MeshCache.MAX_SIZE = MESH_CACHE_DIR, MESH_CACHE_SIZE * 1024 * 1024
+
 
 def test_open(filename):
     try:
@@ -1116,25 +1121,12 @@ class ConstructIndexThread(OutputThread):
 
     def run(self):
         logging.info('Processing the mesh')
-        # emit a signal for every five percent of triangles processed
-        five_percent = 0.05 * self.mesh.nb_triangles
-        nb_processed = 0
-        current_percent = 0
-
-        for i, j, k in self.mesh.ikle:
-            if self.canceled:
-                return
-
-            t = shapely.geometry.Polygon([self.mesh.points[i], self.mesh.points[j], self.mesh.points[k]])
-            self.mesh.triangles[i, j, k] = t
-            self.mesh.index.insert(i, t.bounds, obj=(i, j, k))
-
-            nb_processed += 1
-            if nb_processed > five_percent:
-                nb_processed = 0
-                current_percent += 5
-                self.tick.emit(current_percent)
-                QApplication.processEvents()
+        if self.canceled:
+            return
+        # the index is bulk-loaded at once, the triangles are created when needed
+        self.mesh._construct_index()
+        self.tick.emit(100)
+        QApplication.processEvents()
 
 
 class LoadMeshDialog(OutputProgressDialog):
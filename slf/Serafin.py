@@ -2,11 +2,20 @@
 Read/Write Serafin files and manipulate associated data
 """
 
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import copy
+import hashlib
 import logging
 import numpy as np
 import os
 import struct
+import tempfile
+import threading
+import zipfile
+import zlib
+
+from slf.shared_arrays import SharedArray
 
 module_logger = logging.getLogger(__name__)
 
@@ -47,14 +56,35 @@ class SerafinRequestError(Exception):
         module_logger.error('SERAFIN REQUEST ERROR: %s' % message)
 
 
+def _mesh_array(name):
+    """Property of a mesh array of SerafinHeader (decoded on first access in lazy mode)"""
+    return property(lambda header: header._get_mesh_array(name),
+                    lambda header, value: setattr(header, '_' + name, value))
+
+
 class SerafinHeader:
     """!
     @brief A data type for reading and storing the Serafin file header
+
+    The mesh arrays are shared between the copies of a header: they have to be replaced, not modified in place.
+    In lazy mode, they are decoded on first access (see SerafinMesh).
     """
+    MESH_ARRAYS = ('ikle', 'ikle_2d', 'ipobo', 'x', 'y')
 
-    def __init__(self, file, file_size, language):
+    def __init__(self, file, file_size, language, fast=True, mesh=None, partial=False, lazy=False):
+        """!
+        @param file <file>: binary input stream positioned at the beginning of the file
+        @param file_size <int>: size of the file in bytes
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param fast <bool>: decode mesh blocks directly into arrays (otherwise use the reference struct parser)
+        @param mesh <tuple>: already decoded IKLE, IPOBO and coordinates (the mesh blocks are then not read)
+        @param partial <bool>: accept an incomplete last frame (file still being written), which is ignored
+        @param lazy <bool>: skip the mesh blocks, which are decoded on first access (file has to be a named file)
+        """
         self.file_size = file_size
         self.language = language
+        self.mesh_loader = None
+        self._ikle, self._ikle_2d, self._ipobo, self._x, self._y = None, None, None, None, None
 
         # Header and frame sizes are set afterwards by specific methods
         self.header_size = -1
@@ -139,41 +169,31 @@ class SerafinHeader:
         else:
             self.nb_nodes_2d = self.nb_nodes // self.nb_planes
 
-        # IKLE
-        file.read(4)
-        nb_ikle_values = self.nb_elements * self.nb_nodes_per_elem
-        self.ikle = np.array(struct.unpack('>%ii' % nb_ikle_values,
-                                           file.read(4 * nb_ikle_values)))
-        file.read(4)
-
-        # IPOBO
-        file.read(4)
-        nb_ipobo_values = '>%ii' % self.nb_nodes
-        self.ipobo = np.array(struct.unpack(nb_ipobo_values, file.read(4 * self.nb_nodes)))
-        file.read(4)
-
-        # x coordinates
-        file.read(4)
-        nb_coord_values = '>%i%s' % (self.nb_nodes, self.float_type)
-        coord_size = self.nb_nodes * self.float_size
-        self.x = np.array(struct.unpack(nb_coord_values, file.read(coord_size)), dtype=self.np_float_type)
-        file.read(4)
-
-        # y coordinates
-        file.read(4)
-        self.y = np.array(struct.unpack(nb_coord_values, file.read(coord_size)), dtype=self.np_float_type)
-        file.read(4)
-
         # Compute and set header and frame sizes
         self._set_header_size()
         self._set_frame_size()
+        if self.file_size < self.header_size:  # e.g. header still being written
+            raise SerafinValidationError('The file is shorter than its header (%d < %d bytes)'
+                                         % (self.file_size, self.header_size))
+
+        # IKLE, IPOBO and coordinates
+        self.mesh_position = file.tell()  # position of the mesh blocks, after the leading blocks
+        if mesh is not None:
+            self.ikle, self.ipobo, self.x, self.y = mesh
+        elif not lazy:
+            if fast:
+                self._read_mesh(file)
+            else:
+                self._read_mesh_struct(file)
 
         # Deduce the number of frames and test the integer division
-        self.nb_frames = (self.file_size - self.header_size) // self.frame_size
+        self.nb_frames = max(0, (self.file_size - self.header_size) // self.frame_size)
         module_logger.debug('The file has %d frames of size %d bytes' % (self.nb_frames, self.frame_size))
 
         if self.nb_frames * self.frame_size != (self.file_size - self.header_size):
-            raise SerafinValidationError('Something wrong with the file size (header and frames) check')
+            if not partial:
+                raise SerafinValidationError('Something wrong with the file size (header and frames) check')
+            module_logger.debug('The last frame is incomplete and is ignored')
 
         # Deduce variable IDs from names
         var_table = VARIABLES_2D[self.language] if self.is_2d else VARIABLES_3D[language]
@@ -188,20 +208,88 @@ class SerafinHeader:
                 var_id = var_table[name]
             self.var_IDs.append(var_id)
 
-        # Build ikle2d
+        # test the integer division for ikle2d
+        if not self.is_2d and (self.nb_elements // (self.nb_planes - 1)) * (self.nb_planes - 1) != self.nb_elements:
+            raise SerafinValidationError('The number of elements is not divisible by (number of planes - 1)')
+
+        if lazy and mesh is None:
+            self.mesh_loader = SerafinMesh(self, file.name, self.mesh_position, fast)
+        else:
+            self._build_ikle_2d(fast)
+
+        module_logger.debug('Finished reading the header')
+
+    ikle = _mesh_array('ikle')
+    ikle_2d = _mesh_array('ikle_2d')
+    ipobo = _mesh_array('ipobo')
+    x = _mesh_array('x')
+    y = _mesh_array('y')
+
+    def _get_mesh_array(self, name):
+        """Returns a mesh array, decoded on first access in lazy mode"""
+        value = getattr(self, '_' + name)
+        if value is None and self.mesh_loader is not None:
+            value = self.mesh_loader.get(name)
+            setattr(self, '_' + name, value)
+        return value
+
+    def _build_ikle_2d(self, fast):
+        """Build ikle2d"""
         if not self.is_2d:
+            nb_lines = self.nb_elements // (self.nb_planes - 1)
             ikle = self.ikle.reshape(self.nb_elements, self.nb_nodes_per_elem)
-            self.ikle_2d = np.empty([self.nb_elements // (self.nb_planes - 1), 3], dtype=int)
-            nb_lines = self.ikle_2d.shape[0]
-            # test the integer division
-            if nb_lines * (self.nb_planes - 1) != self.nb_elements:
-                raise SerafinValidationError('The number of elements is not divisible by (number of planes - 1)')
-            for i in range(nb_lines):
-                self.ikle_2d[i] = ikle[i, [0, 1, 2]]
+            if fast:
+                # the prisms of the bottom layer come first: keep their bottom triangles
+                self.ikle_2d = ikle[:nb_lines, :3].astype(int)
+            else:
+                self.ikle_2d = np.empty([nb_lines, 3], dtype=int)
+                for i in range(nb_lines):
+                    self.ikle_2d[i] = ikle[i, [0, 1, 2]]
         else:
             self.ikle_2d = self.ikle.reshape(self.nb_elements, self.nb_nodes_per_elem)
 
-        module_logger.debug('Finished reading the header')
+    def _read_mesh(self, file):
+        """Read IKLE, IPOBO and coordinates with a single read and decode them directly into arrays"""
+        nb_ikle_values = self.nb_elements * self.nb_nodes_per_elem
+        coord_size = self.nb_nodes * self.float_size
+        buffer = file.read((4 * nb_ikle_values + 8) + (4 * self.nb_nodes + 8) + 2 * (coord_size + 8))
+        int_type, float_type = np.dtype('>i4'), np.dtype('>' + self.float_type)
+
+        offset = 4
+        self.ikle = np.frombuffer(buffer, int_type, nb_ikle_values, offset).astype(int)
+        offset += 4 * nb_ikle_values + 8
+        self.ipobo = np.frombuffer(buffer, int_type, self.nb_nodes, offset).astype(int)
+        offset += 4 * self.nb_nodes + 8
+        self.x = np.frombuffer(buffer, float_type, self.nb_nodes, offset).astype(self.np_float_type)
+        offset += coord_size + 8
+        self.y = np.frombuffer(buffer, float_type, self.nb_nodes, offset).astype(self.np_float_type)
+
+    def _read_mesh_struct(self, file):
+        """Read IKLE, IPOBO and coordinates value by value (reference implementation)"""
+        # IKLE
+        file.read(4)
+        nb_ikle_values = self.nb_elements * self.nb_nodes_per_elem
+        self.ikle = np.array(struct.unpack('>%ii' % nb_ikle_values,
+                                           file.read(4 * nb_ikle_values)))
+        file.read(4)
+
+        # IPOBO
+        file.read(4)
+        nb_ipobo_values = '>%ii' % self.nb_nodes
+        self.ipobo = np.array(struct.unpack(nb_ipobo_values, file.read(4 * self.nb_nodes)))
+        file.read(4)
+
+        # x coordinates
+        file.read(4)
+        nb_coord_values = '>%i%s' % (self.nb_nodes, self.float_type)
+        coord_size = self.nb_nodes * self.float_size
+        self.x = np.array(struct.unpack(nb_coord_values, file.read(coord_size)), dtype=self.np_float_type)
+        file.read(4)
+
+        # y coordinates
+        file.read(4)
+        self.y = np.array(struct.unpack(nb_coord_values, file.read(coord_size)), dtype=self.np_float_type)
+        file.read(4)
 
     def _set_header_size(self):
         """Set header size"""
@@ -215,6 +303,11 @@ class SerafinHeader:
         """Set frame size (all variable values for one time step)"""
         self.frame_size = 8 + self.float_size + (self.nb_var * (8 + self.nb_nodes * self.float_size))
 
+    def get_var_offset(self, time_index, pos_var):
+        """Returns the position (in bytes) of the first value of a variable record in a frame"""
+        return self.header_size + time_index * self.frame_size + 8 + self.float_size \
+                                + pos_var * (8 + self.float_size * self.nb_nodes) + 4
+
     def _expected_file_size(self):
         """Returns expected file size"""
         return self.header_size + self.nb_frames * self.frame_size
@@ -228,9 +321,35 @@ class SerafinHeader:
                                ['', 's'][self.nb_var > 1], self.nb_nodes, self.nb_elements, self.nb_frames,
                                ['', 's'][self.nb_frames > 1])
 
+    def __copy__(self):
+        # shallow copy in the same process, without the pickling hooks below
+        new_header = object.__new__(type(self))
+        new_header.__dict__.update(self.__dict__)
+        return new_header
+
+    def __getstate__(self):
+        # the mesh arrays are pickled as handles when they are transported through shared files
+        state = self.__dict__.copy()
+        for name in SerafinHeader.MESH_ARRAYS:
+            if state['_' + name] is not None:
+                state['_' + name] = SharedArray.share(state['_' + name])
+        return state
+
+    def __setstate__(self, state):
+        for name in SerafinHeader.MESH_ARRAYS:
+            state['_' + name] = SharedArray.attach(state['_' + name])
+        self.__dict__.update(state)
+
     def copy(self):
-        """Returns a deep copy of the current instance"""
-        return copy.deepcopy(self)
+        """Returns a copy of the current instance sharing the mesh arrays, which become read-only"""
+        new_header = copy.copy(self)
+        for name in SerafinHeader.MESH_ARRAYS:
+            array = getattr(self, '_' + name)
+            if array is not None:  # the arrays which are not decoded yet will be shared through the mesh loader
+                array.setflags(write=False)
+        for name in ('var_IDs', 'var_names', 'var_units'):
+            setattr(new_header, name, list(getattr(self, name)))
+        return new_header
 
     def copy_as_2d(self):
         """Returns a 2D equivalent copy of the current instance"""
@@ -250,8 +369,8 @@ class SerafinHeader:
         new_header.nb_nodes //= nb_planes
         new_header.nb_nodes_per_elem = 3
         new_header.nb_nodes_2d = new_header.nb_nodes
-        npd = new_header.nb_nodes_per_elem
-        new_header.ikle = np.take(self.ikle, [2*npd*i+j for i in range(new_header.nb_elements) for j in range(3)])
+        new_header.ikle = self.ikle_2d.flatten()
+        new_header.ikle_2d = new_header.ikle.reshape(new_header.nb_elements, new_header.nb_nodes_per_elem)
         new_header.ipobo = self.ipobo[:self.nb_nodes_2d]
         new_header.x = self.x[:self.nb_nodes_2d]
         new_header.y = self.y[:self.nb_nodes_2d]
@@ -265,6 +384,18 @@ class SerafinHeader:
     def is_double_precision(self):
         return self.float_type == 'd'
 
+    def is_compatible(self, other):
+        """!
+        @brief Check if the frames of another file have the same layout and lie on the same mesh
+        @param other <SerafinHeader>: header of the other file
+        @return <bool>: True if the headers only differ by the title, the date or the number of frames
+        """
+        return self.float_type == other.float_type and self.var_names == other.var_names \
+            and self.var_units == other.var_units and self.nb_planes == other.nb_planes \
+            and self.nb_nodes == other.nb_nodes and self.nb_elements == other.nb_elements \
+            and self.nb_nodes_per_elem == other.nb_nodes_per_elem \
+            and all(np.array_equal(getattr(self, name), getattr(other, name)) for name in ('ikle', 'ipobo', 'x', 'y'))
+
     def to_single_precision(self):
         self.file_type = bytes('SERAFIN', 'utf-8').ljust(8)
         self.float_type = 'f'
@@ -286,6 +417,317 @@ class SerafinHeader:
         return new_header
 
 
+class SerafinMesh:
+    """!
+    @brief Mesh blocks of a Serafin file decoded on first access (lazy mode of SerafinHeader)
+
+    The loader is shared by the copies of the header, so that the arrays are decoded once and shared (read-only).
+    """
+    def __init__(self, header, filename, position, fast):
+        """!
+        @param header <SerafinHeader>: header whose mesh blocks are not read yet
+        @param filename <str>: path to the Serafin file
+        @param position <int>: position (in bytes) of the mesh blocks in the file
+        @param fast <bool>: decode mesh blocks directly into arrays (otherwise use the reference struct parser)
+        """
+        self.layout = copy.copy(header)  # keeps the sizes and precision of the file, even if the header is modified
+        self.filename = filename
+        self.position = position
+        self.fast = fast
+        self.arrays = None
+
+    def __copy__(self):
+        new_mesh = object.__new__(type(self))
+        new_mesh.__dict__.update(self.__dict__)
+        return new_mesh
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.arrays is not None:
+            state['arrays'] = {name: SharedArray.share(array) for name, array in self.arrays.items()}
+        return state
+
+    def __setstate__(self, state):
+        if state['arrays'] is not None:
+            state['arrays'] = {name: SharedArray.attach(value) for name, value in state['arrays'].items()}
+        self.__dict__.update(state)
+
+    def get(self, name):
+        """!
+        @brief Get a mesh array, decoding all the mesh blocks on first call
+        @param name <str>: name of the array (see SerafinHeader.MESH_ARRAYS)
+        @return <numpy.ndarray>: the read-only array
+        """
+        if self.arrays is None:
+            module_logger.debug('Reading the mesh of "%s"' % self.filename)
+            with open(self.filename, 'rb') as f:
+                f.seek(self.position)
+                if self.fast:
+                    self.layout._read_mesh(f)
+                else:
+                    self.layout._read_mesh_struct(f)
+            self.layout._build_ikle_2d(self.fast)
+            arrays = {}
+            for array_name in SerafinHeader.MESH_ARRAYS:
+                arrays[array_name] = getattr(self.layout, '_' + array_name)
+                arrays[array_name].setflags(write=False)
+            self.arrays = arrays
+        return self.arrays[name]
+
+
+class SerafinIndex:
+    """!
+    @brief Cache file storing the time series of a Serafin file
+
+    The cache files are stored in a user folder (DIRECTORY), and named after the absolute path of the Serafin files.
+    A cache file is invalidated by any change of the file size, of its modification time or of the leading blocks
+    of its header (title, variables, parameters and dimensions).
+    """
+    DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'PyTelTools', 'serafin')
+    EXTENSION = '.idx'
+    VERSION = 3
+
+    def __init__(self, filename, header):
+        """!
+        @param filename <str>: path to the Serafin file
+        @param header <SerafinHeader>: header read in the Serafin file
+        """
+        name = hashlib.sha1(os.path.abspath(filename).encode('utf-8')).hexdigest()
+        self.filename = os.path.join(SerafinIndex.DIRECTORY, name + SerafinIndex.EXTENSION)
+        self.key = SerafinIndex.file_key(filename, header)
+        self.time = None
+
+    @staticmethod
+    def file_key(filename, header):
+        """!
+        @brief Identify the current state of a Serafin file
+        @param filename <str>: path to the Serafin file
+        @param header <SerafinHeader>: header read in the Serafin file
+        @return <numpy 1D-array>: the key (version, file size, modification time, header size and checksum of the
+                                  header blocks preceding the mesh)
+        """
+        stat = os.stat(filename)
+        with open(filename, 'rb') as f:
+            checksum = zlib.crc32(f.read(header.mesh_position))
+        return np.array([SerafinIndex.VERSION, stat.st_size, stat.st_mtime_ns, header.header_size, checksum],
+                        dtype=np.int64)
+
+    def load(self):
+        """!
+        @brief Load the time series of the cache file if it matches the current state of the Serafin file
+        @return <bool>: True if a valid cache was found
+        """
+        try:
+            with np.load(self.filename, allow_pickle=False) as data:
+                if not np.array_equal(data['key'], self.key):
+                    module_logger.debug('The cache file "%s" is outdated' % self.filename)
+                    return False
+                self.time = data['time'].tolist()
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        return True
+
+    def save(self, time):
+        """!
+        @brief Write (or replace) the cache file, ignoring failures (e.g. read-only folders)
+        @param time <[float]>: time series of the Serafin file
+        """
+        self.time = list(time)
+        tmp_filename = None
+        try:
+            os.makedirs(SerafinIndex.DIRECTORY, exist_ok=True)
+            handle, tmp_filename = tempfile.mkstemp(suffix='.tmp', dir=SerafinIndex.DIRECTORY)
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, key=self.key, time=np.array(self.time, dtype=np.float64))
+            os.replace(tmp_filename, self.filename)
+            tmp_filename = None
+        except OSError:
+            module_logger.warning('Cannot write the cache file "%s"' % self.filename)
+        finally:
+            if tmp_filename is not None:
+                try:
+                    os.remove(tmp_filename)
+                except OSError:
+                    pass
+
+
+class TimeMajorStore:
+    """!
+    @brief Time-major companion store of a Serafin file, where the time series of each node are contiguous
+
+    The store is a .npy file of shape (number of variables, number of nodes, number of frames) next to the Serafin file,
+    built on request only (see Read.build_time_major) and used by the node requests whenever it exists.
+    It is stored with the key of the Serafin file (see SerafinIndex.file_key)
+    and ignored as soon as this key does not match the current state of the file.
+    """
+    EXTENSION = '.tms.npy'
+    KEY_EXTENSION = '.tms.key'
+    MAX_MEMORY = 64 * 1024 * 1024  # upper bound (in bytes) of the frames held in memory during the conversion
+
+    def __init__(self, filename):
+        """!
+        @param filename <str>: path to the store file
+        """
+        self.filename = filename
+        self.data = np.load(filename, mmap_mode='r')
+
+    @staticmethod
+    def get_filename(serafin_filename):
+        return serafin_filename + TimeMajorStore.EXTENSION
+
+    @staticmethod
+    def get_key_filename(serafin_filename):
+        return serafin_filename + TimeMajorStore.KEY_EXTENSION
+
+    @staticmethod
+    def convert(input_stream, max_memory=None):
+        """!
+        @brief Write the time-major store of a Serafin file, one block of nodes of one variable after the other
+        @param input_stream <slf.Serafin.Read>: input stream with its header already read
+        @param max_memory <int>: upper bound (in bytes) of the values held in memory (default: MAX_MEMORY)
+        @return <str>: path to the store file
+
+        The time series of a block of nodes are read across all the frames with one positional read per frame,
+        then written at once: as the store is ordered by variable then by node, the file is written sequentially.
+        """
+        header = input_stream.header
+        max_memory = TimeMajorStore.MAX_MEMORY if max_memory is None else max_memory
+        nb_nodes_per_block = max(1, max_memory // (max(1, header.nb_frames) * header.float_size))
+        float_type = np.dtype('>' + header.float_type)
+        filename = TimeMajorStore.get_filename(input_stream.filename)
+        key_filename = TimeMajorStore.get_key_filename(input_stream.filename)
+        key = SerafinIndex.file_key(input_stream.filename, header)
+        module_logger.debug('Writing the time-major store "%s"' % filename)
+
+        tmp_filename = filename + '.tmp'
+        array_header = {'descr': np.lib.format.dtype_to_descr(np.dtype(header.np_float_type)), 'fortran_order': False,
+                        'shape': (header.nb_var, header.nb_nodes, header.nb_frames)}
+        with open(tmp_filename, 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, array_header)
+            for pos_var in range(header.nb_var):
+                for first_node in range(0, header.nb_nodes, nb_nodes_per_block):
+                    end_node = min(first_node + nb_nodes_per_block, header.nb_nodes)
+                    values = np.empty((end_node - first_node, header.nb_frames), dtype=header.np_float_type)
+                    for time_index in range(header.nb_frames):
+                        offset = header.get_var_offset(time_index, pos_var) + first_node * header.float_size
+                        values[:, time_index] = np.frombuffer(input_stream._read_at(
+                            offset, (end_node - first_node) * header.float_size), float_type)
+                    f.write(values.tobytes())
+        with open(key_filename + '.tmp', 'wb') as f:
+            np.save(f, key)
+        os.replace(tmp_filename, filename)
+        os.replace(key_filename + '.tmp', key_filename)  # the store is valid once both files are written
+        return filename
+
+    @staticmethod
+    def open(input_stream):
+        """!
+        @brief Open the time-major store of a Serafin file if it exists and matches the current state of the file
+        @param input_stream <slf.Serafin.Read>: input stream with its header already read
+        @return <TimeMajorStore>: the store (or None)
+        """
+        header = input_stream.header
+        try:
+            with open(TimeMajorStore.get_key_filename(input_stream.filename), 'rb') as f:
+                key = np.load(f, allow_pickle=False)
+            if not np.array_equal(key, SerafinIndex.file_key(input_stream.filename, header)):
+                module_logger.debug('The time-major store of "%s" is outdated' % input_stream.filename)
+                return None
+            store = TimeMajorStore(TimeMajorStore.get_filename(input_stream.filename))
+        except (OSError, ValueError):
+            return None
+        if store.data.shape != (header.nb_var, header.nb_nodes, header.nb_frames) \
+                or store.data.dtype != header.np_float_type:
+            return None
+        return store
+
+    def read_vars_at_nodes(self, time_indices, positions, node_indices):
+        """!
+        @brief Read time series of several variables at some nodes
+        @param time_indices <[int]>: 0-based indices of the target frames
+        @param positions <[int]>: 0-based positions of the variables
+        @param node_indices <[int]>: 0-based indices of the target nodes
+        @return <numpy 3D-array>: values of shape (number of frames, number of variables, number of nodes)
+        """
+        values = self.data[np.ix_(positions, node_indices, list(time_indices))]
+        return np.ascontiguousarray(values.transpose(2, 0, 1))
+
+
+class SerafinScanner:
+    """!
+    @brief Integrity check of the frames of a Serafin file (e.g. truncated by a crash of the simulation)
+
+    Only the Fortran record markers are read, with one strided view over the mapped file per marker of the frame.
+    The valid frames are the complete frames before the first frame with a wrong marker.
+    """
+    def __init__(self, filename, language, header=None):
+        """!
+        @param filename <str>: path to the Serafin file
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param header <SerafinHeader>: header already read (by default, it is read with an incomplete last frame)
+        """
+        self.filename = filename
+        self.language = language
+        self.header = header
+        self.file_size = None
+        self.nb_complete_frames = 0  # number of frames entirely present in the file
+        self.nb_frames = 0  # number of valid frames
+
+    def _markers(self):
+        """Positions (from the beginning of a frame) and accepted values of the record markers"""
+        float_size, var_size = self.header.float_size, self.header.nb_nodes * self.header.float_size
+        # the time record marker can also be 4 in double precision files (written like the single precision ones)
+        markers = [(0, (4, float_size)), (4 + float_size, (4, float_size))]
+        for pos_var in range(self.header.nb_var):
+            start = 8 + float_size + pos_var * (8 + var_size)
+            markers.append((start, (var_size,)))
+            markers.append((start + 4 + var_size, (var_size,)))
+        return markers
+
+    def scan(self):
+        """!
+        @brief Check the record markers of all the complete frames
+        @return <bool>: True if the file is complete and all its frames are valid
+        """
+        self.file_size = os.path.getsize(self.filename)
+        if self.header is None:
+            with open(self.filename, 'rb') as f:
+                self.header = SerafinHeader(f, self.file_size, self.language, partial=True)
+        header = self.header
+        self.nb_complete_frames = max(0, (self.file_size - header.header_size) // header.frame_size)
+        self.nb_frames = self.nb_complete_frames
+        if self.nb_frames > 0:
+            buffer = np.memmap(self.filename, dtype=np.uint8, mode='r')
+            for position, values in self._markers():
+                markers = np.ndarray(shape=(self.nb_frames,), dtype='>i4', buffer=buffer,
+                                     offset=header.header_size + position, strides=(header.frame_size,))
+                wrong = np.flatnonzero(np.logical_not(np.isin(markers, values)))
+                if wrong.size > 0:
+                    self.nb_frames = int(wrong[0])
+                    if self.nb_frames == 0:
+                        break
+            del buffer
+
+        is_valid = self.file_size == header.header_size + self.nb_frames * header.frame_size
+        if not is_valid:
+            module_logger.warning('The file "%s" has %d valid frames (%d complete frames, %d bytes after them)'
+                                  % (self.filename, self.nb_frames, self.nb_complete_frames,
+                                     self.file_size - header.header_size - self.nb_complete_frames * header.frame_size))
+        return is_valid
+
+    def truncate(self):
+        """!
+        @brief Remove (in place) everything after the last valid frame (the file has to be scanned before)
+        """
+        if self.file_size is None:
+            raise SerafinRequestError('Cannot truncate the file before scanning it (forgot scan ?)')
+        valid_size = self.header.header_size + self.nb_frames * self.header.frame_size
+        module_logger.info('Truncating the file "%s" from %d to %d bytes' % (self.filename, self.file_size, valid_size))
+        os.truncate(self.filename, valid_size)
+        self.file_size = valid_size
+        self.nb_complete_frames = self.nb_frames
+
+
 class Serafin:
     """!
     @brief A Serafin object corresponds to a single Serafin in file IO stream
@@ -312,30 +754,174 @@ class Read(Serafin):
     """!
     @brief Serafin file input stream
     """
-    def __init__(self, filename, language):
+    MAX_READ_SIZE = 64 * 1024 * 1024  # upper bound (in bytes) of a merged read in read_vars_in_frames
+    MAX_READ_GAP = 4096  # largest gap (in bytes) between two requested nodes read through instead of skipped
+    USE_CACHE = False  # default for the cache of the time series (see SerafinIndex)
+    RAW_RECORDS = True  # the frame records are stored as in Serafin files (see Write.copy_frames)
+    NB_THREADS = min(os.cpu_count() or 1, 4)  # default number of threads of map_frames, set by SERAFIN_NB_THREADS
+
+    def __new__(cls, filename, *args, **kwargs):
+        if cls is Read:
+            from slf import archive  # the archive reader is a subclass of Read
+            if archive.is_archive(filename):
+                cls = archive.Read
+        return super().__new__(cls)
+
+    def __init__(self, filename, language, memory_map=False, cache=None, follow=False, recover=False, lazy=False):
+        """!
+        @param filename <str>: path to the Serafin file
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param memory_map <bool>: access the frames through a read-only memory map instead of seek/read calls
+        @param cache <bool>: use a cache file for the time series (default: Read.USE_CACHE)
+        @param follow <bool>: follow a file still being written (see update_frames), implies no cache
+        @param recover <bool>: only read the valid frames of a damaged file (see SerafinScanner), implies no cache
+        @param lazy <bool>: decode the mesh on first access only
+        """
         super().__init__(filename, 'rb', language)
         self.header = None
         self.time = []
+        self.memory_map = memory_map
+        self.buffer = None  # memory map of the whole file (built on first access)
+        self.follow = follow
+        self.recover = recover
+        self.lazy = lazy
+        self.cache = (Read.USE_CACHE if cache is None else cache) and not follow and not recover
+        self.index = None  # cache file (built by read_header)
+        self.time_major = None  # time-major companion store (see TimeMajorStore)
+        self.time_major_checked = False  # the store is looked up on the first node request
+        self.lock = threading.Lock()  # protects the file cursor when positional reads are not available
         self.file_size = os.path.getsize(self.filename)
         module_logger.info('Reading the input file: "%s" of size %d bytes' % (filename, self.file_size))
 
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.buffer = None  # views already returned keep the mapping alive on their own
+        return super().__exit__(exc_type, exc_val, exc_tb)
+
     def read_header(self):
         """!
         @brief Read the file header and check the file consistency
         """
-        self.header = SerafinHeader(self.file, self.file_size, self.language)
+        self.header = SerafinHeader(self.file, self.file_size, self.language, partial=self.follow or self.recover,
+                                    lazy=self.lazy)
+        if self.cache:
+            self.index = SerafinIndex(self.filename, self.header)
+            self.index.load()
+        if self.recover:
+            scanner = SerafinScanner(self.filename, self.language, self.header)
+            if not scanner.scan():
+                self.header.nb_frames = scanner.nb_frames
+                self.header.file_size = self.header._expected_file_size()
 
     def get_time(self):
         """!
         @brief Read the time in the Serafin file
         """
+        if self.index is not None and self.index.time is not None:
+            module_logger.debug('Reading the time series from the cache file')
+            self.time = self.index.time[:]
+            return
         module_logger.debug('Reading the time series from the file')
-        self.file.seek(self.header.header_size, 0)
-        for i in range(self.header.nb_frames):
-            self.file.read(4)
-            self.time.append(struct.unpack('>%s' % self.header.float_type, self.file.read(self.header.float_size))[0])
-            self.file.read(4)
-            self.file.seek(self.header.frame_size - 8 - self.header.float_size, 1)
+        self._read_time()
+        if self.index is not None:  # the cache file is written once the header and the time series are known
+            self.index.save(self.time)
+
+    def _read_time(self, start_index=0):
+        """Read the time of the frames from start_index (the previous ones are kept)"""
+        del self.time[start_index:]
+        nb_frames = self.header.nb_frames - start_index
+        if nb_frames <= 0:
+            return
+        # the time values are gathered by a single strided view over the mapped file
+        buffer = self._get_buffer() if self.memory_map else np.memmap(self.filename, dtype=np.uint8, mode='r')
+        time = np.ndarray(shape=(nb_frames,), dtype='>' + self.header.float_type, buffer=buffer,
+                          offset=self.header.header_size + start_index * self.header.frame_size + 4,
+                          strides=(self.header.frame_size,))
+        self.time.extend(time.astype(self.header.np_float_type).tolist())
+
+    def update_frames(self):
+        """!
+        @brief Take into account the complete frames written since the last call (follow mode only)
+        @return <range>: 0-based indices of the new frames (their time is appended if the time was read)
+        """
+        if not self.follow:
+            raise SerafinRequestError('Cannot update the frames outside the follow mode')
+        if self.header is None:
+            raise SerafinRequestError('Cannot update the frames before reading the header (forgot read_header ?)')
+        old_nb_frames = self.header.nb_frames
+        self.file_size = os.path.getsize(self.filename)
+        nb_frames = max(0, (self.file_size - self.header.header_size) // self.header.frame_size)
+        if nb_frames <= old_nb_frames:
+            return range(old_nb_frames, old_nb_frames)
+
+        module_logger.debug('%d new frames found' % (nb_frames - old_nb_frames))
+        self.header.file_size = self.file_size
+        self.header.nb_frames = nb_frames
+        self.buffer = None  # the memory map has to cover the new frames
+        self.time_major = None  # the store does not hold the new frames
+        self.time_major_checked = False
+        if len(self.time) == old_nb_frames:
+            self._read_time(old_nb_frames)
+        return range(old_nb_frames, nb_frames)
+
+    def build_time_major(self, max_memory=None):
+        """!
+        @brief Write the time-major store of the file (see TimeMajorStore) and use it for the node requests
+        @param max_memory <int>: upper bound (in bytes) of the frames held in memory (see TimeMajorStore.convert)
+        """
+        if self.header is None:
+            raise SerafinRequestError('Cannot build the time-major store before reading the header '
+                                      '(forgot read_header ?)')
+        TimeMajorStore.convert(self, max_memory)
+        self.open_time_major()
+
+    def open_time_major(self):
+        """!
+        @brief Use the time-major store of the file for the node requests, if it is up to date
+        @return <bool>: True if the store is used
+
+        It is called by the first node request (see read_vars_at_nodes).
+        """
+        if self.header is None:
+            raise SerafinRequestError('Cannot open the time-major store before reading the header '
+                                      '(forgot read_header ?)')
+        self.time_major = TimeMajorStore.open(self)
+        self.time_major_checked = True
+        return self.time_major is not None
+
+    def _read_at(self, position, size):
+        """!
+        @brief Read bytes at a given position without using the shared file cursor (thread-safe)
+        @param position <int>: position (in bytes) from the beginning of the file
+        @param size <int>: number of bytes to read
+        @return <bytes>: the bytes read
+        """
+        if hasattr(os, 'pread'):
+            return os.pread(self.file.fileno(), size, position)
+        with self.lock:
+            self.file.seek(position, 0)
+            return self.file.read(size)
+
+    def map_frames(self, function, time_indices, nb_threads=None):
+        """!
+        @brief Apply a function (typically reading values in this stream) to several frames with a pool of threads
+        @param function <function>: function taking a time index
+        @param time_indices <[int]>: 0-based indices of the frames
+        @param nb_threads <int>: number of threads (default: Read.NB_THREADS)
+        @return <generator>: the results in the order of the time indices (a few frames are computed in advance)
+        """
+        nb_threads = Read.NB_THREADS if nb_threads is None else nb_threads
+        if nb_threads <= 1:
+            for time_index in time_indices:
+                yield function(time_index)
+            return
+        with ThreadPoolExecutor(nb_threads) as executor:
+            pending = collections.deque()
+            for time_index in time_indices:
+                pending.append(executor.submit(function, time_index))
+                if len(pending) > 2 * nb_threads:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
 
     def _get_var_index(self, var_ID):
         """!
@@ -351,6 +937,43 @@ class Read(Serafin):
             raise SerafinRequestError('Variable ID %s not found' % var_ID)
         return index
 
+    def _get_buffer(self):
+        """!
+        @brief Map the file in memory (on first call only)
+        @return <numpy.memmap>: read-only bytes of the whole file
+        """
+        with self.lock:
+            if self.buffer is None:
+                self.buffer = np.memmap(self.filename, dtype=np.uint8, mode='r')
+            return self.buffer
+
+    def read_frame_as_view(self, time_index):
+        """!
+        @brief Read all variables of a frame without copying them (memory-mapped mode only)
+        @param time_index <int>: 0-based index of simulation time from the target frame
+        @return <numpy 2D-array>: big-endian read-only view of shape (number of variables, number of nodes)
+        """
+        if not self.memory_map:
+            raise SerafinRequestError('Views on frames are only available in memory-mapped mode')
+        if self.header is None:
+            raise SerafinRequestError('Cannot extract frame from empty header (forgot read_header ?)')
+        if time_index < 0 or time_index >= self.header.nb_frames:
+            raise SerafinRequestError('Frame %i is not inside [0, %i]' % (time_index, self.header.nb_frames - 1))
+        return np.ndarray(shape=(self.header.nb_var, self.header.nb_nodes),
+                          dtype=np.dtype('>' + self.header.float_type), buffer=self._get_buffer(),
+                          offset=self.header.get_var_offset(time_index, 0),
+                          strides=(8 + self.header.float_size * self.header.nb_nodes, self.header.float_size))
+
+    def read_var_in_frame_as_view(self, time_index, var_ID):
+        """!
+        @brief Read a single variable in a frame without copying it (memory-mapped mode only)
+        @param time_index <int>: 0-based index of simulation time from the target frame
+        @param var_ID <str>: variable ID
+        @return <numpy 1D-array>: big-endian read-only view, of length equal to the number of nodes
+        """
+        pos_var = self._get_var_index(var_ID)
+        return self.read_frame_as_view(time_index)[pos_var]
+
     def read_var_in_frame(self, time_index, var_ID):
         """!
         @brief Read a single variable in a frame
@@ -359,13 +982,102 @@ class Read(Serafin):
         @return <numpy 1D-array>: values of the variables, of length equal to the number of nodes
         """
         module_logger.debug('Reading variable %s at frame %i' % (var_ID, time_index))
-        nb_values = '>%i%s' % (self.header.nb_nodes, self.header.float_type)
+        if self.memory_map:
+            return self.read_var_in_frame_as_view(time_index, var_ID).astype(self.header.np_float_type)
         pos_var = self._get_var_index(var_ID)
-        self.file.seek(self.header.header_size + time_index * self.header.frame_size
-                       + 8 + self.header.float_size + pos_var * (8 + self.header.float_size * self.header.nb_nodes), 0)
-        self.file.read(4)
-        return np.array(struct.unpack(nb_values, self.file.read(self.header.float_size * self.header.nb_nodes)),
-                        dtype=self.header.np_float_type)
+        return np.frombuffer(self._read_at(self.header.get_var_offset(time_index, pos_var),
+                                           self.header.float_size * self.header.nb_nodes),
+                             dtype=np.dtype('>' + self.header.float_type)).astype(self.header.np_float_type)
+
+    def read_vars_in_frames(self, time_indices, var_IDs):
+        """!
+        @brief Read several variables in several frames with as few (and as large) read calls as possible
+        @param time_indices <[int]>: 0-based indices of the target frames
+        @param var_IDs <[str]>: variable IDs
+        @return <numpy 3D-array>: values of shape (number of frames, number of variables, number of nodes)
+        """
+        positions = [self._get_var_index(var_ID) for var_ID in var_IDs]
+        for time_index in time_indices:
+            if time_index < 0 or time_index >= self.header.nb_frames:
+                raise SerafinRequestError('Frame %i is not inside [0, %i]' % (time_index, self.header.nb_frames - 1))
+        nb_nodes = self.header.nb_nodes
+        values = np.empty((len(time_indices), len(positions), nb_nodes), dtype=self.header.np_float_type)
+
+        if self.memory_map:
+            for i, time_index in enumerate(time_indices):
+                values[i] = self.read_frame_as_view(time_index)[positions]
+            return values
+
+        # sort the requests by file offset and merge neighbouring ones into large sequential reads
+        float_type = np.dtype('>' + self.header.float_type)
+        var_size = self.header.float_size * nb_nodes
+        max_gap = 16 + self.header.float_size  # record markers and time record between two neighbouring variables
+        requests = sorted((self.header.get_var_offset(time_index, pos_var), i, j)
+                          for i, time_index in enumerate(time_indices) for j, pos_var in enumerate(positions))
+        blocks = []
+        for request in requests:
+            offset = request[0]
+            if blocks and offset - blocks[-1][1] <= max_gap \
+                    and offset + var_size - blocks[-1][0] <= Read.MAX_READ_SIZE:
+                blocks[-1][1] = max(blocks[-1][1], offset + var_size)
+                blocks[-1][2].append(request)
+            else:
+                blocks.append([offset, offset + var_size, [request]])
+
+        for block_start, block_end, block_requests in blocks:
+            buffer = self._read_at(block_start, block_end - block_start)
+            for offset, i, j in block_requests:
+                values[i, j] = np.frombuffer(buffer, float_type, nb_nodes, offset - block_start)
+        return values
+
+    def read_vars_at_nodes(self, time_indices, var_IDs, node_indices):
+        """!
+        @brief Read time series of several variables at a few nodes without reading the whole frames
+        @param time_indices <[int]>: 0-based indices of the target frames
+        @param var_IDs <[str]>: variable IDs
+        @param node_indices <[int]>: 0-based indices of the target nodes (duplicates are allowed)
+        @return <numpy 3D-array>: values of shape (number of frames, number of variables, number of nodes)
+        """
+        positions = [self._get_var_index(var_ID) for var_ID in var_IDs]
+        for time_index in time_indices:
+            if time_index < 0 or time_index >= self.header.nb_frames:
+                raise SerafinRequestError('Frame %i is not inside [0, %i]' % (time_index, self.header.nb_frames - 1))
+        node_indices = np.asarray(node_indices, dtype=int)
+        if node_indices.size > 0 and (node_indices.min() < 0 or node_indices.max() >= self.header.nb_nodes):
+            raise SerafinRequestError('Node indices are not inside [0, %i]' % (self.header.nb_nodes - 1))
+        values = np.empty((len(time_indices), len(positions), node_indices.size), dtype=self.header.np_float_type)
+        if node_indices.size == 0 or values.shape[0] == 0:
+            return values
+
+        if not self.time_major_checked:
+            self.open_time_major()
+        if self.time_major is not None:
+            return self.time_major.read_vars_at_nodes(time_indices, positions, node_indices)
+
+        if self.memory_map:
+            for i, time_index in enumerate(time_indices):
+                values[i] = self.read_frame_as_view(time_index)[np.ix_(positions, node_indices)]
+            return values
+
+        # group the sorted nodes into runs of close nodes, each run being read with a single call
+        float_size = self.header.float_size
+        float_type = np.dtype('>' + self.header.float_type)
+        unique_nodes, inverse = np.unique(node_indices, return_inverse=True)
+        cuts = np.flatnonzero(np.diff(unique_nodes) * float_size > Read.MAX_READ_GAP) + 1
+        runs = [(run[0], run[-1] + 1, run - run[0]) for run in np.split(unique_nodes, cuts)]
+
+        unique_values = np.empty(unique_nodes.size, dtype=self.header.np_float_type)
+        for i, time_index in enumerate(time_indices):
+            for j, pos_var in enumerate(positions):
+                var_offset = self.header.get_var_offset(time_index, pos_var)
+                start = 0
+                for first_node, end_node, run_nodes in runs:
+                    run_values = np.frombuffer(self._read_at(var_offset + first_node * float_size,
+                                                             (end_node - first_node) * float_size), float_type)
+                    unique_values[start:start + run_nodes.size] = run_values[run_nodes]
+                    start += run_nodes.size
+                values[i, j] = unique_values[inverse]
+        return values
 
     def read_var_in_frame_as_3d(self, time_index, var_ID):
         """!
@@ -385,21 +1097,61 @@ class Read(Serafin):
         @param time_index <float>: 0-based index of simulation time from the target frame
         @param var_ID <str>: variable ID
         @param iplan <int>: 1-based index of layer
-        @return <numpy 1D-array>: values of the variables, of length equal to the number of nodes
+        @return <numpy 1D-array>: values of the variables, of length equal to the number of 2D nodes
         """
+        self._check_layer(iplan)
+        nb_nodes_2d = self.header.nb_nodes_2d
+        start = (iplan - 1) * nb_nodes_2d  # the planes are stored one after the other
+        if self.memory_map:
+            return self.read_var_in_frame_as_view(time_index, var_ID)[start:start + nb_nodes_2d]\
+                       .astype(self.header.np_float_type)
+        pos_var = self._get_var_index(var_ID)
+        return np.frombuffer(self._read_at(self.header.get_var_offset(time_index, pos_var)
+                                           + start * self.header.float_size, self.header.float_size * nb_nodes_2d),
+                             dtype=np.dtype('>' + self.header.float_type)).astype(self.header.np_float_type)
+
+    def read_vars_in_frames_at_layer(self, time_indices, var_IDs, iplan):
+        """!
+        @brief Read several variables in several frames at specific layer
+        @param time_indices <[int]>: 0-based indices of the target frames
+        @param var_IDs <[str]>: variable IDs
+        @param iplan <int>: 1-based index of layer
+        @return <numpy 3D-array>: values of shape (number of frames, number of variables, number of 2D nodes)
+        """
+        self._check_layer(iplan)
+        values = np.empty((len(time_indices), len(var_IDs), self.header.nb_nodes_2d),
+                          dtype=self.header.np_float_type)
+        for i, time_index in enumerate(time_indices):
+            for j, var_ID in enumerate(var_IDs):
+                values[i, j] = self.read_var_in_frame_at_layer(time_index, var_ID, iplan)
+        return values
+
+    def _check_layer(self, iplan):
         if self.header.is_2d:
             raise SerafinRequestError('Extracting values at a specific layer is only possible in 3D!')
         if iplan < 1 or iplan > self.header.nb_planes:
             raise SerafinRequestError('Layer %i is not inside [1, %i]' % (iplan, self.header.nb_planes))
-        return self.read_var_in_frame_as_3d(time_index, var_ID)[iplan + 1]
 
 
 class Write(Serafin):
     """!
     @brief Serafin file output stream
     """
-    def __init__(self, filename, language):
-        super().__init__(filename, 'wb', language)
+    COPY_BUFFER_SIZE = 16 * 1024 * 1024  # size (in bytes) of the buffer for copying records between files
+
+    def __init__(self, filename, language, fast=True, preallocated=False, header_size=None):
+        """!
+        @param filename <str>: path to the output Serafin file
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param fast <bool>: serialize whole blocks with numpy (otherwise use the reference struct writer)
+        @param preallocated <bool>: open a file already preallocated (see preallocate) to write frames at their offsets
+        @param header_size <int>: size of the header of the preallocated file (by default computed from the header)
+        """
+        super().__init__(filename, 'r+b' if preallocated else 'wb', language)
+        self.fast = fast
+        self.frame_buffer = None  # pre-laid-out frame record (built on first frame)
+        self.frame_layout = None
+        self.header_size = header_size  # size of the written header (computed on demand for preallocated files)
         module_logger.info('Writing the output file: "%s"' % filename)
 
     def __enter__(self):
@@ -414,6 +1166,159 @@ class Write(Serafin):
         """!
         @brief Write Serafin header from attributes
         """
+        if self.fast:
+            self._write_header(header)
+        else:
+            self._write_header_struct(header)
+        self.header_size = self.file.tell()
+
+    def write_entire_frame(self, header, time_to_write, values):
+        """!
+        @brief write all variables/nodes values
+        @param time_to_write <float>: time in second
+        @param values <numpy 2D-array>: values to write, of dimension (nb_var, nb_nodes)
+        """
+        if self.fast:
+            self._write_entire_frame(header, time_to_write, values)
+        else:
+            self._write_entire_frame_struct(header, time_to_write, values)
+
+    def copy_frames(self, input_stream, time_indices, var_IDs):
+        """!
+        @brief Copy the raw records of some variables in some frames from a Serafin input stream
+        @param input_stream <slf.Serafin.Read>: input stream whose float type matches the written header
+        @param time_indices <[int]>: 0-based indices of the frames to copy
+        @param var_IDs <[str]>: IDs of the variables to copy (in the order of the written header)
+        """
+        if not input_stream.RAW_RECORDS:
+            raise SerafinRequestError('Cannot copy the records of a file which is not a Serafin file')
+        header = input_stream.header
+        positions = [input_stream._get_var_index(var_ID) for var_ID in var_IDs]
+        var_size = header.float_size * header.nb_nodes
+
+        # list the byte ranges (time record and variable records with their markers) and merge the contiguous ones
+        segments = []
+        for time_index in time_indices:
+            if time_index < 0 or time_index >= header.nb_frames:
+                raise SerafinRequestError('Frame %i is not inside [0, %i]' % (time_index, header.nb_frames - 1))
+            frame_start = header.header_size + time_index * header.frame_size
+            ranges = [(frame_start, frame_start + 8 + header.float_size)]
+            ranges.extend((header.get_var_offset(time_index, pos_var) - 4,
+                           header.get_var_offset(time_index, pos_var) + var_size + 4) for pos_var in positions)
+            for start, end in ranges:
+                if segments and segments[-1][1] == start:
+                    segments[-1][1] = end
+                else:
+                    segments.append([start, end])
+
+        self.file.flush()
+        for start, end in segments:
+            self._copy_range(input_stream.file, start, end - start)
+
+    def _copy_range(self, input_file, start, size):
+        """Append a byte range of the input file, in the kernel when possible, otherwise with large buffered copies"""
+        if hasattr(os, 'copy_file_range'):
+            position = self.file.tell()
+            try:
+                while size > 0:
+                    copied = os.copy_file_range(input_file.fileno(), self.file.fileno(), size, start, position)
+                    if copied == 0:
+                        break
+                    start, position, size = start + copied, position + copied, size - copied
+            except OSError:  # e.g. not supported between these file systems
+                pass
+            self.file.seek(position, 0)
+        input_file.seek(start, 0)
+        while size > 0:
+            chunk = input_file.read(min(size, Write.COPY_BUFFER_SIZE))
+            if not chunk:
+                raise SerafinRequestError('Unexpected end of the input file')
+            self.file.write(chunk)
+            size -= len(chunk)
+
+    def _write_header(self, header):
+        """Write the header with the mesh blocks serialized by numpy and a single write call"""
+        self.file.write(Write.header_to_bytes(header))
+
+    @staticmethod
+    def header_to_bytes(header):
+        """Serialize the header (with its Fortran markers) as it is written at the beginning of Serafin files"""
+        chunks = [struct.pack('>i', 80), header.title, header.file_type, struct.pack('>i', 80),
+                  struct.pack('>4i', 8, header.nb_var, header.nb_var_quadratic, 8)]
+        for j in range(header.nb_var):
+            chunks.extend([struct.pack('>i', 2 * 16), header.var_names[j].ljust(16), header.var_units[j].ljust(16),
+                           struct.pack('>i', 2 * 16)])
+        chunks.append(struct.pack('>12i', 10 * 4, *header.params, 10 * 4))
+        if header.params[-1] == 1:
+            chunks.append(struct.pack('>8i', 6 * 4, *header.date, 6 * 4))
+        chunks.append(struct.pack('>6i', 4 * 4, header.nb_elements, header.nb_nodes, header.nb_nodes_per_elem,
+                                  1, 4 * 4))
+
+        nb_ikle_values = header.nb_elements * header.nb_nodes_per_elem
+        int_type, float_type = np.dtype('>i4'), np.dtype('>' + header.float_type)
+        for block, dtype, marker in [(header.ikle, int_type, 4 * nb_ikle_values),
+                                     (header.ipobo, int_type, 4 * header.nb_nodes),
+                                     (header.x, float_type, 4 * header.nb_nodes),
+                                     (header.y, float_type, 4 * header.nb_nodes)]:
+            chunks.extend([struct.pack('>i', marker), np.asarray(block).astype(dtype).tobytes(),
+                           struct.pack('>i', marker)])
+        return b''.join(chunks)
+
+    def preallocate(self, header, nb_frames):
+        """!
+        @brief Extend the file (after its header) to hold a given number of frames, written afterwards in any order
+        @param nb_frames <int>: number of frames of the output file
+        """
+        self.file.flush()
+        self.file.truncate(self.header_size + nb_frames * (8 + header.float_size
+                                                           + header.nb_var * (8 + header.nb_nodes * header.float_size)))
+
+    def write_entire_frame_at(self, header, frame_index, time_to_write, values):
+        """!
+        @brief Write all variables/nodes values of a frame at its offset (in a preallocated file)
+        @param frame_index <int>: 0-based index of the frame in the output file
+        @param time_to_write <float>: time in second
+        @param values <numpy 2D-array>: values to write, of dimension (nb_var, nb_nodes)
+        """
+        if self.header_size is None:
+            self.header_size = len(Write.header_to_bytes(header))
+        record = self._frame_record(header, time_to_write, values)
+        offset = self.header_size + frame_index * len(record)
+        if hasattr(os, 'pwrite'):
+            self.file.flush()
+            os.pwrite(self.file.fileno(), record, offset)
+        else:
+            self.file.seek(offset, 0)
+            self.file.write(record)
+
+    def _write_entire_frame(self, header, time_to_write, values):
+        """Cast the values into a pre-laid-out frame record (with its Fortran markers) and write it at once"""
+        self.file.write(self._frame_record(header, time_to_write, values))
+
+    def _frame_record(self, header, time_to_write, values):
+        """Returns the frame record (reused buffer) with the time and the values cast at their positions"""
+        layout = (header.nb_var, header.nb_nodes, header.float_type)
+        float_type = np.dtype('>' + header.float_type)
+        var_size = header.float_size * header.nb_nodes
+        if layout != self.frame_layout:
+            self.frame_layout = layout
+            self.frame_buffer = bytearray(8 + header.float_size + header.nb_var * (8 + var_size))
+            struct.pack_into('>i', self.frame_buffer, 0, 4)
+            struct.pack_into('>i', self.frame_buffer, 4 + header.float_size, 4)
+            for i in range(header.nb_var):
+                position = 8 + header.float_size + i * (8 + var_size)
+                struct.pack_into('>i', self.frame_buffer, position, var_size)
+                struct.pack_into('>i', self.frame_buffer, position + 4 + var_size, var_size)
+
+        struct.pack_into('>%s' % header.float_type, self.frame_buffer, 4, time_to_write)
+        frame_values = np.ndarray(shape=(header.nb_var, header.nb_nodes), dtype=float_type,
+                                  buffer=self.frame_buffer, offset=8 + header.float_size + 4,
+                                  strides=(8 + var_size, header.float_size))
+        frame_values[:] = values
+        return self.frame_buffer
+
+    def _write_header_struct(self, header):
+        """Write the header value by value (reference implementation)"""
         # Title and file type
         self.file.write(struct.pack('>i', 80))
         self.file.write(header.title)
@@ -475,12 +1380,8 @@ class Write(Serafin):
         self.file.write(struct.pack(nb_val, *header.y))
         self.file.write(struct.pack('>i', 4 * header.nb_nodes))
 
-    def write_entire_frame(self, header, time_to_write, values):
-        """!
-        @brief write all variables/nodes values
-        @param time_to_write <float>: time in second
-        @param values <numpy 2D-array>: values to write, of dimension (nb_var, nb_nodes)
-        """
+    def _write_entire_frame_struct(self, header, time_to_write, values):
+        """Write the frame value by value (reference implementation)"""
         nb_values = '>%i%s' % (header.nb_nodes, header.float_type)
         self.file.write(struct.pack('>i', 4))
         self.file.write(struct.pack('>%s' % header.float_type, time_to_write))
@@ -490,4 +1391,3 @@ class Write(Serafin):
             self.file.write(struct.pack('>i', header.float_size * header.nb_nodes))
             self.file.write(struct.pack(nb_values, *values[i, :]))
             self.file.write(struct.pack('>i', header.float_size * header.nb_nodes))
-
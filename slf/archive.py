@@ -0,0 +1,253 @@
+"""!
+Read/Write compressed archives of Serafin files
+
+An archive keeps the raw Serafin header, then every (frame, variable) record compressed on its own,
+and ends with an index giving the position of each record and the time of each frame.
+The archive reader is a Serafin.Read, so that archives are opened transparently by Serafin.Read(filename, ...).
+"""
+
+import logging
+import lzma
+import numpy as np
+import os
+import struct
+import zlib
+
+from slf import Serafin
+
+module_logger = logging.getLogger(__name__)
+
+
+MAGIC = b'SLFARCH\x00'
+VERSION = 1
+ZLIB, LZMA = 0, 1
+_PREAMBLE = struct.Struct('>8sIBBHQ')  # magic, version, codec, shuffle, reserved, header size
+_FOOTER = struct.Struct('>QQ8s')  # index position, number of frames, magic
+
+
+def is_archive(filename):
+    """!
+    @brief Check if a file is a Serafin archive
+    @param filename <str>: path to the file
+    @return <bool>: True if the file starts with the archive magic number
+    """
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _shuffle(data, float_size):
+    """Group the bytes of same significance together (lossless, helps compressing floats)"""
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, float_size).T.tobytes()
+
+
+def _unshuffle(data, float_size):
+    return np.frombuffer(data, dtype=np.uint8).reshape(float_size, -1).T.tobytes()
+
+
+class Write(Serafin.Serafin):
+    """!
+    @brief Serafin archive output stream (same interface as Serafin.Write)
+    """
+    def __init__(self, filename, language, codec=ZLIB, level=6, shuffle=True):
+        """!
+        @param filename <str>: path to the output archive
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param codec <int>: compression codec (ZLIB or LZMA)
+        @param level <int>: compression level (zlib level or lzma preset)
+        @param shuffle <bool>: shuffle the bytes of the floats before compression
+        """
+        super().__init__(filename, 'wb', language)
+        if codec not in (ZLIB, LZMA):
+            raise ValueError('Unknown compression codec %s' % codec)
+        self.codec = codec
+        self.level = level
+        self.shuffle = shuffle
+        self.index = []  # positions and lengths of the records of each frame
+        self.time = []
+        module_logger.info('Writing the output archive: "%s"' % filename)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self._write_index()
+        return super().__exit__(exc_type, exc_val, exc_tb)
+
+    def _compress(self, data):
+        if self.codec == ZLIB:
+            return zlib.compress(data, self.level)
+        return lzma.compress(data, preset=self.level)
+
+    def write_header(self, header):
+        """!
+        @brief Write the preamble and the Serafin header
+        """
+        raw_header = Serafin.Write.header_to_bytes(header)
+        self.file.write(_PREAMBLE.pack(MAGIC, VERSION, self.codec, int(self.shuffle), 0, len(raw_header)))
+        self.file.write(raw_header)
+
+    def write_entire_frame(self, header, time_to_write, values):
+        """!
+        @brief Compress and write all variables/nodes values
+        @param time_to_write <float>: time in second
+        @param values <numpy 2D-array>: values to write, of dimension (nb_var, nb_nodes)
+        """
+        float_type = np.dtype('>' + header.float_type)
+        frame_index = []
+        for var_values in values:
+            data = np.asarray(var_values).astype(float_type).tobytes()
+            if self.shuffle:
+                data = _shuffle(data, header.float_size)
+            data = self._compress(data)
+            frame_index.append((self.file.tell(), len(data)))
+            self.file.write(data)
+        self.index.append(frame_index)
+        # keep the time as it would be read in a Serafin file
+        self.time.append(float(header.np_float_type(time_to_write)))
+
+    def _write_index(self):
+        index_position = self.file.tell()
+        self.file.write(np.array(self.index, dtype='>u8').tobytes())
+        self.file.write(np.array(self.time, dtype='>f8').tobytes())
+        self.file.write(_FOOTER.pack(index_position, len(self.time), MAGIC))
+
+
+class Read(Serafin.Read):
+    """!
+    @brief Serafin archive input stream (same interface as Serafin.Read, without memory map, follow nor recover mode)
+    """
+    RAW_RECORDS = False
+
+    def __init__(self, filename, language, memory_map=False, cache=None, follow=False, recover=False, lazy=False):
+        """!
+        @param filename <str>: path to the archive
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param memory_map <bool>: not supported for archives (the records are compressed)
+        @param cache <bool>: ignored (the archive index already holds the time series)
+        @param follow <bool>: not supported for archives (the index is written at the end)
+        @param recover <bool>: not supported for archives (the index is written at the end)
+        @param lazy <bool>: decode the mesh on first access only
+        """
+        for flag, name in [(memory_map, 'memory map'), (follow, 'follow mode'), (recover, 'recover mode')]:
+            if flag:
+                raise Serafin.SerafinRequestError('The %s is not supported for Serafin archives (%s)'
+                                                  % (name, filename))
+        super().__init__(filename, language, cache=False, lazy=lazy)
+        self.codec = None
+        self.shuffle = False
+        self.record_index = None  # positions and lengths of the records, of shape (frames, variables, 2)
+        self.archive_time = None
+
+    def read_header(self):
+        """!
+        @brief Read the Serafin header and the index of the archive
+        """
+        self.file.seek(0)
+        magic, version, self.codec, shuffle, _, header_size = _PREAMBLE.unpack(self.file.read(_PREAMBLE.size))
+        if magic != MAGIC or version != VERSION:
+            raise Serafin.SerafinValidationError('Unknown archive format')
+        self.shuffle = bool(shuffle)
+
+        # the header is parsed in place as the one of a Serafin file without any frame
+        # (in lazy mode, the mesh blocks are decoded afterwards from their position in the archive)
+        self.header = Serafin.SerafinHeader(self.file, header_size, self.language, lazy=self.lazy)
+
+        self.file.seek(-_FOOTER.size, os.SEEK_END)
+        index_position, nb_frames, magic = _FOOTER.unpack(self.file.read(_FOOTER.size))
+        if magic != MAGIC:
+            raise Serafin.SerafinValidationError('The archive is incomplete (missing index)')
+
+        self.header.nb_frames = nb_frames
+        self.header.file_size = self.header._expected_file_size()
+
+        self.file.seek(index_position)
+        nb_index_values = nb_frames * self.header.nb_var * 2
+        self.record_index = np.frombuffer(self.file.read(8 * nb_index_values), dtype='>u8')\
+                              .reshape(nb_frames, self.header.nb_var, 2).astype(np.int64)
+        self.archive_time = np.frombuffer(self.file.read(8 * nb_frames), dtype='>f8')
+
+    def get_time(self):
+        """!
+        @brief Read the time in the archive index
+        """
+        self.time = self.archive_time.tolist()
+
+    def _read_record(self, time_index, pos_var):
+        position, length = self.record_index[time_index, pos_var]
+        data = self._read_at(position, length)
+        data = zlib.decompress(data) if self.codec == ZLIB else lzma.decompress(data)
+        if self.shuffle:
+            data = _unshuffle(data, self.header.float_size)
+        return np.frombuffer(data, dtype='>' + self.header.float_type).astype(self.header.np_float_type)
+
+    def read_var_in_frame(self, time_index, var_ID):
+        """!
+        @brief Read a single variable in a frame
+        @param time_index <int>: 0-based index of simulation time from the target frame
+        @param var_ID <str>: variable ID
+        @return <numpy 1D-array>: values of the variables, of length equal to the number of nodes
+        """
+        pos_var = self._get_var_index(var_ID)
+        if time_index < 0 or time_index >= self.header.nb_frames:
+            raise Serafin.SerafinRequestError('Frame %i is not inside [0, %i]'
+                                              % (time_index, self.header.nb_frames - 1))
+        return self._read_record(time_index, pos_var)
+
+    def read_var_in_frame_at_layer(self, time_index, var_ID, iplan):
+        """!
+        @brief Read a single variable in a frame at specific layer (the whole record is decompressed)
+        @param time_index <int>: 0-based index of simulation time from the target frame
+        @param var_ID <str>: variable ID
+        @param iplan <int>: 1-based index of layer
+        @return <numpy 1D-array>: values of the variables, of length equal to the number of 2D nodes
+        """
+        self._check_layer(iplan)
+        start = (iplan - 1) * self.header.nb_nodes_2d
+        return self.read_var_in_frame(time_index, var_ID)[start:start + self.header.nb_nodes_2d]
+
+    def read_vars_in_frames(self, time_indices, var_IDs):
+        """!
+        @brief Read several variables in several frames
+        @param time_indices <[int]>: 0-based indices of the target frames
+        @param var_IDs <[str]>: variable IDs
+        @return <numpy 3D-array>: values of shape (number of frames, number of variables, number of nodes)
+        """
+        values = np.empty((len(time_indices), len(var_IDs), self.header.nb_nodes), dtype=self.header.np_float_type)
+        for i, time_index in enumerate(time_indices):
+            for j, var_ID in enumerate(var_IDs):
+                values[i, j] = self.read_var_in_frame(time_index, var_ID)
+        return values
+
+    def read_vars_at_nodes(self, time_indices, var_IDs, node_indices):
+        """!
+        @brief Read time series of several variables at a few nodes (whole records are decompressed)
+        @param time_indices <[int]>: 0-based indices of the target frames
+        @param var_IDs <[str]>: variable IDs
+        @param node_indices <[int]>: 0-based indices of the target nodes (duplicates are allowed)
+        @return <numpy 3D-array>: values of shape (number of frames, number of variables, number of nodes)
+        """
+        node_indices = np.asarray(node_indices, dtype=int)
+        if node_indices.size > 0 and (node_indices.min() < 0 or node_indices.max() >= self.header.nb_nodes):
+            raise Serafin.SerafinRequestError('Node indices are not inside [0, %i]' % (self.header.nb_nodes - 1))
+        return self.read_vars_in_frames(time_indices, var_IDs)[:, :, node_indices]
+
+
+def convert(input_filename, output_filename, language, codec=ZLIB, level=6, shuffle=True):
+    """!
+    @brief Archive a Serafin file, frame by frame
+    @param input_filename <str>: path to the Serafin file
+    @param output_filename <str>: path to the output archive
+    @param language <str>: language for variable detection ('fr' or 'en')
+    @param codec <int>: compression codec (ZLIB or LZMA)
+    @param level <int>: compression level (zlib level or lzma preset)
+    @param shuffle <bool>: shuffle the bytes of the floats before compression
+    """
+    with Serafin.Read(input_filename, language) as input_stream, \
+            Write(output_filename, language, codec, level, shuffle) as output_stream:
+        input_stream.read_header()
+        input_stream.get_time()
+        output_stream.write_header(input_stream.header)
+        for time_index, time in enumerate(input_stream.time):
+            values = input_stream.read_vars_in_frames([time_index], input_stream.header.var_IDs)[0]
+            output_stream.write_entire_frame(input_stream.header, time, values)
@@ -38,26 +38,24 @@ class ReferenceMesh(TruncatedTriangularPrisms):
             self.inside_polygon = False
             self.triangle_polygon_intersection = {}
             self.nb_triangles_inside = self.nb_triangles
-            total_area = 0
-            for (i, j, k), t in self.triangles.items():
-                area = t.area
-                self.area[i, j, k] = area
-                total_area += area
-                self.point_weight[[i, j, k]] += area
+            self.area = dict(zip(self.triangles, self.areas))
+            total_area = self.areas.sum()
+            np.add.at(self.point_weight, self.ikle, self.areas[:, np.newaxis])
         else:
             self.inside_polygon = True
             self.polygon = polygon
             self.nb_triangles_inside = 0
 
-            potential_elements = self.get_intersecting_elements(polygon.bounds())
+            potential_elements = self.get_intersecting_element_numbers(polygon.bounds())
             self.point_weight = np.zeros((self.nb_points,), dtype=np.float64)
             self.triangle_polygon_intersection = {}
             total_area = 0
-            for i, j, k in potential_elements:
+            for element in potential_elements:
+                i, j, k = self.ikle[element]
                 t = self.triangles[i, j, k]
                 if polygon.contains(t):
                     self.nb_triangles_inside += 1
-                    area = t.area
+                    area = self.areas[element]
                     total_area += area
                     self.point_weight[[i, j, k]] += area
                     self.area[i, j, k] = area
@@ -0,0 +1,67 @@
+"""!
+Concatenation of Serafin files of chained (restart) runs on the same mesh
+
+The frame records are copied byte for byte after the header of the first file, only the header is written.
+"""
+
+import logging
+
+from slf import Serafin
+
+module_logger = logging.getLogger(__name__)
+
+
+def concatenate(input_filenames, output_filename, language):
+    """!
+    @brief Concatenate the frames of several Serafin files, dropping the first frames of each file which repeat
+    the last frames of the previous files
+    @param input_filenames <[str]>: paths to the input files, in chronological order
+    @param output_filename <str>: path to the output file (with the header of the first input file)
+    @param language <str>: language for variable detection ('fr' or 'en')
+    @return <[int]>: number of frames copied from each input file
+    """
+    nb_copied_frames = []
+    last_time, previous_start_time = None, None
+    with Serafin.Write(output_filename, language) as output_stream:
+        first_header = None
+        for filename in input_filenames:
+            with Serafin.Read(filename, language) as input_stream:
+                input_stream.read_header()
+                input_stream.get_time()
+                header = input_stream.header
+                if first_header is None:
+                    first_header = header
+                    output_stream.write_header(first_header)
+                elif not first_header.is_compatible(header):
+                    raise Serafin.SerafinValidationError('The file "%s" does not have the same mesh and variables '
+                                                         'as the file "%s"' % (filename, input_filenames[0]))
+
+                # the first frames of a restart run usually repeat the last frames of the previous run
+                nb_overlapping_frames = 0
+                if last_time is not None:
+                    while nb_overlapping_frames < header.nb_frames \
+                            and input_stream.time[nb_overlapping_frames] <= last_time:
+                        nb_overlapping_frames += 1
+                    # a restart run without time offset starts again from the beginning of the previous run
+                    if nb_overlapping_frames > 0 and input_stream.time[0] <= previous_start_time:
+                        raise Serafin.SerafinValidationError('The time of the file "%s" starts again from %s, not after '
+                                                             'the beginning of the previous file (%s): the restart '
+                                                             'run has no time offset' % (filename, input_stream.time[0],
+                                                                                         previous_start_time))
+                if nb_overlapping_frames > 0:
+                    module_logger.debug('%d frames of "%s" are already present and are skipped'
+                                        % (nb_overlapping_frames, filename))
+                time_indices = list(range(nb_overlapping_frames, header.nb_frames))
+                if input_stream.RAW_RECORDS:
+                    output_stream.copy_frames(input_stream, time_indices, header.var_IDs)
+                else:
+                    for time_index in time_indices:
+                        output_stream.write_entire_frame(first_header, input_stream.time[time_index],
+                                                         input_stream.read_vars_in_frames([time_index],
+                                                                                          header.var_IDs)[0])
+                if time_indices:
+                    last_time = input_stream.time[time_indices[-1]]
+                if input_stream.time:
+                    previous_start_time = input_stream.time[0]
+                nb_copied_frames.append(len(time_indices))
+    return nb_copied_frames
@@ -0,0 +1,161 @@
+"""!
+Numpy-style access to the values of a Serafin file
+
+The values of a file are seen as an array of shape (frames, variables, nodes) in 2D
+and (frames, variables, planes, nodes per plane) in 3D, with 0-based planes:
+    with Dataset('r2d.slf', 'fr') as ds:
+        ds['H'][10:20:2, [3, 8, 12]]  # water depth at three nodes in five frames
+        ds[-1, ['U', 'V']]  # velocity components in the last frame
+        ds[:, 'U', 0]  # velocity along x at the bottom plane (3D)
+Each request is turned into the fewest reads of Serafin.Read (whole frames, single planes or runs of nodes).
+"""
+
+import numpy as np
+
+from slf import Serafin
+
+
+def _indices(key, size):
+    """Returns the 0-based indices selected by a numpy key (integer, slice, list or array) along an axis"""
+    return np.arange(size)[key]
+
+
+def _is_whole_axis(indices, size):
+    return indices.ndim == 1 and indices.size == size and (size == 0 or np.array_equal(indices, np.arange(size)))
+
+
+class Dataset:
+    """!
+    @brief Serafin file seen as a numpy array (read-only)
+    """
+    def __init__(self, filename, language, memory_map=False):
+        """!
+        @param filename <str>: path to the Serafin file (or archive)
+        @param language <str>: language for variable detection ('fr' or 'en')
+        @param memory_map <bool>: access the frames through a read-only memory map
+        """
+        self.input_stream = Serafin.Read(filename, language, memory_map=memory_map)
+        self.input_stream.__enter__()
+        try:
+            self.input_stream.read_header()
+            self.input_stream.get_time()
+        except Exception:
+            self.close()
+            raise
+        self.header = self.input_stream.header
+        self.time = self.input_stream.time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.input_stream.__exit__(None, None, None)
+
+    @property
+    def var_IDs(self):
+        return self.header.var_IDs
+
+    @property
+    def dtype(self):
+        return np.dtype(self.header.np_float_type)
+
+    @property
+    def shape(self):
+        if self.header.is_2d:
+            return self.header.nb_frames, self.header.nb_var, self.header.nb_nodes
+        return self.header.nb_frames, self.header.nb_var, self.header.nb_planes, self.header.nb_nodes_2d
+
+    def __getitem__(self, key):
+        """!
+        @brief Get a variable (by its ID) or read values (numpy key whose variable axis accepts IDs)
+        @return <Variable or numpy.ndarray>: the variable, or the values read
+        """
+        if isinstance(key, str):
+            return Variable(self, key)
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > len(self.shape):
+            raise IndexError('Too many indices for a dataset of %d dimensions' % len(self.shape))
+        var_key = key[1] if len(key) > 1 else slice(None)
+        if isinstance(var_key, str):
+            var_IDs, squeeze_var = [self._get_var_ID(var_key)], True
+        elif isinstance(var_key, (list, tuple)) and all(isinstance(var_ID, str) for var_ID in var_key) and var_key:
+            var_IDs, squeeze_var = [self._get_var_ID(var_ID) for var_ID in var_key], False
+        else:
+            positions = _indices(var_key, self.header.nb_var)
+            var_IDs = [self.var_IDs[pos_var] for pos_var in np.atleast_1d(positions)]
+            squeeze_var = positions.ndim == 0
+        return self.read(key[0], var_IDs, squeeze_var, key[2:])
+
+    def _get_var_ID(self, var_ID):
+        if var_ID not in self.var_IDs:
+            raise Serafin.SerafinRequestError('Variable ID %s not found' % var_ID)
+        return var_ID
+
+    def read(self, time_key, var_IDs, squeeze_var=False, node_keys=()):
+        """!
+        @brief Read the values selected by numpy keys on the frames and on the nodes (or planes and nodes in 3D)
+        @param time_key <int, slice, list or numpy.ndarray>: selected frames
+        @param var_IDs <[str]>: selected variables
+        @param squeeze_var <bool>: remove the variable axis (single variable)
+        @param node_keys <tuple>: keys on the nodes (2D), or on the planes and the nodes of the planes (3D)
+        @return <numpy.ndarray>: the values, without the axes selected by an integer
+        """
+        header = self.header
+        time_indices = _indices(time_key, header.nb_frames)
+        squeezed = [time_indices.ndim == 0, squeeze_var]
+        time_indices = np.atleast_1d(time_indices).tolist()
+        node_keys = tuple(node_keys) + (slice(None),) * (len(self.shape) - 2 - len(node_keys))
+
+        if header.is_2d:
+            nodes = _indices(node_keys[0], header.nb_nodes)
+            squeezed.append(nodes.ndim == 0)
+            if _is_whole_axis(nodes, header.nb_nodes):
+                values = self.input_stream.read_vars_in_frames(time_indices, var_IDs)
+            else:
+                values = self.input_stream.read_vars_at_nodes(time_indices, var_IDs, np.atleast_1d(nodes))
+        else:
+            nb_nodes_2d = header.nb_nodes_2d
+            planes = _indices(node_keys[0], header.nb_planes)
+            nodes = _indices(node_keys[1], nb_nodes_2d)
+            squeezed.extend([planes.ndim == 0, nodes.ndim == 0])
+            planes, whole_planes = np.atleast_1d(planes), _is_whole_axis(nodes, nb_nodes_2d)
+            if whole_planes and _is_whole_axis(planes, header.nb_planes):
+                values = self.input_stream.read_vars_in_frames(time_indices, var_IDs)
+            elif whole_planes and planes.size == 1:  # a single plane is contiguous
+                values = self.input_stream.read_vars_in_frames_at_layer(time_indices, var_IDs, int(planes[0]) + 1)
+            else:
+                node_indices = (planes[:, np.newaxis] * nb_nodes_2d + np.atleast_1d(nodes)).ravel()
+                values = self.input_stream.read_vars_at_nodes(time_indices, var_IDs, node_indices)
+            values = values.reshape(len(time_indices), len(var_IDs), planes.size, -1)
+
+        return values[tuple(0 if is_squeezed else slice(None) for is_squeezed in squeezed)]
+
+
+class Variable:
+    """!
+    @brief Single variable of a Dataset, seen as a numpy array of shape (frames, nodes) or (frames, planes, nodes)
+    """
+    def __init__(self, dataset, var_ID):
+        self.dataset = dataset
+        self.var_ID = dataset._get_var_ID(var_ID)
+
+    @property
+    def dtype(self):
+        return self.dataset.dtype
+
+    @property
+    def shape(self):
+        shape = self.dataset.shape
+        return (shape[0],) + shape[2:]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > len(self.shape):
+            raise IndexError('Too many indices for a variable of %d dimensions' % len(self.shape))
+        return self.dataset.read(key[0], [self.var_ID], True, key[1:])
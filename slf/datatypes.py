@@ -17,7 +17,7 @@ class SerafinData:
         self.triangles = {}
         self.header = None
         self.time = []
-        self.time_second = []
+        self.time_second = np.array([], dtype='timedelta64[us]')
         self.start_time = None
 
         self.selected_vars = []
@@ -31,7 +31,8 @@ class SerafinData:
         self.metadata = {}
 
     def read(self):
-        with Serafin.Read(self.filename, self.language) as input_stream:
+        # the mesh is only decoded when it is used
+        with Serafin.Read(self.filename, self.language, lazy=True) as input_stream:
             input_stream.read_header()
             input_stream.get_time()
 
@@ -46,13 +47,30 @@ class SerafinData:
                 module_logger.warning('Date seems invalid, replaced by default date.')
         if self.start_time is None:
             self.start_time = datetime.datetime(1900, 1, 1, 0, 0, 0)
-        self.time_second = list(map(lambda x: datetime.timedelta(seconds=x), self.time))
+        self.time_second = np.rint(np.array(self.time, dtype=np.float64) * 1e6).astype('timedelta64[us]')
         self.selected_vars = self.header.var_IDs[:]
         self.selected_vars_names = {var_id: (var_name, var_unit) for (var_id, var_name, var_unit)
                                     in zip(self.header.var_IDs, self.header.var_names, self.header.var_units)}
         self.selected_time_indices = list(range(len(self.time)))
         return self.header.is_2d
 
+    def __getstate__(self):
+        # the spatial index and the triangles are not sent to other processes (an unpickled rtree index is empty),
+        # they are built again when needed, from the mesh cache if enabled
+        state = self.__dict__.copy()
+        state['index'] = None
+        state['triangles'] = {}
+        return state
+
+    def get_dates(self, time_indices=None):
+        """!
+        @brief Compute the dates of (some of) the frames
+        @param time_indices <[int]>: 0-based indices of the frames (all frames by default)
+        @return <[datetime.datetime]>: the dates of the frames
+        """
+        time_second = self.time_second if time_indices is None else self.time_second[list(time_indices)]
+        return (np.datetime64(self.start_time, 'us') + time_second).tolist()
+
     def copy(self):
         copy_data = SerafinData(self.job_id, self.filename, self.language)
         copy_data.index = self.index
@@ -86,6 +104,14 @@ class SerafinData:
             output_header.to_single_precision()
         return output_header
 
+    def has_raw_values(self):
+        """!
+        @brief Check if the selected variables can be copied from the input file without decoding them
+        @return <bool>: True if no variable is computed and the precision is not changed
+        """
+        return not self.equations and all(var_ID in self.header.var_IDs for var_ID in self.selected_vars) \
+            and not (self.to_single and self.header.is_double_precision())
+
     def build_2d_output_header(self):
         output_header = self.header.copy_as_2d()
         output_header.nb_var = len(self.selected_vars)
@@ -300,8 +300,11 @@ class ComplexExpressionPool:
         nb_row = len(selected_expressions)
         nb_col = input_stream.header.nb_nodes
 
-        for time_index, time_value in enumerate(input_stream.time):
-            values = self._evaluate_expressions(input_stream, time_index, augmented_path)
+        # the frames are evaluated in advance by a pool of threads
+        all_values = input_stream.map_frames(lambda time_index: self._evaluate_expressions(input_stream, time_index,
+                                                                                          augmented_path),
+                                             range(len(input_stream.time)))
+        for time_value, values in zip(input_stream.time, all_values):
 
             # build nd-array in the selected order
             value_array = np.empty((nb_row, nb_col))
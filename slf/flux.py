@@ -219,6 +219,12 @@ class FluxCalculator:
         for section in self.sections:
             self.intersections.append(self.mesh.section_intersection(section))
 
+    def read_values_in_frame(self, time_index):
+        """!
+        Read the values of all the flux variables in a single frame at once
+        """
+        return self.input_stream.read_vars_in_frames([time_index], self.var_IDs)[0]
+
     def flux_in_frame(self, intersections, values):
         """!
         @brief Do the flux computation in a single frame, depending on the flux type
@@ -236,16 +242,16 @@ class FluxCalculator:
         else:
             return TriangularVectorField.mass_flux(intersections, values[0], values[1], values[2], values[3])
 
-    def run(self, format_string='{0:.6f}'):
+    def run(self, format_string='{0:.6f}', time_indices=None):
         """!
         Separate the major part of the computation, allowing a GUI override
         """
         result = []
-        for time_index in self.time_indices:
+        time_indices = self.time_indices if time_indices is None else time_indices
+        # the frames are read in advance by a pool of threads
+        for time_index, values in zip(time_indices,
+                                      self.input_stream.map_frames(self.read_values_in_frame, time_indices)):
             i_result = [str(self.input_stream.time[time_index])]
-            values = []
-            for var_ID in self.var_IDs:
-                values.append(self.input_stream.read_var_in_frame(time_index, var_ID))
 
             for j in range(len(self.sections)):
                 intersections = self.intersections[j]
@@ -254,6 +260,15 @@ class FluxCalculator:
             result.append(i_result)
         return result
 
+    def update(self, time_indices, format_string='{0:.6f}'):
+        """!
+        @brief Compute the results in additional frames (e.g. new frames of an input stream in follow mode)
+        @param time_indices <[int]>: 0-based indices of the additional frames
+        @return <list>: the result rows of the additional frames
+        """
+        self.time_indices = list(self.time_indices) + list(time_indices)
+        return self.run(format_string, time_indices)
+
     def write_csv(self, result, output_stream, separator):
         output_stream.write('time')
         for name in self.section_names:
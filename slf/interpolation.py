@@ -36,27 +36,198 @@ class Interpolator:
         return np.all(coord >= 0) and np.all(coord <= 1), coord
 
 
+class TriangleGrid:
+    """!
+    Uniform grid whose cells list the triangles with a bounding box overlapping the cell (for batched queries)
+    """
+    MAX_CELLS_PER_TRIANGLE = 4  # bounds the number of cells when the mesh has large empty areas
+
+    def __init__(self, x, y, ikle):
+        """!
+        @param x <numpy 1D-array>: x-coordinates of the nodes
+        @param y <numpy 1D-array>: y-coordinates of the nodes
+        @param ikle <numpy 2D-array>: 0-based nodes of the triangles
+        """
+        x, y = x[ikle].astype(np.float64), y[ikle].astype(np.float64)
+        nb_triangles = ikle.shape[0]
+        if nb_triangles == 0:
+            self.x0, self.y0, self.cell_size, self.nx, self.ny = 0, 0, 1, 1, 1
+            self.elements, self.cell_starts = np.zeros(0, dtype=np.int64), np.zeros(2, dtype=np.int64)
+            return
+        left, right, bottom, top = x.min(axis=1), x.max(axis=1), y.min(axis=1), y.max(axis=1)
+        self.x0, self.y0 = left.min(), bottom.min()
+        width, height = right.max() - self.x0, top.max() - self.y0
+
+        # cells of the size of an average triangle, unless there would be too many of them
+        cell_size = max(np.mean(right - left), np.mean(top - bottom),
+                        np.sqrt(width * height / (self.MAX_CELLS_PER_TRIANGLE * nb_triangles)))
+        self.cell_size = cell_size if cell_size > 0 else 1
+        self.nx, self.ny = int(width / self.cell_size) + 1, int(height / self.cell_size) + 1
+
+        first_i, last_i = self._cell_x(left), self._cell_x(right)
+        first_j, last_j = self._cell_y(bottom), self._cell_y(top)
+        nb_cells_x = last_i - first_i + 1
+        counts = nb_cells_x * (last_j - first_j + 1)
+
+        # one (triangle, cell) pair for each cell overlapped by the bounding box of a triangle
+        elements = np.repeat(np.arange(nb_triangles), counts)
+        local = np.arange(elements.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (first_j[elements] + local // nb_cells_x[elements]) * self.nx \
+            + first_i[elements] + local % nb_cells_x[elements]
+
+        order = np.argsort(cells, kind='stable')  # triangles stay sorted in each cell
+        self.elements = elements[order]
+        self.cell_starts = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.nx * self.ny), out=self.cell_starts[1:])
+
+    def _cell_x(self, x):
+        return np.clip(((x - self.x0) / self.cell_size).astype(np.int64), 0, self.nx - 1)
+
+    def _cell_y(self, y):
+        return np.clip(((y - self.y0) / self.cell_size).astype(np.int64), 0, self.ny - 1)
+
+    def get_candidate_elements(self, points):
+        """!
+        @brief Find the triangles whose bounding box may contain each point
+        @param points <numpy 2D-array>: coordinates of the points, of shape (number of points, 2)
+        @return <tuple>: 0-based point and triangle numbers of every (point, candidate triangle) pair, grouped by point
+        """
+        with np.errstate(invalid='ignore'):
+            is_in_grid = (points[:, 0] >= self.x0) & (points[:, 0] <= self.x0 + self.nx * self.cell_size) \
+                & (points[:, 1] >= self.y0) & (points[:, 1] <= self.y0 + self.ny * self.cell_size)
+        in_grid = points[is_in_grid]
+        cells = self._cell_y(in_grid[:, 1]) * self.nx + self._cell_x(in_grid[:, 0])
+
+        starts = self.cell_starts[cells]
+        counts = self.cell_starts[cells + 1] - starts
+        point_indices = np.repeat(np.flatnonzero(is_in_grid), counts)
+        positions = np.arange(point_indices.shape[0]) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return point_indices, self.elements[positions]
+
+
 class MeshInterpolator(Mesh2D):
+    LOCATION_CHUNK_SIZE = 100000  # number of points located at once (bounds the memory used by the candidates)
+    MAX_WALK_STEPS = 100  # triangles crossed to reach a point before falling back to the grid
+
     def __init__(self, input_header, construct_index):
         super().__init__(input_header, construct_index)
+        self.grid = None  # bucket index for the location of points, built on first use
+        self.walk_tables = None  # built on first walk
 
-    def get_point_interpolators(self, points):
-        nb_points = len(points)
-        is_inside = [False] * nb_points
-        point_interpolators = [None] * nb_points
-
-        for index, (x, y) in enumerate(points):
-            potential_elements = self.get_intersecting_elements((x, y, x, y))
-            if not potential_elements:
-                continue
-            for i, j, k in potential_elements:
-                t = self.triangles[i, j, k]
-                is_in, point_interpolator = Interpolator(t).is_in_triangle(x, y)
-                if is_in:
-                    is_inside[index] = True
-                    point_interpolators[index] = ((i, j, k), point_interpolator)
+    def get_barycentric_coordinates(self, points, elements):
+        """!
+        @brief Compute the barycentric coordinates of points in triangles (same formula as Interpolator)
+        @param points <numpy 2D-array>: coordinates of the points, of shape (number of points, 2)
+        @param elements <numpy 1D-array>: 0-based triangle numbers, one per point
+        @return <numpy 2D-array>: barycentric coordinates, of shape (number of points, 3) (NaN in flat triangles)
+        """
+        i, j, k = self.ikle[elements].T
+        x1, y1 = self.x[i].astype(np.float64), self.y[i].astype(np.float64)
+        x2, y2 = self.x[j].astype(np.float64), self.y[j].astype(np.float64)
+        x3, y3 = self.x[k].astype(np.float64), self.y[k].astype(np.float64)
+        vec_x = np.stack([x2-x3, x3-x1, x1-x2], axis=1)
+        vec_y = np.stack([y2-y3, y3-y1, y1-y2], axis=1)
+        norm_z = (x2-x1) * (y3-y1) - (y2-y1) * (x3-x1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv_norm_z = 1 / norm_z
+            coords = (points[:, [0]]-x1[:, np.newaxis]) * vec_y - (points[:, [1]]-y1[:, np.newaxis]) * vec_x
+            coords[:, 0] += norm_z
+            return coords * inv_norm_z[:, np.newaxis]
+
+    def locate_points(self, points):
+        """!
+        @brief Find the triangle containing each point and the barycentric coordinates of the point in it
+        @param points <numpy 2D-array>: coordinates of the points, of shape (number of points, 2)
+        @return <tuple>: 0-based triangle numbers (-1 outside the mesh) and barycentric coordinates
+                         of shape (number of points, 3) (NaN outside the mesh)
+        """
+        if self.grid is None:
+            self.grid = TriangleGrid(self.x, self.y, self.ikle)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nb_points = points.shape[0]
+        elements = np.full(nb_points, -1, dtype=np.int64)
+        coords = np.full((nb_points, 3), np.nan)
+
+        for start in range(0, nb_points, self.LOCATION_CHUNK_SIZE):
+            chunk = points[start:start+self.LOCATION_CHUNK_SIZE]
+            point_indices, candidates = self.grid.get_candidate_elements(chunk)
+            candidate_coords = self.get_barycentric_coordinates(chunk[point_indices], candidates)
+            with np.errstate(invalid='ignore'):
+                is_in = np.all((candidate_coords >= 0) & (candidate_coords <= 1), axis=1)
+            point_indices, candidates, candidate_coords = \
+                point_indices[is_in], candidates[is_in], candidate_coords[is_in]
+
+            # keep the first triangle found for each point (points on edges belong to several triangles)
+            _, first = np.unique(point_indices, return_index=True)
+            elements[start + point_indices[first]] = candidates[first]
+            coords[start + point_indices[first]] = candidate_coords[first]
+        return elements, coords
+
+    def _build_walk_tables(self):
+        """!
+        @brief Terms of the barycentric coordinates (same formula as Interpolator) of every triangle
+        @return <numpy 2D-array>: x1, y1, vec_x (3), vec_y (3), norm_z and 1/norm_z of every triangle
+        """
+        i, j, k = self.ikle.T
+        x1, y1 = self.x[i].astype(np.float64), self.y[i].astype(np.float64)
+        x2, y2 = self.x[j].astype(np.float64), self.y[j].astype(np.float64)
+        x3, y3 = self.x[k].astype(np.float64), self.y[k].astype(np.float64)
+        norm_z = (x2-x1) * (y3-y1) - (y2-y1) * (x3-x1)
+        with np.errstate(divide='ignore'):
+            inv_norm_z = 1 / norm_z
+        return np.column_stack((x1, y1, x2-x3, x3-x1, x1-x2, y2-y3, y3-y1, y1-y2, norm_z, inv_norm_z))
+
+    def walk_to_points(self, points, first_element=None):
+        """!
+        @brief Locate a coherent sequence of points (along a line, a path, ...) by walking across the triangles
+        from the triangle of the previous point, using the topology of the mesh.
+        Points not reached within MAX_WALK_STEPS triangles (or beyond the boundary) are located with the grid.
+        @param points <numpy 2D-array>: coordinates of the points, of shape (number of points, 2)
+        @param first_element <int>: 0-based triangle where the walk starts (by default, the one of the first point)
+        @return <tuple>: same as locate_points
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nb_points = points.shape[0]
+        elements = np.full(nb_points, -1, dtype=np.int64)
+        coords = np.full((nb_points, 3), np.nan)
+        if nb_points == 0 or self.nb_triangles == 0:
+            return elements, coords
+        if self.walk_tables is None:
+            self.walk_tables = self._build_walk_tables()
+        neighbors = self.topology.neighbors
+
+        element = first_element
+        if element is None:
+            found, _ = self.locate_points(points[:1])
+            element = max(int(found[0]), 0)
+        for index, (x, y) in enumerate(points.tolist()):
+            for _ in range(self.MAX_WALK_STEPS):
+                x1, y1, vx1, vx2, vx3, vy1, vy2, vy3, norm_z, inv_norm_z = self.walk_tables[element].tolist()
+                dx, dy = x-x1, y-y1
+                coord = [(norm_z + dx*vy1 - dy*vx1) * inv_norm_z, (dx*vy2 - dy*vx2) * inv_norm_z,
+                         (dx*vy3 - dy*vx3) * inv_norm_z]
+                exit_edge = min(range(3), key=coord.__getitem__)
+                if coord[exit_edge] >= 0 and max(coord) <= 1:
+                    elements[index], coords[index] = element, coord
+                    break
+                neighbor = int(neighbors[element, exit_edge])
+                if neighbor < 0:  # the point is outside the mesh or behind a concave boundary
                     break
+                element = neighbor
+            if elements[index] < 0:
+                found, found_coords = self.locate_points(points[index:index+1])
+                if found[0] >= 0:
+                    element = elements[index] = found[0]
+                    coords[index] = found_coords[0]
+        return elements, coords
 
+    def get_point_interpolators(self, points):
+        elements, coords = self.locate_points(np.array(points, dtype=np.float64).reshape(-1, 2))
+        is_inside = (elements >= 0).tolist()
+        point_interpolators = [None] * len(is_inside)
+        for index in np.flatnonzero(elements >= 0):
+            point_interpolators[index] = (tuple(self.ikle[elements[index]]), coords[index])
         return is_inside, point_interpolators
 
     def _get_line_interpolators(self, line):
@@ -2,10 +2,141 @@
 Representation of the 2D mesh in a 2D Serafin file.
 """
 
+from collections.abc import Mapping
+import hashlib
 import numpy as np
 from rtree.index import Index
 from shapely.geometry import Polygon
 
+from slf.mesh_cache import bulk_load_index, MeshCache
+
+
+def mesh_fingerprint(x, y, ikle):
+    """!
+    @brief Hash of the coordinates and of the connectivity table of a 2D mesh (independent of their data types)
+    @param x <numpy 1D-array>: x-coordinates of the nodes
+    @param y <numpy 1D-array>: y-coordinates of the nodes
+    @param ikle <numpy 2D-array>: 0-based nodes of the triangles
+    @return <str>: the hexadecimal fingerprint
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for array, dtype in ((x, '<f8'), (y, '<f8'), (ikle, '<i8')):
+        array = np.ascontiguousarray(array, dtype=dtype)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class Triangles(Mapping):
+    """!
+    Shapely triangles of a mesh, indexed by their nodes (i, j, k) and created on first access
+    """
+    def __init__(self, points, ikle):
+        """!
+        @param points <numpy 2D-array>: coordinates of the nodes
+        @param ikle <numpy 2D-array>: 0-based nodes of the triangles
+        """
+        self.points = points
+        self.ikle = ikle
+        self.polygons = {}
+
+    def __getitem__(self, element):
+        polygon = self.polygons.get(element)
+        if polygon is None:
+            i, j, k = element
+            polygon = Polygon([self.points[i], self.points[j], self.points[k]])
+            self.polygons[element] = polygon
+        return polygon
+
+    def __iter__(self):
+        for i, j, k in self.ikle:
+            yield i, j, k
+
+    def __len__(self):
+        return self.ikle.shape[0]
+
+
+class MeshTopology:
+    """!
+    Edges and adjacency of the triangles of a mesh, as arrays
+
+    The local edge m of a triangle (i, j, k) is the one opposite to its m-th node: (j, k), (k, i) then (i, j).
+    """
+    LOCAL_EDGES = np.array([[1, 2], [2, 0], [0, 1]])
+    ARRAYS = ('half_edges', 'edges', 'element_edges', 'edge_elements', 'neighbors', 'boundary_edges')
+
+    def __init__(self, nb_points, ikle, arrays=None):
+        """!
+        @param nb_points <int>: number of nodes
+        @param ikle <numpy 2D-array>: 0-based nodes of the triangles
+        @param arrays <dict>: arrays of a topology computed beforehand (e.g. in a mesh cache), by name
+        """
+        self.nb_points = nb_points
+        self.ikle = ikle
+        self._boundary_loops = None
+        if arrays is not None:
+            for name in MeshTopology.ARRAYS:
+                setattr(self, name, arrays[name])
+            return
+        nb_triangles = ikle.shape[0]
+
+        # the three half-edges of every triangle, with the nodes in the order of the triangle
+        self.half_edges = ikle[:, MeshTopology.LOCAL_EDGES].reshape(-1, 2).astype(np.int64)
+        keys = np.sort(self.half_edges, axis=1)
+        keys = keys[:, 0] * nb_points + keys[:, 1]
+        unique_keys, edge_indices = np.unique(keys, return_inverse=True)
+
+        # unique edges (first node < second node), of shape (number of edges, 2)
+        self.edges = np.column_stack((unique_keys // nb_points, unique_keys % nb_points))
+        # edge of every local edge of the triangles, of shape (number of triangles, 3)
+        self.element_edges = edge_indices.reshape(nb_triangles, 3)
+
+        # the (at most two) triangles of each edge, from the half-edges sorted by edge
+        half_edge_elements = np.repeat(np.arange(nb_triangles), 3)
+        order = np.argsort(edge_indices, kind='stable')
+        counts = np.bincount(edge_indices, minlength=self.edges.shape[0])
+        starts = np.cumsum(counts) - counts
+        # triangles on each side of the edges (-1 for boundary edges), of shape (number of edges, 2)
+        self.edge_elements = np.full((self.edges.shape[0], 2), -1, dtype=np.int64)
+        self.edge_elements[:, 0] = half_edge_elements[order[starts]]
+        is_inner = counts > 1
+        self.edge_elements[is_inner, 1] = half_edge_elements[order[starts[is_inner] + 1]]
+
+        # neighbour of every triangle across each local edge (-1 on the boundary), of shape (number of triangles, 3)
+        first, second = self.edge_elements[edge_indices, 0], self.edge_elements[edge_indices, 1]
+        self.neighbors = np.where(first == half_edge_elements, second, first).reshape(nb_triangles, 3)
+
+        # 0-based indices of the boundary edges
+        self.boundary_edges = np.flatnonzero(~is_inner)
+
+    @property
+    def boundary_loops(self):
+        """!
+        @brief Closed boundaries of the mesh, computed on first access
+        @return <[numpy 1D-array]>: 0-based nodes of each boundary, in the direction of the triangles' edges
+        """
+        if self._boundary_loops is None:
+            self._boundary_loops = self._build_boundary_loops()
+        return self._boundary_loops
+
+    def _build_boundary_loops(self):
+        directed = self.half_edges[self.neighbors.ravel() == -1]
+        next_nodes = {}
+        for start, end in directed.tolist():
+            next_nodes.setdefault(start, []).append(end)
+
+        loops = []
+        for first_node in directed[:, 0].tolist():
+            if not next_nodes.get(first_node):
+                continue
+            loop = [first_node]
+            node = next_nodes[first_node].pop()
+            while node != first_node and next_nodes.get(node):
+                loop.append(node)
+                node = next_nodes[node].pop()
+            loops.append(np.array(loop, dtype=np.int64))
+        return loops
+
 
 class Mesh2D:
     """!
@@ -19,10 +150,14 @@ class Mesh2D:
         """
         self.x, self.y = input_header.x[:input_header.nb_nodes_2d], input_header.y[:input_header.nb_nodes_2d]
         self.ikle = input_header.ikle_2d - 1  # back to 0-based indexing
-        self.triangles = {}
         self.nb_points = self.x.shape[0]
         self.nb_triangles = self.ikle.shape[0]
         self.points = np.stack([self.x, self.y], axis=1)
+        self.triangles = Triangles(self.points, self.ikle)
+        self._topology = None
+        self._fingerprint = None
+        self._bounding_boxes = None
+        self._areas = None
         if not construct_index:
             self.index = Index()
         else:
@@ -31,12 +166,74 @@ class Mesh2D:
     def _construct_index(self):
         """!
         Separate the index construction from the constructor, allowing a GUI override
+
+        The index is bulk-loaded from the bounding boxes of all the triangles, computed at once.
+        If the mesh cache is enabled (MeshCache.DIRECTORY), the index and the derived arrays of a mesh already seen
+        (in any process) are read from the cache, and those of a new mesh are added to it.
         """
-        self.index = Index()
-        for i, j, k in self.ikle:
-            t = Polygon([self.points[i], self.points[j], self.points[k]])
-            self.triangles[i, j, k] = t
-            self.index.insert(i, t.bounds, obj=(i, j, k))
+        cache = None
+        if MeshCache.DIRECTORY is not None and self.nb_triangles > 0:
+            cache = MeshCache(self.fingerprint)
+            cached = cache.load()
+            if cached is not None:
+                self.index, arrays = cached
+                self._bounding_boxes, self._areas = arrays['bounding_boxes'], arrays['areas']
+                self._topology = MeshTopology(self.nb_points, self.ikle, arrays)
+                return
+        self.index = bulk_load_index(self.bounding_boxes)
+        if cache is not None:
+            arrays = {name: getattr(self.topology, name) for name in MeshTopology.ARRAYS}
+            cache.save(self.bounding_boxes, dict(arrays, bounding_boxes=self.bounding_boxes, areas=self.areas))
+
+    @property
+    def fingerprint(self):
+        """!
+        @brief Fingerprint of the mesh (see mesh_fingerprint), computed on first access
+        """
+        if self._fingerprint is None:
+            self._fingerprint = mesh_fingerprint(self.x, self.y, self.ikle)
+        return self._fingerprint
+
+    @property
+    def bounding_boxes(self):
+        """!
+        @brief Bounding boxes (left, bottom, right, top) of the triangles, computed on first access
+        @return <numpy 2D-array>: the bounding boxes, of shape (number of triangles, 4)
+        """
+        if self._bounding_boxes is None:
+            x, y = self.x[self.ikle], self.y[self.ikle]
+            self._bounding_boxes = np.column_stack((x.min(axis=1), y.min(axis=1),
+                                                    x.max(axis=1), y.max(axis=1))).astype(np.float64)
+        return self._bounding_boxes
+
+    @property
+    def areas(self):
+        """!
+        @brief Areas of the triangles, computed on first access
+        @return <numpy 1D-array>: the areas, of length equal to the number of triangles
+        """
+        if self._areas is None:
+            x, y = self.x[self.ikle].astype(np.float64), self.y[self.ikle].astype(np.float64)
+            self._areas = np.abs((x[:, 1]-x[:, 0]) * (y[:, 2]-y[:, 0]) - (y[:, 1]-y[:, 0]) * (x[:, 2]-x[:, 0])) / 2
+        return self._areas
+
+    @property
+    def topology(self):
+        """!
+        @brief Edges and adjacency of the triangles, computed on first access
+        @return <slf.mesh2D.MeshTopology>: the topology of the mesh
+        """
+        if self._topology is None:
+            self._topology = MeshTopology(self.nb_points, self.ikle)
+        return self._topology
+
+    def get_intersecting_element_numbers(self, bounding_box):
+        """!
+        @brief Return the 0-based numbers of the triangles in the mesh intersecting the bounding box
+        @param bounding_box <tuple>: (left, bottom, right, top) of a 2d geometrical object
+        @return <[int]>: The list of triangle numbers (e.g. positions in ikle and areas) intersecting the bounding box
+        """
+        return list(self.index.intersection(bounding_box))
 
     def get_intersecting_elements(self, bounding_box):
         """!
@@ -44,7 +241,4 @@ class Mesh2D:
         @param bounding_box <tuple>: (left, bottom, right, top) of a 2d geometrical object
         @return <[tuple]>: The list of triangles (i,j,k) intersecting the bounding box
         """
-        return list(self.index.intersection(bounding_box, objects='raw'))
-
-
-
+        return [tuple(self.ikle[element]) for element in self.get_intersecting_element_numbers(bounding_box)]
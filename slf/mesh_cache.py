@@ -0,0 +1,135 @@
+"""!
+Persistent cache of the spatial index and of the derived arrays of 2D meshes
+
+Result files sharing a mesh share its cache entry: the entries are folders named after the fingerprint of the mesh
+(hash of its coordinates and connectivity table), holding the rtree files and the derived arrays in a npz file.
+They can be used by several processes at once: the entries are never modified once written, each process querying
+a private copy of the cached index. The least recently used entries are removed as soon as the cache exceeds
+MeshCache.MAX_SIZE.
+"""
+
+import logging
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+import weakref
+import zipfile
+
+from rtree.index import Index, RTreeError
+
+module_logger = logging.getLogger(__name__)
+
+
+def bulk_load_index(bounding_boxes, basename=None):
+    """!
+    @brief Build a rtree index of elements from their bounding boxes, at once
+    @param bounding_boxes <numpy 2D-array>: (left, bottom, right, top) of every element
+    @param basename <str>: path of the index files (without the extensions .dat and .idx), None for an index in memory
+    @return <rtree.index.Index>: the index, whose ids are the 0-based element numbers
+    """
+    args = () if basename is None else (basename,)
+    if bounding_boxes.shape[0] == 0:
+        return Index(*args)
+    if hasattr(Index, 'intersection_v'):  # rtree >= 1.0 bulk-loads numpy arrays
+        return Index(*args, (np.arange(bounding_boxes.shape[0], dtype=np.int64), bounding_boxes[:, :2],
+                             bounding_boxes[:, 2:]))
+    return Index(*args, ((element, tuple(box), None) for element, box in enumerate(bounding_boxes.tolist())))
+
+
+class MeshCache:
+    """!
+    @brief Cache entry of a 2D mesh, in the cache folder
+    """
+    DIRECTORY = None  # cache folder (None disables the cache), set by the MESH_CACHE_DIR setting in the GUIs
+    MAX_SIZE = 1024 * 1024 * 1024  # upper bound (in bytes) of the size of the cache folder
+    MIN_AGE = 60  # entries used more recently (in seconds) are not removed, as other processes may be reading them
+    VERSION = 1
+    INDEX_NAME = 'index'  # rtree files index.dat and index.idx
+    ARRAYS_NAME = 'arrays.npz'
+
+    def __init__(self, fingerprint, directory=None):
+        """!
+        @param fingerprint <str>: fingerprint of the mesh
+        @param directory <str>: cache folder (default: MeshCache.DIRECTORY)
+        """
+        self.directory = MeshCache.DIRECTORY if directory is None else directory
+        self.folder = os.path.join(self.directory, 'v%d-%s' % (MeshCache.VERSION, fingerprint))
+
+    def load(self):
+        """!
+        @brief Open a private copy of the cached index and load the cached arrays, and mark the entry as recently used
+        @return <tuple or None>: the index (on disk, removed with the index object) and the dictionary of arrays,
+                                 or None if the mesh is not cached
+        """
+        if not os.path.isdir(self.folder):
+            return None
+        private_folder = tempfile.mkdtemp(prefix='PyTelTools-index-')
+        try:
+            os.utime(self.folder)
+            with np.load(os.path.join(self.folder, MeshCache.ARRAYS_NAME), allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            # rtree opens the index files for writing, the cached files are left untouched
+            for file_name in os.listdir(self.folder):
+                if file_name.startswith(MeshCache.INDEX_NAME + '.'):
+                    shutil.copyfile(os.path.join(self.folder, file_name), os.path.join(private_folder, file_name))
+            index = Index(os.path.join(private_folder, MeshCache.INDEX_NAME))
+        except (OSError, ValueError, zipfile.BadZipFile, RTreeError):
+            module_logger.debug('Cannot read the mesh cache "%s"' % self.folder)
+            shutil.rmtree(private_folder, ignore_errors=True)
+            return None
+        weakref.finalize(index, shutil.rmtree, private_folder, ignore_errors=True)
+        module_logger.debug('Reading the mesh index from the cache "%s"' % self.folder)
+        return index, arrays
+
+    def save(self, bounding_boxes, arrays):
+        """!
+        @brief Write the entry (index built from the bounding boxes, and arrays), then evict the oldest entries.
+        Failures (e.g. read-only folders) are ignored.
+        @param bounding_boxes <numpy 2D-array>: (left, bottom, right, top) of every element
+        @param arrays <dict>: derived arrays of the mesh, by name
+        """
+        tmp_folder = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_folder = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+            index = bulk_load_index(bounding_boxes, os.path.join(tmp_folder, MeshCache.INDEX_NAME))
+            index.close()  # flush the index files
+            with open(os.path.join(tmp_folder, MeshCache.ARRAYS_NAME), 'wb') as f:
+                np.savez(f, **arrays)
+            os.rename(tmp_folder, self.folder)  # the entry appears complete to the other processes
+            tmp_folder = None
+        except (OSError, RTreeError):
+            if not os.path.isdir(self.folder):  # not written by another process meanwhile
+                module_logger.warning('Cannot write the mesh cache "%s"' % self.folder)
+        finally:
+            if tmp_folder is not None:  # failure, or the same entry written by another process
+                shutil.rmtree(tmp_folder, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """!
+        @brief Remove the least recently used entries (except this one and those used within MIN_AGE seconds)
+        until the cache fits in MAX_SIZE
+        """
+        entries = []
+        try:
+            for name in os.listdir(self.directory):
+                folder = os.path.join(self.directory, name)
+                if name.startswith('.tmp-') or not os.path.isdir(folder):
+                    continue
+                size = sum(os.path.getsize(os.path.join(folder, file_name)) for file_name in os.listdir(folder))
+                entries.append((os.path.getmtime(folder), size, folder))
+        except OSError:  # entries removed meanwhile by another process
+            return
+        total_size = sum(size for _, size, _ in entries)
+        now = time.time()
+        for last_use, size, folder in sorted(entries):
+            if total_size <= MeshCache.MAX_SIZE:
+                break
+            if folder == self.folder or now - last_use < MeshCache.MIN_AGE:
+                continue
+            module_logger.debug('Removing the mesh cache "%s"' % folder)
+            shutil.rmtree(folder, ignore_errors=True)
+            total_size -= size
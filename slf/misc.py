@@ -8,6 +8,7 @@ import re
 import shapefile
 
 from slf import Serafin
+from slf.pipeline import FramePipeline
 from slf.variables import do_calculation, get_available_variables, get_necessary_equations
 
 
@@ -76,6 +77,24 @@ def scalars_vectors(known_vars, selected_vars, us_equation=None):
     return scalars, vectors, additional_equations
 
 
+def variables_to_read(known_vars, needed_vars, equations=None):
+    """!
+    @brief Select the variables to read in the input stream to compute the needed variables in a frame
+    @param known_vars <[str]>: the variable IDs of the input stream
+    @param needed_vars <[str]>: the variable IDs to output
+    @param equations <[slf.variables_utils.Equation]>: the equations (sorted by order) computing additional variables
+    @return <[str]>: the variable IDs to read, in the order of the input stream (unknown IDs are kept at the end)
+    """
+    to_read, computed = set(), set()
+    for equation in equations if equations is not None else []:
+        for var_ID in map(lambda x: x.ID(), equation.input):
+            if var_ID not in computed:
+                to_read.add(var_ID)
+        computed.add(equation.output.ID())
+    to_read.update(var_ID for var_ID in needed_vars if var_ID not in computed)
+    return [var_ID for var_ID in known_vars if var_ID in to_read] + sorted(to_read.difference(known_vars))
+
+
 def tighten_expression(expression):
     """!
     Remove the spaces and brackets to get a nice and short expression for display
@@ -169,6 +188,8 @@ def evaluate_expression(input_stream, time_index, expression):
     @return <numpy.1D-array>: the value of the expression
     """
     stack = []
+    var_IDs = list(set(symbol[1:-1] for symbol in expression if symbol not in OPERATORS and symbol[0] == '['))
+    var_values = dict(zip(var_IDs, input_stream.read_vars_in_frames([time_index], var_IDs)[0]))
 
     for symbol in expression:
         if symbol in OPERATORS:
@@ -181,7 +202,7 @@ def evaluate_expression(input_stream, time_index, expression):
                 stack.append(OPERATIONS[symbol](first_operand, second_operand))
         else:
             if symbol[0] == '[':  # variable ID
-                stack.append(input_stream.read_var_in_frame(time_index, symbol[1:-1]))
+                stack.append(var_values[symbol[1:-1]])
             else:  # constant
                 stack.append(float(symbol))
 
@@ -450,6 +471,8 @@ class ScalarMaxMinMeanCalculator:
         self.nb_var = len(selected_scalars)
         self.nb_nodes = input_stream.header.nb_nodes
         self.additional_equations = additional_equations
+        self.read_var_IDs = variables_to_read(input_stream.header.var_IDs, [var for var, _, _ in selected_scalars],
+                                              additional_equations)
 
         if self.maxmin == MAX:
             self.current_values = np.ones((self.nb_var, self.nb_nodes)) * (-float('Inf'))
@@ -458,30 +481,31 @@ class ScalarMaxMinMeanCalculator:
         else:
             self.current_values = np.zeros((self.nb_var, self.nb_nodes))
 
-    def additional_computation_in_frame(self, time_index):
-        computed_values = {}
+    def read_values_in_frame(self, time_index):
+        """!
+        @brief Read all the variables needed in a single frame at once
+        @return <dict>: the values of the variables read in the input stream
+        """
+        return dict(zip(self.read_var_IDs, self.input_stream.read_vars_in_frames([time_index], self.read_var_IDs)[0]))
+
+    def additional_computation_in_frame(self, time_index, computed_values=None):
+        if computed_values is None:
+            computed_values = self.read_values_in_frame(time_index)
         for equation in self.additional_equations:
             input_var_IDs = list(map(lambda x: x.ID(), equation.input))
-
-            # read (if needed) input variables values
-            for input_var_ID in input_var_IDs:
-                if input_var_ID not in computed_values:
-                    computed_values[input_var_ID] = self.input_stream.read_var_in_frame(time_index, input_var_ID)
             # compute additional variables
             output_values = do_calculation(equation, [computed_values[var_ID] for var_ID in input_var_IDs])
             computed_values[equation.output.ID()] = output_values
         return computed_values
 
-    def max_min_mean_in_frame(self, time_index):
+    def max_min_mean_in_frame(self, time_index, computed_values=None):
+        if computed_values is None:
+            computed_values = self.read_values_in_frame(time_index)
         if self.additional_equations is not None:
-            computed_values = self.additional_computation_in_frame(time_index)
-        else:
-            computed_values = {}
+            computed_values = self.additional_computation_in_frame(time_index, computed_values)
 
         values = np.empty((self.nb_var, self.nb_nodes))
         for i, (var, name, unit) in enumerate(self.selected_scalars):
-            if var not in computed_values:
-                computed_values[var] = self.input_stream.read_var_in_frame(time_index, var)
             values[i, :] = computed_values[var]
 
         with np.errstate(invalid='ignore'):
@@ -492,13 +516,34 @@ class ScalarMaxMinMeanCalculator:
             else:
                 self.current_values += values
 
+    def merge(self, current_values):
+        """!
+        @brief Take into account the running values computed on other frames (e.g. by another process)
+        @param current_values <numpy 2D-array>: the running values of another calculator of the same type
+        """
+        with np.errstate(invalid='ignore'):
+            if self.maxmin == MAX:
+                self.current_values = np.maximum(self.current_values, current_values)
+            elif self.maxmin == MIN:
+                self.current_values = np.minimum(self.current_values, current_values)
+            else:
+                self.current_values += current_values
+
     def finishing_up(self):
         if self.maxmin == MEAN:
-            self.current_values /= len(self.time_indices)
+            return self.current_values / len(self.time_indices)
         return self.current_values
 
     def run(self):
-        for time_index in self.time_indices:
+        FramePipeline(self.read_values_in_frame, self.max_min_mean_in_frame).run(self.time_indices)
+
+    def update(self, time_indices):
+        """!
+        @brief Take into account additional frames (e.g. new frames of an input stream in follow mode)
+        @param time_indices <[int]>: 0-based indices of the additional frames
+        """
+        self.time_indices = list(self.time_indices) + list(time_indices)
+        for time_index in time_indices:
             self.max_min_mean_in_frame(time_index)
 
 
@@ -514,6 +559,10 @@ class VectorMaxMinMeanCalculator:
         self.additional_equations = additional_equations
 
         self.nb_nodes = input_stream.header.nb_nodes
+        needed_var_IDs = [var for var, _, _ in selected_vectors]
+        if self.maxmin != MEAN:
+            needed_var_IDs.extend(_VECTORS[var][1] for var, _, _ in selected_vectors)
+        self.read_var_IDs = variables_to_read(input_stream.header.var_IDs, needed_var_IDs, additional_equations)
 
         self.current_values = {}
         for var, _, _ in selected_vectors:
@@ -527,22 +576,25 @@ class VectorMaxMinMeanCalculator:
             else:
                 self.current_values[var] = np.zeros((self.nb_nodes,))
 
-    def additional_computation_in_frame(self, time_index):
-        computed_values = {}
+    def read_values_in_frame(self, time_index):
+        """!
+        @brief Read all the variables needed in a single frame at once
+        @return <dict>: the values of the variables read in the input stream
+        """
+        return dict(zip(self.read_var_IDs, self.input_stream.read_vars_in_frames([time_index], self.read_var_IDs)[0]))
+
+    def additional_computation_in_frame(self, time_index, computed_values=None):
+        if computed_values is None:
+            computed_values = self.read_values_in_frame(time_index)
         for equation in self.additional_equations:
             input_var_IDs = list(map(lambda x: x.ID(), equation.input))
-
-            # read (if needed) input variables values
-            for input_var_ID in input_var_IDs:
-                if input_var_ID not in computed_values:
-                    computed_values[input_var_ID] = self.input_stream.read_var_in_frame(time_index, input_var_ID)
             # compute additional variables
             output_values = do_calculation(equation, [computed_values[var_ID] for var_ID in input_var_IDs])
             computed_values[equation.output.ID()] = output_values
         return computed_values
 
-    def max_min_mean_in_frame(self, time_index):
-        computed_values = self.additional_computation_in_frame(time_index)
+    def max_min_mean_in_frame(self, time_index, computed_values=None):
+        computed_values = self.additional_computation_in_frame(time_index, computed_values)
 
         if self.maxmin == MEAN:
             for var, _, _ in self.selected_vectors:
@@ -552,11 +604,6 @@ class VectorMaxMinMeanCalculator:
         for var, _, _ in self.selected_vectors:
             mother = _VECTORS[var][1]
 
-            if mother not in computed_values:
-                computed_values[mother] = self.input_stream.read_var_in_frame(time_index, mother)
-            if var not in computed_values:
-                computed_values[var] = self.input_stream.read_var_in_frame(time_index, var)
-
             if self.maxmin == MAX:
                 self.current_values[var] = np.where(computed_values[mother] > self.current_values[mother],
                                                     computed_values[var], self.current_values[var])
@@ -574,7 +621,15 @@ class VectorMaxMinMeanCalculator:
         return values
 
     def run(self):
-        for time_index in self.time_indices:
+        FramePipeline(self.read_values_in_frame, self.max_min_mean_in_frame).run(self.time_indices)
+
+    def update(self, time_indices):
+        """!
+        @brief Take into account additional frames (e.g. new frames of an input stream in follow mode)
+        @param time_indices <[int]>: 0-based indices of the additional frames
+        """
+        self.time_indices = list(self.time_indices) + list(time_indices)
+        for time_index in time_indices:
             self.max_min_mean_in_frame(time_index)
 
 
@@ -597,9 +652,13 @@ class ArrivalDurationCalculator:
         self.arrival = np.where(self.previous_flag, self.previous_time, float('Inf'))
         self.previous_flip = np.ones((input_stream.header.nb_nodes,)) * self.previous_time
 
-    def arrival_duration_in_frame(self, index):
+    def evaluate_in_frame(self, index):
+        return evaluate_expression(self.input_stream, index, self.expression)
+
+    def arrival_duration_in_frame(self, index, current_value=None):
         current_time = self.input_stream.time[index]
-        current_value = evaluate_expression(self.input_stream, index, self.expression)
+        if current_value is None:
+            current_value = self.evaluate_in_frame(index)
         with np.errstate(divide='ignore', invalid='ignore'):
             t_star = (current_value * self.previous_time - self.previous_value * current_time) \
                      / (current_value - self.previous_value)
@@ -625,8 +684,7 @@ class ArrivalDurationCalculator:
         self.previous_time = current_time
 
     def run(self):
-        for index in self.time_indices[1:]:
-            self.arrival_duration_in_frame(index)
+        FramePipeline(self.evaluate_in_frame, self.arrival_duration_in_frame).run(self.time_indices[1:])
 
 
 class Condition:
@@ -678,35 +736,39 @@ class ProjectMeshCalculator:
         self.nb_var = len(self.selected_vars)
         self.nb_nodes = self.first_in.header.nb_nodes
 
+        # interpolation as arrays, applied to all the nodes at once in every frame
+        self.inside_nodes = np.flatnonzero(is_inside)
+        self.interpolation_nodes = np.array([point_interpolators[index_node][0] for index_node in self.inside_nodes],
+                                            dtype=np.int64).reshape(-1, 3)
+        self.interpolation_weights = np.array([point_interpolators[index_node][1]
+                                               for index_node in self.inside_nodes]).reshape(-1, 3)
+
     def read_values_in_frame(self, time_index, read_second):
-        values = []
-        for i, var_ID in enumerate(self.selected_vars):
-            if read_second:
-                values.append(self.second_in.read_var_in_frame(time_index, var_ID))
-            else:
-                values.append(self.first_in.read_var_in_frame(time_index, var_ID))
-        return values
+        input_stream = self.second_in if read_second else self.first_in
+        return input_stream.read_vars_in_frames([time_index], self.selected_vars)[0]
 
     def interpolate(self, values):
-        interpolated_values = []
-        for index_node in range(self.nb_nodes):
-            if not self.is_inside[index_node]:
-                interpolated_values.append(np.nan)
-            else:
-                (i, j, k), interpolator = self.point_interpolators[index_node]
-                interpolated_values.append(interpolator.dot(values[[i, j, k]]))
+        interpolated_values = np.full(self.nb_nodes, np.nan)
+        interpolated_values[self.inside_nodes] = np.sum(values[self.interpolation_nodes] * self.interpolation_weights,
+                                                        axis=1)
         return interpolated_values
 
-    def operation_in_frame(self, first_time_index, second_time_index):
-        if self.operation_type == PROJECT:  # projection
-            second_values = self.read_values_in_frame(second_time_index, True)
-            return np.array([self.interpolate(second_values[i]) for i in range(self.nb_var)])
-
-        if self.use_reference:
+    def read_values_in_frames(self, first_time_index, second_time_index):
+        """!
+        @brief Read the values needed for an operation between two frames
+        @return <tuple>: the values in the first frame (None if not needed) and in the second frame
+        """
+        if self.operation_type == PROJECT:
+            first_values = None
+        elif self.use_reference:
             first_values = self.first_values
         else:
             first_values = np.array(self.read_values_in_frame(first_time_index, False))
-        second_values = self.read_values_in_frame(second_time_index, True)
+        return first_values, self.read_values_in_frame(second_time_index, True)
+
+    def operation_on_values(self, first_values, second_values):
+        if self.operation_type == PROJECT:  # projection
+            return np.array([self.interpolate(second_values[i]) for i in range(self.nb_var)])
 
         if self.operation_type == DIFF:
             return np.array([first_values[i] - np.array(self.interpolate(second_values[i]))
@@ -721,15 +783,28 @@ class ProjectMeshCalculator:
             return np.array([np.minimum(self.interpolate(second_values[i]), first_values[i])
                              for i in range(self.nb_var)])
 
-    def run(self, out_stream, out_header):
-        for i, (first_time_index, second_time_index) in enumerate(self.time_indices):
-            values = self.operation_in_frame(first_time_index, second_time_index)
+    def operation_in_frame(self, first_time_index, second_time_index):
+        return self.operation_on_values(*self.read_values_in_frames(first_time_index, second_time_index))
+
+    def run(self, out_stream, out_header, positions=None):
+        """!
+        @param positions <[int]>: positions (in time_indices) of the frames to write at their offsets in a
+                                  preallocated output stream (by default, all frames are written sequentially)
+        """
+        def write(i, values):
+            first_time_index, second_time_index = self.time_indices[i]
             if self.use_reference:
-                out_stream.write_entire_frame(out_header,
-                                              self.second_in.time[second_time_index], values)
+                time = self.second_in.time[second_time_index]
+            else:
+                time = self.first_in.time[first_time_index]
+            if positions is None:
+                out_stream.write_entire_frame(out_header, time, values)
             else:
-                out_stream.write_entire_frame(out_header,
-                                              self.first_in.time[first_time_index], values)
+                out_stream.write_entire_frame_at(out_header, i, time, values)
+
+        FramePipeline(lambda i: self.read_values_in_frames(*self.time_indices[i]),
+                      lambda i, values: self.operation_on_values(*values),
+                      write).run(range(len(self.time_indices)) if positions is None else positions)
 
 
 class SynchMaxCalculator:
@@ -746,19 +821,18 @@ class SynchMaxCalculator:
         if ref_var not in selected_vars:
             self.read_ref = True
         self.nb_nodes = input_stream.header.nb_nodes
-        self.current_values = {'time': np.ones((self.nb_nodes,)) * self.input_stream.time[time_indices[0]]}
-
-        for var, _, _ in selected_vars:
-            self.current_values[var] = self.input_stream.read_var_in_frame(time_indices[0], var)
+        self.read_var_IDs = [var for var, _, _ in selected_vars]
         if self.read_ref:
-            self.current_values[ref_var] = self.input_stream.read_var_in_frame(time_indices[0], ref_var)
+            self.read_var_IDs.append(ref_var)
+
+        self.current_values = self.read_values_in_frame(time_indices[0])
+        self.current_values['time'] = np.ones((self.nb_nodes,)) * self.input_stream.time[time_indices[0]]
+
+    def read_values_in_frame(self, time_index):
+        return dict(zip(self.read_var_IDs, self.input_stream.read_vars_in_frames([time_index], self.read_var_IDs)[0]))
 
     def synch_max_in_frame(self, time_index):
-        values = {}
-        for var, _, _ in self.selected_vars:
-            values[var] = self.input_stream.read_var_in_frame(time_index, var)
-        if self.read_ref:
-            values[self.ref_var] = self.input_stream.read_var_in_frame(time_index, self.ref_var)
+        values = self.read_values_in_frame(time_index)
 
         flags = values[self.ref_var] > self.current_values[self.ref_var]
         for var, _, _ in self.selected_vars:
@@ -0,0 +1,103 @@
+"""!
+Read-ahead / compute / write-behind pipeline over the frames of a Serafin file
+"""
+
+import queue
+import threading
+
+
+class FramePipeline:
+    """!
+    @brief Read-ahead / compute / write-behind loop over frames
+
+    A reader thread prepares the next frames while the calling thread computes the current one,
+    and a writer thread writes the previous ones (in order). The stages exchange frames through bounded queues.
+    """
+    QUEUE_SIZE = 2
+    _END = object()
+
+    def __init__(self, read, compute=None, write=None, queue_size=None):
+        """!
+        @param read <function>: function taking an item (e.g. a time index) and returning the data read
+        @param compute <function>: function taking an item and its data and returning the result (default: the data)
+        @param write <function>: function taking an item and its result (default: the results are dropped)
+        @param queue_size <int>: maximum number of frames waiting between two stages (default: QUEUE_SIZE)
+        """
+        self.read = read
+        self.compute = compute
+        self.write = write
+        self.queue_size = FramePipeline.QUEUE_SIZE if queue_size is None else queue_size
+
+        self.stop = threading.Event()
+        self.errors = []
+
+    def _put(self, target_queue, element):
+        while not self.stop.is_set():
+            try:
+                target_queue.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, source_queue):
+        while not self.stop.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return FramePipeline._END
+
+    def _read_all(self, items, read_queue):
+        try:
+            for item in items:
+                if not self._put(read_queue, (item, self.read(item))):
+                    return
+        except Exception as e:
+            self.errors.append(e)
+        self._put(read_queue, FramePipeline._END)
+
+    def _write_all(self, write_queue):
+        try:
+            while True:
+                element = self._get(write_queue)
+                if element is FramePipeline._END:
+                    return
+                self.write(*element)
+        except Exception as e:
+            self.errors.append(e)
+            self.stop.set()
+
+    def run(self, items):
+        """!
+        @brief Process all items in order
+        @param items <iterable>: items (e.g. time indices) passed to the functions of the stages
+        """
+        self.stop.clear()
+        self.errors = []
+        read_queue, write_queue = queue.Queue(self.queue_size), queue.Queue(self.queue_size)
+        threads = [threading.Thread(target=self._read_all, args=(items, read_queue), daemon=True)]
+        if self.write is not None:
+            threads.append(threading.Thread(target=self._write_all, args=(write_queue,), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                element = self._get(read_queue)
+                if element is FramePipeline._END:
+                    break
+                item, data = element
+                result = data if self.compute is None else self.compute(item, data)
+                if self.write is not None and not self._put(write_queue, (item, result)):
+                    break
+            if self.write is not None:
+                self._put(write_queue, FramePipeline._END)
+        except BaseException:
+            self.stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if self.errors:
+            raise self.errors[0]
@@ -0,0 +1,82 @@
+"""!
+Transport of large read-only arrays between processes through memory-mapped files
+
+When SharedArray.DIRECTORY is set (by the workflow Workers, in the main and in the worker processes),
+the mesh arrays of pickled Serafin headers are stored once in .npy files named after their content,
+and only lightweight handles go through the queues. The receiving processes map the files read-only,
+so that all the processes share the same pages in memory.
+"""
+
+import hashlib
+import numpy as np
+import os
+import tempfile
+import weakref
+
+
+class SharedArray:
+    """!
+    @brief Picklable handle of a read-only array stored in the shared folder
+    """
+    DIRECTORY = None  # shared folder (None disables the transport through files)
+    MIN_SIZE = 64 * 1024  # smaller arrays (in bytes) are pickled as usual
+    MEMORY_MAP = True  # map the received files (otherwise load them, so that the folder can be removed at any time)
+    _paths = {}  # id of the arrays stored or mapped by this process -> (weak reference to the array, path)
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def _register(array, path):
+        # forget the arrays which no longer exist
+        for key in [key for key, (reference, _) in SharedArray._paths.items() if reference() is None]:
+            del SharedArray._paths[key]
+        SharedArray._paths[id(array)] = (weakref.ref(array), path)
+
+    @staticmethod
+    def share(array):
+        """!
+        @brief Store an array in the shared folder (once for each content)
+        @param array <numpy.ndarray>: the array to transport
+        @return <SharedArray or numpy.ndarray>: the handle of the array, or the array itself if it is small
+                                                or if the shared folder is not set
+        """
+        if SharedArray.DIRECTORY is None or array.nbytes < SharedArray.MIN_SIZE:
+            return array
+        reference, path = SharedArray._paths.get(id(array), (None, None))
+        if reference is not None and reference() is array and os.path.dirname(path) == SharedArray.DIRECTORY:
+            return SharedArray(path)  # already stored, or mapped from the shared folder
+
+        values = np.ascontiguousarray(array)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(('%s%s' % (values.dtype.str, values.shape)).encode())
+        digest.update(values.data)
+        path = os.path.join(SharedArray.DIRECTORY, digest.hexdigest() + '.npy')
+        if not os.path.exists(path):
+            handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=SharedArray.DIRECTORY)
+            with os.fdopen(handle, 'wb') as f:
+                np.save(f, values)
+            os.replace(tmp_path, path)  # the file appears complete to the other processes
+        SharedArray._register(array, path)
+        return SharedArray(path)
+
+    @staticmethod
+    def attach(value):
+        """!
+        @brief Get back an array transported by share
+        @param value <SharedArray or numpy.ndarray>: the value returned by share
+        @return <numpy.ndarray>: the array (read-only, and memory-mapped if MEMORY_MAP, if it was stored in the folder)
+        """
+        if not isinstance(value, SharedArray):
+            return value
+        for reference, path in list(SharedArray._paths.values()):
+            array = reference()
+            if path == value.path and array is not None and not array.flags.writeable:
+                return array  # already received
+        if SharedArray.MEMORY_MAP:
+            array = np.load(value.path, mmap_mode='r')
+        else:
+            array = np.load(value.path)
+            array.setflags(write=False)
+        SharedArray._register(array, value.path)
+        return array
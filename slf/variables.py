@@ -22,8 +22,48 @@ def get_necessary_equations(known_var_IDs, needed_var_IDs, is_2d, us_equation=No
     return get_necessary_3d_equations(known_var_IDs, needed_var_IDs)
 
 
+def get_read_var_IDs(equations, selected_output_IDs, is_2d):
+    """!
+    @brief Return the variables to read in the input stream to compute the selected variables
+    @param equations <[slf.variables_utils.Equation]>: list of all equations necessary to compute selected variables
+    @param selected_output_IDs <[str]>: the short names of the selected output variables
+    @param is_2d <bool>: True if input data is 2D
+    @return <[str]>: the short names of the variables to read
+    """
+    read_var_IDs, computed_var_IDs = [], set()
+    for equation in equations:
+        for input_var in equation.input:
+            input_var_ID = input_var.ID()
+            if input_var_ID not in computed_var_IDs and input_var_ID[:5] != 'ROUSE':
+                read_var_IDs.append(input_var_ID)
+                computed_var_IDs.add(input_var_ID)
+        if is_2d and equation.output.ID() == 'ROUSE':
+            computed_var_IDs.add(equation.input[0].ID())
+        else:
+            computed_var_IDs.add(equation.output.ID())
+    return read_var_IDs + [var_ID for var_ID in selected_output_IDs if var_ID not in computed_var_IDs]
+
+
+def read_values_in_frame(input_serafin, time_index, read_var_IDs, iplan=None):
+    """!
+    @brief Read all the variables needed in a single time frame at once
+    @param input_serafin <Serafin.Read>: input stream for reading necessary variables
+    @param time_index <int>: the position of time frame to read
+    @param read_var_IDs <[str]>: the short names of the variables to read (see get_read_var_IDs)
+    @param iplan <int>: 1-based index of the layer to read (3D input only, by default all the nodes are read)
+    @return <dict>: the values of the variables read in the input stream
+    """
+    if not read_var_IDs:
+        return {}
+    if iplan is None:
+        values = input_serafin.read_vars_in_frames([time_index], read_var_IDs)[0]
+    else:
+        values = input_serafin.read_vars_in_frames_at_layer([time_index], read_var_IDs, iplan)[0]
+    return dict(zip(read_var_IDs, values))
+
+
 def do_calculations_in_frame(equations, input_serafin, time_index, selected_output_IDs,
-                             output_float_type, is_2d, us_equation):
+                             output_float_type, is_2d, us_equation, iplan=None, values=None):
     """!
     @brief Return the selected 2D variables values in a single time frame
     @param equations <[slf.variables_utils.Equation]>: list of all equations necessary to compute selected variables
@@ -33,17 +73,17 @@ def do_calculations_in_frame(equations, input_serafin, time_index, selected_outp
     @param output_float_type <numpy.dtype>: float32 or float64 according to the output file type
     @param is_2d <bool>: True if input data is 2D
     @param us_equation <slf.variables_utils.Equation>: user-specified friction law equation
+    @param iplan <int>: 1-based index of the layer to compute (3D input only, by default all the nodes are computed)
+    @param values <dict>: the values already read by read_values_in_frame (by default they are read here)
     @return <numpy.ndarray>: the values of the selected output variables
     """
-    computed_values = {}
+    if values is None:
+        values = read_values_in_frame(input_serafin, time_index,
+                                      get_read_var_IDs(equations, selected_output_IDs, is_2d), iplan)
+    computed_values = dict(values)
     for equation in equations:
         input_var_IDs = list(map(lambda x: x.ID(), equation.input))
 
-        # read (if needed) input variables values
-        for input_var_ID in input_var_IDs:
-            if input_var_ID not in computed_values and input_var_ID[:5] != 'ROUSE':
-                computed_values[input_var_ID] = input_serafin.read_var_in_frame(time_index, input_var_ID)
-
         if is_2d:
             # handle the special case for US (user-specified equation)
             if equation.output.ID() == 'US':
@@ -60,15 +100,9 @@ def do_calculations_in_frame(equations, input_serafin, time_index, selected_outp
         computed_values[equation.output.ID()] = output_values
 
     # reconstruct the output values array in the order of the selected IDs
-    nb_selected_vars = len(selected_output_IDs)
-
-    output_values = np.empty((nb_selected_vars, input_serafin.header.nb_nodes),
-                             dtype=output_float_type)
-    for i in range(nb_selected_vars):
-        var_ID = selected_output_IDs[i]
-        if var_ID not in computed_values:
-            output_values[i, :] = input_serafin.read_var_in_frame(time_index, var_ID)
-        else:
-            output_values[i, :] = computed_values[var_ID]
+    nb_nodes = input_serafin.header.nb_nodes if iplan is None else input_serafin.header.nb_nodes_2d
+    output_values = np.empty((len(selected_output_IDs), nb_nodes), dtype=output_float_type)
+    for i, var_ID in enumerate(selected_output_IDs):
+        output_values[i, :] = computed_values[var_ID]
     return output_values
 
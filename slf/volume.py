@@ -38,12 +38,13 @@ class TruncatedTriangularPrisms(Mesh2D):
         @param polygon <geom.geometry.Polyline>: A polygon
         @return <numpy.1D-array>: The weight carried by the triangle nodes
         """
-        potential_elements = self.get_intersecting_elements(polygon.bounds())
+        potential_elements = self.get_intersecting_element_numbers(polygon.bounds())
         weight = np.zeros((self.nb_points,), dtype=np.float64)
-        for i, j, k in potential_elements:
+        for element in potential_elements:
+            i, j, k = self.ikle[element]
             t = self.triangles[i, j, k]
             if polygon.contains(t):
-                weight[[i, j, k]] += t.area
+                weight[[i, j, k]] += self.areas[element]
         return weight / 3.0
 
     def polygon_intersection(self, polygon):
@@ -52,13 +53,14 @@ class TruncatedTriangularPrisms(Mesh2D):
         @param polygon <geom.geometry.Polyline>: A polygon
         @return <numpy.1D-array, dict>: The weight carried by the triangle nodes, and the dictionary of tuple (area, centroid value) for boundary triangles
         """
-        potential_elements = self.get_intersecting_elements(polygon.bounds())
+        potential_elements = self.get_intersecting_element_numbers(polygon.bounds())
         weight = np.zeros((self.nb_points,), dtype=np.float64)
         triangle_polygon_intersection = {}
-        for i, j, k in potential_elements:
+        for element in potential_elements:
+            i, j, k = self.ikle[element]
             t = self.triangles[i, j, k]
             if polygon.contains(t):
-                weight[[i, j, k]] += t.area
+                weight[[i, j, k]] += self.areas[element]
             else:
                 is_intersected, intersection = polygon.polygon_intersection(t)
                 if is_intersected:
@@ -73,15 +75,16 @@ class TruncatedTriangularPrisms(Mesh2D):
         @param polygon <geom.geometry.Polyline>: A polygon
         @return <dict, dict>: The dictionaries of all triangles contained in polygon, and of tuples (base triangle, intersection) for boundary triangles
         """
-        potential_elements = self.get_intersecting_elements(polygon.bounds())
+        potential_elements = self.get_intersecting_element_numbers(polygon.bounds())
         weight = np.zeros((self.nb_points,), dtype=np.float64)
         triangles = {}
         triangle_polygon_net_intersection = {}
         triangle_polygon_intersection = {}
-        for i, j, k in potential_elements:
+        for element in potential_elements:
+            i, j, k = self.ikle[element]
             t = self.triangles[i, j, k]
             if polygon.contains(t):
-                area = t.area
+                area = self.areas[element]
                 vertices = tuple(map(np.array, list(t.exterior.coords)[:-1]))
                 triangles[i, j, k] = (vertices, area)
                 weight[[i, j, k]] += area
@@ -89,7 +92,7 @@ class TruncatedTriangularPrisms(Mesh2D):
                 is_intersected, intersection = polygon.polygon_intersection(t)
                 if is_intersected:
                     vertices = tuple(map(np.array, list(t.exterior.coords)[:-1]))
-                    area = t.area
+                    area = self.areas[element]
                     centroid = intersection.centroid
                     interpolator = Interpolator(t).get_interpolator_at(centroid.x, centroid.y)
                     triangle_polygon_net_intersection[i, j, k] = (intersection.area, interpolator)
@@ -276,23 +279,26 @@ class VolumeCalculator:
         """!
         Read variable values in a single frame, depending on the first/second variable choice
         """
-        values = self.input_stream.read_var_in_frame(time_index, self.var_ID)
-        if self.second_var_ID is not None:
+        if self.second_var_ID is None or self.second_var_ID == VolumeCalculator.INIT_VALUE:
+            values = self.input_stream.read_vars_in_frames([time_index], [self.var_ID])[0, 0]
             if self.second_var_ID == VolumeCalculator.INIT_VALUE:
                 values -= self.init_values
-            else:
-                second_values = self.input_stream.read_var_in_frame(time_index, self.second_var_ID)
-                values -= second_values
+        else:
+            values, second_values = self.input_stream.read_vars_in_frames([time_index],
+                                                                          [self.var_ID, self.second_var_ID])[0]
+            values -= second_values
         return values
 
-    def run(self, format_string='{0:.6f}'):
+    def run(self, format_string='{0:.6f}', time_indices=None):
         """!
         Separate the major part of the computation, allowing a GUI override
         """
         result = []
-        for time_index in self.time_indices:
+        time_indices = self.time_indices if time_indices is None else time_indices
+        # the frames are read in advance by a pool of threads
+        for time_index, values in zip(time_indices,
+                                      self.input_stream.map_frames(self.read_values_in_frame, time_indices)):
             i_result = [str(self.input_stream.time[time_index])]
-            values = self.read_values_in_frame(time_index)
 
             for j in range(len(self.polygons)):
                 weight = self.weights[j]
@@ -305,6 +311,15 @@ class VolumeCalculator:
             result.append(i_result)
         return result
 
+    def update(self, time_indices, format_string='{0:.6f}'):
+        """!
+        @brief Compute the results in additional frames (e.g. new frames of an input stream in follow mode)
+        @param time_indices <[int]>: 0-based indices of the additional frames
+        @return <list>: the result rows of the additional frames
+        """
+        self.time_indices = list(self.time_indices) + list(time_indices)
+        return self.run(format_string, time_indices)
+
     def get_csv_header(self):
         header = ['time']
         if self.volume_type == VolumeCalculator.POSITIVE:
@@ -0,0 +1,90 @@
+"""!
+Unittest for slf.archive module
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from slf import archive, Serafin
+from tests.test_serafin import TestHeader, TestHeader3D
+
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.paths = []
+        values = np.random.RandomState(42).uniform(-3, 3, (12, 3, 4))
+        values_3d = np.random.RandomState(7).uniform(-3, 3, (5, 2, 12))
+        for name, header, header_values in [('double', TestHeader(True), values),
+                                            ('single', TestHeader(False), values),
+                                            ('3d', TestHeader3D(), values_3d)]:
+            path = os.path.join(self.folder, '%s.slf' % name)
+            with Serafin.Write(path, 'fr') as f:
+                f.write_header(header)
+                for time, vals in enumerate(header_values):
+                    f.write_entire_frame(header, 0.1 * time, vals)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_read(self):
+        for path in self.paths:
+            for codec, shuffle in [(archive.ZLIB, True), (archive.ZLIB, False), (archive.LZMA, True)]:
+                archive_path = path + 'z'
+                archive.convert(path, archive_path, 'fr', codec=codec, shuffle=shuffle)
+                self.assertTrue(archive.is_archive(archive_path))
+                self.assertFalse(archive.is_archive(path))
+                with Serafin.Read(path, 'fr') as f, Serafin.Read(archive_path, 'fr') as g:
+                    self.assertIsInstance(g, archive.Read)
+                    f.read_header()
+                    f.get_time()
+                    g.read_header()
+                    g.get_time()
+                    self.assertEqual(g.header.nb_frames, f.header.nb_frames)
+                    self.assertEqual(g.header.var_IDs, f.header.var_IDs)
+                    self.assertTrue(np.array_equal(g.header.ikle_2d, f.header.ikle_2d))
+                    self.assertEqual(g.time, f.time)
+                    for time_index in reversed(range(f.header.nb_frames)):
+                        for var_ID in f.header.var_IDs:
+                            values = g.read_var_in_frame(time_index, var_ID)
+                            self.assertEqual(values.dtype, f.header.np_float_type)
+                            self.assertTrue(np.array_equal(values, f.read_var_in_frame(time_index, var_ID)))
+                    var_IDs = f.header.var_IDs[::-1]
+                    self.assertTrue(np.array_equal(g.read_vars_at_nodes([3, 1], var_IDs, [2, 0]),
+                                                   f.read_vars_at_nodes([3, 1], var_IDs, [2, 0])))
+                    self.assertRaises(Serafin.SerafinRequestError, g.read_var_in_frame, f.header.nb_frames, var_IDs[0])
+                os.remove(archive_path)
+
+    def test_flags(self):
+        archive_path = self.paths[2] + 'z'
+        archive.convert(self.paths[2], archive_path, 'fr')
+        for flags in [{'memory_map': True}, {'follow': True}, {'recover': True}]:
+            self.assertRaises(Serafin.SerafinRequestError, Serafin.Read, archive_path, 'fr', **flags)
+
+        # lazy mode: the mesh blocks are decoded from the archive on first access
+        with Serafin.Read(self.paths[2], 'fr') as f, Serafin.Read(archive_path, 'fr', lazy=True) as g:
+            self.assertIsInstance(g, archive.Read)
+            self.assertTrue(g.lazy)
+            f.read_header()
+            g.read_header()
+            self.assertIsNotNone(g.header.mesh_loader)
+            self.assertIsNone(g.header._x)
+            for name in Serafin.SerafinHeader.MESH_ARRAYS:
+                self.assertTrue(np.array_equal(getattr(g.header, name), getattr(f.header, name)))
+            g.get_time()
+            self.assertTrue(np.array_equal(g.read_var_in_frame(4, 'Z'), f.read_var_in_frame(4, 'Z')))
+
+    def test_compression(self):
+        path = os.path.join(self.folder, 'smooth.slf')
+        header = TestHeader()
+        header.nb_var, header.var_names, header.var_units = 1, header.var_names[:1], header.var_units[:1]
+        with Serafin.Write(path, 'fr') as f:
+            f.write_header(header)
+            for time in range(50):
+                f.write_entire_frame(header, time, np.full((1, 4), 1.5))
+        archive.convert(path, path + 'z', 'fr')
+        self.assertLess(os.path.getsize(path + 'z'), os.path.getsize(path))
@@ -0,0 +1,72 @@
+"""!
+Unittest for slf.concatenation module
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from slf import archive, concatenation, Serafin
+from tests.test_serafin import TestHeader
+
+
+class ConcatenationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.values = np.random.RandomState(42).uniform(-3, 3, (12, 3, 4))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, name, header, time_indices):
+        path = os.path.join(self.folder, name)
+        with Serafin.Write(path, 'fr') as f:
+            f.write_header(header)
+            for time_index in time_indices:
+                f.write_entire_frame(header, 0.5 * time_index, self.values[time_index])
+        return path
+
+    def test_concatenate(self):
+        for double_precision in (True, False):
+            header = TestHeader(double_precision)
+            reference = self.write('reference.slf', header, range(12))
+            # the restart runs repeat their first frame(s)
+            runs = [self.write('run1.slf', header, range(6)), self.write('run2.slf', header, range(5, 9)),
+                    self.write('run3.slf', header, range(7, 12))]
+            archive.convert(runs[1], runs[1] + 'z', 'fr')
+            for inputs in (runs, [runs[0], runs[1] + 'z', runs[2]]):
+                output = os.path.join(self.folder, 'output.slf')
+                self.assertEqual(concatenation.concatenate(inputs, output, 'fr'), [6, 3, 3])
+                with open(output, 'rb') as f, open(reference, 'rb') as g:
+                    self.assertEqual(f.read(), g.read())
+
+    def test_time_reset(self):
+        header = TestHeader()
+        # only the frames repeated at the join are dropped, even if the time goes back afterwards
+        inputs = [self.write('run1.slf', header, range(6)), self.write('run2.slf', header, [5, 6, 7, 3, 8])]
+        output = os.path.join(self.folder, 'output.slf')
+        self.assertEqual(concatenation.concatenate(inputs, output, 'fr'), [6, 4])
+        with Serafin.Read(output, 'fr') as f:
+            f.read_header()
+            f.get_time()
+            self.assertEqual(f.time, [0, 0.5, 1, 1.5, 2, 2.5, 3, 3.5, 1.5, 4])
+            self.assertTrue(np.array_equal(f.read_var_in_frame(8, 'U'), self.values[3, 0]))
+
+        # a restart run whose time starts again from 0
+        os.remove(output)
+        inputs = [self.write('run3.slf', header, range(6)), self.write('run4.slf', header, range(4))]
+        with self.assertRaises(Serafin.SerafinValidationError):
+            concatenation.concatenate(inputs, output, 'fr')
+
+    def test_incompatible(self):
+        header = TestHeader()
+        other_header = TestHeader()
+        other_header.x = [3, 0, 6, 4]
+        inputs = [self.write('run1.slf', header, range(6)), self.write('run2.slf', other_header, range(6, 12))]
+        with self.assertRaises(Serafin.SerafinValidationError):
+            concatenation.concatenate(inputs, os.path.join(self.folder, 'output.slf'), 'fr')
+        inputs[1] = self.write('run3.slf', TestHeader(False), range(6, 12))
+        with self.assertRaises(Serafin.SerafinValidationError):
+            concatenation.concatenate(inputs, os.path.join(self.folder, 'output.slf'), 'fr')
@@ -0,0 +1,69 @@
+"""!
+Unittest for slf.dataset module
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from slf import archive, Serafin
+from slf.dataset import Dataset
+from tests.test_serafin import TestHeader, TestHeader3D
+
+
+class DatasetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.values = np.random.RandomState(42).uniform(-3, 3, (12, 3, 4))
+        self.values_3d = np.random.RandomState(7).uniform(-3, 3, (5, 2, 12))
+        self.paths = []
+        for name, header, values in [('2d', TestHeader(), self.values), ('3d', TestHeader3D(), self.values_3d)]:
+            path = os.path.join(self.folder, '%s.slf' % name)
+            with Serafin.Write(path, 'fr') as f:
+                f.write_header(header)
+                for time, vals in enumerate(values):
+                    f.write_entire_frame(header, time, vals)
+            self.paths.append(path)
+        archive.convert(self.paths[0], self.paths[0] + 'z', 'fr')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_2d(self):
+        for path, memory_map in [(self.paths[0], False), (self.paths[0], True), (self.paths[0] + 'z', False)]:
+            with Dataset(path, 'fr', memory_map=memory_map) as ds:
+                self.assertEqual(ds.shape, (12, 3, 4))
+                self.assertEqual(ds.var_IDs, ['U', 'V', 'H'])
+                self.assertEqual(ds['H'].shape, (12, 4))
+                for key, expected in [(ds['H'][2:9:3, [3, 0, 3]], self.values[2:9:3, 2][:, [3, 0, 3]]),
+                                      (ds['H'][-1], self.values[-1, 2]),
+                                      (ds['U'][4, 1], self.values[4, 0, 1]),
+                                      (ds[-1, ['V', 'U']], self.values[-1, [1, 0]]),
+                                      (ds[:, 'H', 1:3], self.values[:, 2, 1:3]),
+                                      (ds[[0, 5], 1:, 2], self.values[[0, 5], 1:, 2]),
+                                      (ds[3], self.values[3]),
+                                      (ds[:], self.values)]:
+                    self.assertEqual(key.shape, expected.shape)
+                    self.assertTrue(np.array_equal(key, expected))
+                    self.assertEqual(key.dtype, np.float64)
+                with self.assertRaises(Serafin.SerafinRequestError):
+                    ds['W']
+                with self.assertRaises(IndexError):
+                    ds['H'][12]
+                with self.assertRaises(IndexError):
+                    ds['H'][0, 0, 0]
+
+    def test_3d(self):
+        values = self.values_3d.reshape(5, 2, 3, 4)
+        with Dataset(self.paths[1], 'fr') as ds:
+            self.assertEqual(ds.shape, (5, 2, 3, 4))
+            self.assertEqual(ds['U'].shape, (5, 3, 4))
+            for key, expected in [(ds[:, 'U', 1], values[:, 1, 1]),
+                                  (ds['U'][1:4, -1], values[1:4, 1, -1]),
+                                  (ds['Z'][0, :, [0, 3]], values[0, 0][:, [0, 3]]),
+                                  (ds['Z'][2, 0:2, 1], values[2, 0, 0:2, 1]),
+                                  (ds[4], values[4])]:
+                self.assertEqual(key.shape, expected.shape)
+                self.assertTrue(np.array_equal(key, expected))
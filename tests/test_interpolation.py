@@ -0,0 +1,74 @@
+"""!
+Unittest for slf.interpolation module
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.util import write_synthetic_slf
+from slf import Serafin
+from slf.interpolation import Interpolator, MeshInterpolator
+
+
+class MeshInterpolatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        path = os.path.join(self.folder, 'mesh.slf')
+        write_synthetic_slf(path, 400, 0, 1)
+        with Serafin.Read(path, 'fr') as f:
+            f.read_header()
+            self.mesh = MeshInterpolator(f.header, True)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_locate_points(self):
+        mesh = self.mesh
+        random = np.random.RandomState(1)
+        points = np.concatenate([random.uniform(-2, 22, (200, 2)), mesh.points[:30], [[-1, -1], [100, 5]]])
+        mesh.LOCATION_CHUNK_SIZE = 128  # several chunks
+        elements, coords = mesh.locate_points(points)
+        self.assertEqual(elements.shape, (len(points),))
+        self.assertEqual(coords.shape, (len(points), 3))
+
+        interpolators = [Interpolator(mesh.triangles[tuple(nodes)]) for nodes in mesh.ikle]
+        for (x, y), element, coord in zip(points, elements, coords):
+            containing = [e for e, interpolator in enumerate(interpolators) if interpolator.is_in_triangle(x, y)[0]]
+            if not containing:
+                self.assertEqual(element, -1)
+                self.assertTrue(np.all(np.isnan(coord)))
+                continue
+            self.assertIn(element, containing)
+            expected = interpolators[element].get_interpolator_at(x, y)
+            self.assertTrue(np.allclose(coord, expected))
+            self.assertAlmostEqual(coord.dot(mesh.x[mesh.ikle[element]]), x, places=4)
+            self.assertAlmostEqual(coord.dot(mesh.y[mesh.ikle[element]]), y, places=4)
+
+        is_inside, point_interpolators = mesh.get_point_interpolators(list(map(tuple, points)))
+        self.assertEqual(is_inside, (elements >= 0).tolist())
+        for element, coord, point_interpolator in zip(elements, coords, point_interpolators):
+            if element < 0:
+                self.assertIsNone(point_interpolator)
+            else:
+                self.assertEqual(point_interpolator[0], tuple(mesh.ikle[element]))
+                self.assertTrue(np.array_equal(point_interpolator[1], coord))
+
+    def test_walk_to_points(self):
+        mesh = self.mesh
+        line = np.column_stack((np.linspace(-1, 21, 300), np.linspace(0.5, 18.3, 300)))
+        points = np.concatenate([line, mesh.points, [[100, 100]], mesh.points[::-7]])
+        mesh.MAX_WALK_STEPS = 5  # some points are located with the grid
+        elements, coords = mesh.walk_to_points(points)
+        expected_elements, expected_coords = mesh.locate_points(points)
+        self.assertTrue(np.array_equal(elements >= 0, expected_elements >= 0))
+        inside = elements >= 0
+        self.assertTrue(np.all(coords[inside] >= 0) and np.all(coords[inside] <= 1))
+        self.assertTrue(np.all(np.isnan(coords[~inside])))
+        self.assertTrue(np.allclose(coords[inside].sum(axis=1), 1))
+        self.assertTrue(np.allclose(np.sum(coords[inside] * mesh.x[mesh.ikle[elements[inside]]], axis=1),
+                                    points[inside, 0], atol=1e-4))
+        self.assertTrue(np.allclose(np.sum(coords[inside] * mesh.y[mesh.ikle[elements[inside]]], axis=1),
+                                    points[inside, 1], atol=1e-4))
@@ -0,0 +1,128 @@
+"""!
+Unittest for slf.mesh2D module
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.util import write_synthetic_slf
+from slf import Serafin
+from slf.mesh2D import Mesh2D
+from slf.mesh_cache import MeshCache
+
+
+class Mesh2DTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        path = os.path.join(self.folder, 'mesh.slf')
+        write_synthetic_slf(path, 400, 0, 1)
+        with Serafin.Read(path, 'fr') as f:
+            f.read_header()
+            self.header = f.header
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_index(self):
+        mesh = Mesh2D(self.header, True)
+        self.assertEqual(len(mesh.triangles), mesh.nb_triangles)
+        self.assertEqual(list(mesh.triangles)[5], tuple(mesh.ikle[5]))
+        self.assertEqual(mesh.triangles.polygons, {})  # no triangle is created by the index construction
+
+        x, y = mesh.x[mesh.ikle], mesh.y[mesh.ikle]
+        for bounding_box in [(2.5, 3.5, 2.5, 3.5), (0, 0, 4.2, 1.1), (-5, -5, -1, -1), (3, 3, 3, 3)]:
+            left, bottom, right, top = bounding_box
+            expected = np.flatnonzero((x.min(axis=1) <= right) & (x.max(axis=1) >= left)
+                                      & (y.min(axis=1) <= top) & (y.max(axis=1) >= bottom))
+            elements = mesh.get_intersecting_elements(bounding_box)
+            self.assertEqual(sorted(elements), sorted(tuple(mesh.ikle[element]) for element in expected))
+            for i, j, k in elements:
+                self.assertEqual(mesh.triangles[i, j, k].bounds,
+                                 (min(mesh.x[[i, j, k]]), min(mesh.y[[i, j, k]]),
+                                  max(mesh.x[[i, j, k]]), max(mesh.y[[i, j, k]])))
+
+    def test_topology(self):
+        mesh = Mesh2D(self.header)
+        topology = mesh.topology
+        self.assertIs(mesh.topology, topology)
+
+        expected_edges = {tuple(sorted((nodes[a], nodes[b]))) for nodes in mesh.ikle.tolist()
+                          for a, b in [(1, 2), (2, 0), (0, 1)]}
+        self.assertEqual(set(map(tuple, topology.edges.tolist())), expected_edges)
+        self.assertEqual(len(topology.edges), len(expected_edges))
+        # Euler characteristic of a mesh without hole
+        self.assertEqual(mesh.nb_points - len(topology.edges) + mesh.nb_triangles, 1)
+
+        for element, nodes in enumerate(mesh.ikle.tolist()):
+            for m in range(3):
+                edge = topology.edge_elements[topology.element_edges[element, m]]
+                self.assertIn(element, edge)
+                self.assertEqual(set(topology.edges[topology.element_edges[element, m]]),
+                                 {nodes[(m + 1) % 3], nodes[(m + 2) % 3]})
+                neighbor = topology.neighbors[element, m]
+                self.assertEqual(neighbor, edge[1] if edge[0] == element else edge[0])
+                if neighbor >= 0:
+                    self.assertEqual(len(set(nodes) & set(mesh.ikle[neighbor].tolist())), 2)
+
+        boundary_nodes = set(topology.edges[topology.boundary_edges].ravel().tolist())
+        on_frame = set(np.flatnonzero((mesh.x == mesh.x.min()) | (mesh.x == mesh.x.max())
+                                      | (mesh.y == mesh.y.min()) | (mesh.y == mesh.y.max())).tolist())
+        self.assertEqual(boundary_nodes, on_frame)
+        loops = topology.boundary_loops
+        self.assertEqual(len(loops), 1)
+        self.assertEqual(set(loops[0].tolist()), on_frame)
+        self.assertEqual(len(loops[0]), len(topology.boundary_edges))
+
+    def test_cache(self):
+        directory = os.path.join(self.folder, 'cache')
+        other_path = os.path.join(self.folder, 'other.slf')
+        write_synthetic_slf(other_path, 100, 0, 1)
+        with Serafin.Read(other_path, 'fr') as f:
+            f.read_header()
+            other_header = f.header
+        previous = MeshCache.DIRECTORY, MeshCache.MAX_SIZE
+        MeshCache.DIRECTORY = directory
+        try:
+            reference = Mesh2D(self.header, True)  # a new mesh is added to the cache
+            self.assertEqual(os.listdir(directory), ['v%d-%s' % (MeshCache.VERSION, reference.fingerprint)])
+
+            entry = os.path.join(directory, os.listdir(directory)[0])
+            contents = {}
+            for file_name in os.listdir(entry):
+                with open(os.path.join(entry, file_name), 'rb') as f:
+                    contents[file_name] = f.read()
+
+            mesh = Mesh2D(self.header, True)  # read from the cache
+            self.assertIsNotNone(mesh._topology)
+            self.assertAlmostEqual(mesh.areas.sum(), (mesh.x.max() - mesh.x.min()) * (mesh.y.max() - mesh.y.min()),
+                                   places=3)
+            self.assertTrue(np.array_equal(mesh.bounding_boxes, reference.bounding_boxes))
+            self.assertTrue(np.array_equal(mesh.topology.neighbors, reference.topology.neighbors))
+            for bounding_box in [(2.5, 3.5, 2.5, 3.5), (0, 0, 4.2, 1.1), (-5, -5, -1, -1)]:
+                self.assertEqual(sorted(mesh.get_intersecting_elements(bounding_box)),
+                                 sorted(reference.get_intersecting_elements(bounding_box)))
+
+            # the index is queried through a private copy, removed with the index
+            for file_name, content in contents.items():
+                with open(os.path.join(entry, file_name), 'rb') as f:
+                    self.assertEqual(f.read(), content)
+            private_folder = os.path.dirname(mesh.index.properties.filename)
+            self.assertNotEqual(private_folder, entry)
+            del mesh
+            self.assertFalse(os.path.exists(private_folder))
+
+            # the least recently used mesh is removed when the cache is full, unless it was used recently
+            other_fingerprint = Mesh2D(other_header).fingerprint
+            self.assertNotEqual(other_fingerprint, reference.fingerprint)
+            MeshCache.MAX_SIZE = 1
+            Mesh2D(other_header, True)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            shutil.rmtree(os.path.join(directory, 'v%d-%s' % (MeshCache.VERSION, other_fingerprint)))
+            os.utime(entry, (0, 0))
+            Mesh2D(other_header, True)
+            self.assertEqual(os.listdir(directory), ['v%d-%s' % (MeshCache.VERSION, other_fingerprint)])
+        finally:
+            MeshCache.DIRECTORY, MeshCache.MAX_SIZE = previous
@@ -0,0 +1,101 @@
+"""!
+Unittest for slf.misc module
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from slf import Serafin
+from slf.misc import MAX, MEAN, MIN, ScalarMaxMinMeanCalculator
+
+
+class TestHeader:
+    def __init__(self):
+        self.title = bytes('DUMMY SERAFIN', 'utf-8').ljust(72)
+        self.file_type = bytes('SERAFIND', 'utf-8').ljust(8)
+        self.float_type = 'd'
+        self.float_size = 8
+
+        self.nb_var = 2
+        self.nb_var_quadratic = 0
+        self.var_names = [bytes('VITESSE U', 'utf-8').ljust(16), bytes('HAUTEUR D\'EAU', 'utf-8').ljust(16)]
+        self.var_units = [bytes('M/S', 'utf-8').ljust(16), bytes('M', 'utf-8').ljust(16)]
+        self.params = [0] * 10
+
+        self.nb_elements = 3
+        self.nb_nodes = 4
+        self.nb_nodes_per_elem = 3
+
+        self.ipobo = [0] * self.nb_nodes
+
+        self.ikle = [1, 2, 4, 1, 3, 4, 2, 3, 4]
+        self.x = [3, 0, 6, 3]
+        self.y = [6, 0, 0, 2]
+
+
+class MaxMinMeanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'dummy.slf')
+        self.values = np.random.RandomState(3).uniform(-3, 3, (11, 2, 4))
+        header = TestHeader()
+        with Serafin.Write(self.path, 'fr') as f:
+            f.write_header(header)
+            for time, values in enumerate(self.values):
+                f.write_entire_frame(header, time, values)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_merge(self):
+        scalars = [('U', 'VITESSE U', 'M/S'), ('H', 'HAUTEUR D\'EAU', 'M')]
+        expected = {MAX: self.values.max(axis=0), MIN: self.values.min(axis=0), MEAN: self.values.mean(axis=0)}
+        with Serafin.Read(self.path, 'fr') as f:
+            f.read_header()
+            f.get_time()
+            time_indices = list(range(11))
+            for operator in (MAX, MIN, MEAN):
+                calculator = ScalarMaxMinMeanCalculator(operator, f, scalars, time_indices)
+                calculator.run()
+                self.assertTrue(np.allclose(calculator.finishing_up(), expected[operator]))
+
+                # running values computed on chunks of frames (e.g. by several processes), then merged
+                merged = ScalarMaxMinMeanCalculator(operator, f, scalars, time_indices)
+                for chunk in (time_indices[:4], time_indices[4:7], time_indices[7:]):
+                    chunk_calculator = ScalarMaxMinMeanCalculator(operator, f, scalars, chunk)
+                    chunk_calculator.run()
+                    merged.merge(chunk_calculator.current_values)
+                self.assertTrue(np.allclose(merged.finishing_up(), calculator.finishing_up()))
+
+    def test_update(self):
+        scalars = [('U', 'VITESSE U', 'M/S'), ('H', 'HAUTEUR D\'EAU', 'M')]
+        with Serafin.Read(self.path, 'fr') as f:
+            f.read_header()
+            header_size, frame_size = f.header.header_size, f.header.frame_size
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        path = os.path.join(self.folder, 'running.slf')
+        for operator in (MAX, MIN, MEAN):
+            with open(path, 'wb') as f:
+                f.write(content[:header_size + 4 * frame_size + frame_size // 2])  # last frame is being written
+            with Serafin.Read(path, 'fr', follow=True) as f:
+                f.read_header()
+                f.get_time()
+                calculator = ScalarMaxMinMeanCalculator(operator, f, scalars, list(range(f.header.nb_frames)))
+                calculator.run()
+                for end in (7, 11):  # new frames written by the running computation
+                    with open(path, 'ab') as g:
+                        g.write(content[os.path.getsize(path):header_size + end * frame_size])
+                    calculator.update(f.update_frames())
+                self.assertEqual(calculator.time_indices, list(range(11)))
+
+                expected = ScalarMaxMinMeanCalculator(operator, f, scalars, list(range(11)))
+                expected.run()
+                self.assertTrue(np.allclose(calculator.finishing_up(), expected.finishing_up()))
+
+
+if __name__ == '__main__':
+    unittest.main()
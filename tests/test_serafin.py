@@ -0,0 +1,653 @@
+"""!
+Unittest for slf.Serafin module
+"""
+
+import numpy as np
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+
+from slf import Serafin
+from slf.datatypes import SerafinData
+from slf.pipeline import FramePipeline
+from slf.shared_arrays import SharedArray
+from slf.variables import do_calculations_in_frame, get_necessary_equations, get_read_var_IDs, \
+    read_values_in_frame
+
+
+class TestHeader:
+    def __init__(self, double_precision=True):
+        self.title = bytes('DUMMY SERAFIN', 'utf-8').ljust(72)
+        if double_precision:
+            self.file_type = bytes('SERAFIND', 'utf-8').ljust(8)
+            self.float_type = 'd'
+            self.float_size = 8
+        else:
+            self.file_type = bytes('SERAFIN', 'utf-8').ljust(8)
+            self.float_type = 'f'
+            self.float_size = 4
+
+        self.nb_var = 3
+        self.nb_var_quadratic = 0
+        self.var_names = [bytes('VITESSE U', 'utf-8').ljust(16), bytes('VITESSE V', 'utf-8').ljust(16),
+                          bytes('HAUTEUR D\'EAU', 'utf-8').ljust(16)]
+        self.var_units = [bytes('M/S', 'utf-8').ljust(16), bytes('M/S', 'utf-8').ljust(16),
+                          bytes('M', 'utf-8').ljust(16)]
+        self.params = [0] * 10
+
+        self.nb_elements = 3
+        self.nb_nodes = 4
+        self.nb_nodes_per_elem = 3
+
+        self.ipobo = [0] * self.nb_nodes
+
+        self.ikle = [1, 2, 4, 1, 3, 4, 2, 3, 4]
+        self.x = [3, 0, 6, 3]
+        self.y = [6, 0, 0, 2]
+
+
+class TestHeader3D(TestHeader):
+    def __init__(self, double_precision=True):
+        super().__init__(double_precision)
+        self.nb_var = 2
+        self.var_names = [bytes('COTE Z', 'utf-8').ljust(16), bytes('VITESSE U', 'utf-8').ljust(16)]
+        self.var_units = [bytes('M', 'utf-8').ljust(16), bytes('M/S', 'utf-8').ljust(16)]
+        self.nb_planes = 3
+        self.params = [0] * 10
+        self.params[6] = self.nb_planes
+
+        nb_nodes_2d, ikle_2d = self.nb_nodes, np.array(self.ikle).reshape(-1, 3)
+        self.nb_elements = ikle_2d.shape[0] * (self.nb_planes - 1)
+        self.nb_nodes = nb_nodes_2d * self.nb_planes
+        self.nb_nodes_per_elem = 6
+        self.ipobo = [0] * self.nb_nodes
+        self.ikle = list(np.vstack([np.hstack((ikle_2d + i * nb_nodes_2d, ikle_2d + (i+1) * nb_nodes_2d))
+                                    for i in range(self.nb_planes - 1)]).flatten())
+        self.x = self.x * self.nb_planes
+        self.y = self.y * self.nb_planes
+
+
+class SerafinTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.paths = {}
+        self.values = np.random.RandomState(42).uniform(-3, 3, (12, 3, 4))
+        for double_precision in (True, False):
+            path = os.path.join(self.folder, 'dummy_%s.slf' % ('double' if double_precision else 'single'))
+            header = TestHeader(double_precision)
+            with Serafin.Write(path, 'fr') as f:
+                f.write_header(header)
+                for time, vals in enumerate(self.values):
+                    f.write_entire_frame(header, 0.5 * time, vals)
+            self.paths[double_precision] = path
+
+        self.path_3d = os.path.join(self.folder, 'dummy_3d.slf')
+        header = TestHeader3D()
+        self.values_3d = np.random.RandomState(7).uniform(-3, 3, (5, 2, header.nb_nodes))
+        with Serafin.Write(self.path_3d, 'fr') as f:
+            f.write_header(header)
+            for time, vals in enumerate(self.values_3d):
+                f.write_entire_frame(header, time, vals)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_read_var_in_frame(self):
+        for double_precision, path in self.paths.items():
+            dtype = np.float64 if double_precision else np.float32
+            with Serafin.Read(path, 'fr') as f:
+                f.read_header()
+                f.get_time()
+                self.assertEqual(f.header.nb_frames, 12)
+                self.assertEqual(f.header.var_IDs, ['U', 'V', 'H'])
+                for time_index in range(12):
+                    for pos_var, var_ID in enumerate(f.header.var_IDs):
+                        values = f.read_var_in_frame(time_index, var_ID)
+                        self.assertEqual(values.dtype, dtype)
+                        self.assertTrue(np.array_equal(values, self.values[time_index, pos_var].astype(dtype)))
+
+    def test_memory_map(self):
+        for path in self.paths.values():
+            with Serafin.Read(path, 'fr') as f, Serafin.Read(path, 'fr', memory_map=True) as g:
+                f.read_header()
+                g.read_header()
+                for time_index in range(12):
+                    view = g.read_frame_as_view(time_index)
+                    self.assertFalse(view.flags.writeable)
+                    self.assertEqual(view.shape, (3, 4))
+                    for pos_var, var_ID in enumerate(f.header.var_IDs):
+                        expected = f.read_var_in_frame(time_index, var_ID)
+                        self.assertTrue(np.array_equal(g.read_var_in_frame(time_index, var_ID), expected))
+                        self.assertTrue(np.array_equal(view[pos_var], expected))
+                values = g.read_var_in_frame(0, 'U')
+                values -= 1  # returned arrays are native and writable copies
+                self.assertEqual(values.dtype, f.header.np_float_type)
+
+    def test_memory_map_request_error(self):
+        with Serafin.Read(self.paths[True], 'fr') as f:
+            f.read_header()
+            self.assertRaises(Serafin.SerafinRequestError, f.read_frame_as_view, 0)
+        with Serafin.Read(self.paths[True], 'fr', memory_map=True) as f:
+            f.read_header()
+            self.assertRaises(Serafin.SerafinRequestError, f.read_frame_as_view, 12)
+            self.assertRaises(Serafin.SerafinRequestError, f.read_var_in_frame_as_view, 0, 'Z')
+
+    def test_header_parsers(self):
+        for path in list(self.paths.values()) + [self.path_3d]:
+            file_size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                fast_header = Serafin.SerafinHeader(f, file_size, 'fr')
+            with open(path, 'rb') as f:
+                ref_header = Serafin.SerafinHeader(f, file_size, 'fr', fast=False)
+            for attr in ('ikle', 'ikle_2d', 'ipobo', 'x', 'y'):
+                self.assertTrue(np.array_equal(getattr(fast_header, attr), getattr(ref_header, attr)))
+                self.assertEqual(getattr(fast_header, attr).dtype, getattr(ref_header, attr).dtype)
+            self.assertEqual(fast_header.nb_frames, ref_header.nb_frames)
+            self.assertEqual(fast_header.header_size, ref_header.header_size)
+
+    def test_copy_as_2d(self):
+        with Serafin.Read(self.path_3d, 'fr') as f:
+            f.read_header()
+            self.assertFalse(f.header.is_2d)
+            self.assertEqual(f.header.ikle_2d.tolist(), [[1, 2, 4], [1, 3, 4], [2, 3, 4]])
+            header_2d = f.header.copy_as_2d()
+        self.assertTrue(header_2d.is_2d)
+        self.assertEqual(header_2d.nb_elements, 3)
+        self.assertEqual(header_2d.nb_nodes, 4)
+        self.assertEqual(header_2d.ikle.tolist(), [1, 2, 4, 1, 3, 4, 2, 3, 4])
+        self.assertEqual(header_2d.ikle_2d.shape, (3, 3))
+        self.assertEqual(header_2d.x.tolist(), [3, 0, 6, 3])
+
+    def test_fast_writer(self):
+        for header, values in [(TestHeader(True), self.values), (TestHeader(False), self.values),
+                               (TestHeader3D(), self.values_3d)]:
+            header.params[-1] = 1
+            header.date = (2017, 10, 1, 12, 30, 0)
+            contents = []
+            for fast in (True, False):
+                path = os.path.join(self.folder, 'out_%s.slf' % fast)
+                with Serafin.Write(path, 'fr', fast=fast) as f:
+                    f.write_header(header)
+                    for time, vals in enumerate(values):
+                        f.write_entire_frame(header, 0.1 * time, vals)
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+                os.remove(path)
+            self.assertEqual(contents[0], contents[1])
+
+    def test_read_vars_in_frames(self):
+        time_indices, var_IDs = [7, 0, 1, 2, 11, 1], ['H', 'U', 'H']
+        for path in self.paths.values():
+            for memory_map in (False, True):
+                with Serafin.Read(path, 'fr', memory_map=memory_map) as f:
+                    f.read_header()
+                    values = f.read_vars_in_frames(time_indices, var_IDs)
+                    self.assertEqual(values.shape, (6, 3, 4))
+                    for i, time_index in enumerate(time_indices):
+                        for j, var_ID in enumerate(var_IDs):
+                            expected = f.read_var_in_frame(time_index, var_ID)
+                            self.assertTrue(np.array_equal(values[i, j], expected))
+                    self.assertRaises(Serafin.SerafinRequestError, f.read_vars_in_frames, [12], ['U'])
+                    self.assertRaises(Serafin.SerafinRequestError, f.read_vars_in_frames, [0], ['Z'])
+
+    def test_read_vars_at_nodes(self):
+        time_indices, var_IDs, node_indices = [3, 0, 11], ['V', 'U'], [3, 0, 3, 1]
+        for path in self.paths.values():
+            for memory_map in (False, True):
+                with Serafin.Read(path, 'fr', memory_map=memory_map) as f:
+                    f.read_header()
+                    expected = f.read_vars_in_frames(time_indices, var_IDs)[:, :, node_indices]
+                    self.assertTrue(np.array_equal(f.read_vars_at_nodes(time_indices, var_IDs, node_indices),
+                                                   expected))
+                    self.assertEqual(f.read_vars_at_nodes(time_indices, var_IDs, []).shape, (3, 2, 0))
+                    self.assertRaises(Serafin.SerafinRequestError, f.read_vars_at_nodes, [0], ['U'], [4])
+        with Serafin.Read(self.path_3d, 'fr') as f:
+            f.read_header()
+            Serafin.Read.MAX_READ_GAP = 0  # one read per node
+            try:
+                values = f.read_vars_at_nodes(range(5), ['Z', 'U'], [11, 2, 5])
+            finally:
+                Serafin.Read.MAX_READ_GAP = 4096
+            self.assertTrue(np.allclose(values, self.values_3d[:, :, [11, 2, 5]]))
+
+    def test_get_time(self):
+        for double_precision, path in self.paths.items():
+            for memory_map in (False, True):
+                with Serafin.Read(path, 'fr', memory_map=memory_map) as f:
+                    f.read_header()
+                    f.get_time()
+                    self.assertEqual(len(f.time), 12)
+                    self.assertTrue(all(type(time) is float for time in f.time))
+                    self.assertEqual(f.time, [float(np.float32(0.5 * time)) if not double_precision else 0.5 * time
+                                              for time in range(12)])
+
+    def test_cache(self):
+        path = self.path_3d
+        previous = Serafin.SerafinIndex.DIRECTORY
+        Serafin.SerafinIndex.DIRECTORY = os.path.join(self.folder, 'cache')
+        try:
+            for _ in range(2):  # the second pass reads the cache file written by the first one
+                with Serafin.Read(path, 'fr', cache=True) as f, Serafin.Read(path, 'fr') as g:
+                    f.read_header()
+                    f.get_time()
+                    g.read_header()
+                    g.get_time()
+                    for attr in ('ikle', 'ikle_2d', 'ipobo', 'x', 'y'):
+                        self.assertTrue(np.array_equal(getattr(f.header, attr), getattr(g.header, attr)))
+                        self.assertEqual(getattr(f.header, attr).dtype, getattr(g.header, attr).dtype)
+                    self.assertEqual(f.header.var_IDs, g.header.var_IDs)
+                    self.assertEqual(f.time, g.time)
+                    self.assertTrue(all(type(time) is float for time in f.time))
+                    header = g.header
+                self.assertFalse(os.path.exists(path + Serafin.SerafinIndex.EXTENSION))  # nothing next to the file
+                self.assertEqual(len(os.listdir(Serafin.SerafinIndex.DIRECTORY)), 1)
+                self.assertTrue(Serafin.SerafinIndex(path, header).load())
+
+            # a change of the header bytes invalidates the cache, even with the same size and modification time
+            with open(path, 'rb') as f:
+                content = f.read()
+            stat = os.stat(path)
+            with open(path, 'wb') as f:
+                f.write(content[:4] + b'OTHER TITLE'.ljust(72) + content[76:])
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.assertFalse(Serafin.SerafinIndex(path, header).load())
+            with Serafin.Read(path, 'fr', cache=True) as f:
+                f.read_header()
+                self.assertEqual(f.header.title, b'OTHER TITLE'.ljust(72))
+                f.get_time()
+
+            # appending a frame (here a copy of the last one) invalidates the cache
+            with Serafin.Read(path, 'fr') as f:
+                f.read_header()
+                frame_size = f.header.frame_size
+            with open(path, 'ab') as f:
+                f.write(content[-frame_size:])
+            self.assertFalse(Serafin.SerafinIndex(path, header).load())
+            with Serafin.Read(path, 'fr', cache=True) as f:
+                f.read_header()
+                f.get_time()
+                self.assertEqual(f.header.nb_frames, 6)
+                self.assertEqual(len(f.time), 6)
+        finally:
+            Serafin.SerafinIndex.DIRECTORY = previous
+
+    def test_follow(self):
+        path = self.paths[False]
+        with open(path, 'rb') as f:
+            content = f.read()
+        with Serafin.Read(path, 'fr') as f:
+            f.read_header()
+            header_size, frame_size = f.header.header_size, f.header.frame_size
+            ikle, x = f.header.ikle, f.header.x
+        path = os.path.join(self.folder, 'running.slf')
+        with open(path, 'wb') as f:
+            f.write(content[:header_size + 3 * frame_size + frame_size // 2])  # last frame is being written
+
+        with Serafin.Read(path, 'fr') as f:
+            self.assertRaises(Serafin.SerafinValidationError, f.read_header)
+        for memory_map in (False, True):
+            with open(path, 'wb') as f:
+                f.write(content[:header_size + 3 * frame_size + frame_size // 2])
+            with Serafin.Read(path, 'fr', memory_map=memory_map, follow=True) as f:
+                f.read_header()
+                f.get_time()
+                self.assertEqual(f.header.nb_frames, 3)
+                self.assertEqual(f.time, [0, 0.5, 1])
+                self.assertEqual(len(f.update_frames()), 0)
+
+                with open(path, 'ab') as g:
+                    g.write(content[header_size + 3 * frame_size + frame_size // 2:header_size + 6 * frame_size])
+                self.assertEqual(f.update_frames(), range(3, 6))
+                self.assertEqual(f.time, [0, 0.5, 1, 1.5, 2, 2.5])
+                self.assertTrue(np.array_equal(f.read_var_in_frame(5, 'V'),
+                                               self.values[5, 1].astype(np.float32)))
+
+        # file growing frame by frame, from its header only
+        for lazy in (False, True):
+            with open(path, 'wb') as f:
+                f.write(content[:header_size])
+            with Serafin.Read(path, 'fr', follow=True, lazy=lazy) as f:
+                f.read_header()
+                f.get_time()
+                self.assertEqual(f.header.nb_frames, 0)
+                self.assertTrue(np.array_equal(f.header.ikle, ikle))
+                self.assertTrue(np.array_equal(f.header.x, x))
+                self.assertEqual(len(f.update_frames()), 0)
+                for time_index in range(12):
+                    with open(path, 'ab') as g:
+                        g.write(content[header_size + time_index * frame_size:
+                                        header_size + time_index * frame_size + frame_size // 3])
+                    self.assertEqual(len(f.update_frames()), 0)
+                    with open(path, 'ab') as g:
+                        g.write(content[header_size + time_index * frame_size + frame_size // 3:
+                                        header_size + (time_index + 1) * frame_size])
+                    self.assertEqual(f.update_frames(), range(time_index, time_index + 1))
+                    self.assertEqual(f.time[-1], 0.5 * time_index)
+                    self.assertTrue(np.array_equal(f.read_var_in_frame(time_index, 'H'),
+                                                   self.values[time_index, 2].astype(np.float32)))
+
+        # file being rewritten, shorter than its header
+        with open(path, 'wb') as f:
+            f.write(content[:header_size - 8])
+        for lazy in (False, True):
+            with Serafin.Read(path, 'fr', follow=True, lazy=lazy) as f:
+                self.assertRaises(Serafin.SerafinValidationError, f.read_header)
+
+    def test_time_major_store(self):
+        time_indices, node_indices = range(1, 12, 2), [2, 0, 2]
+        for path in self.paths.values():
+            with Serafin.Read(path, 'fr') as f:
+                f.read_header()
+                expected = f.read_vars_at_nodes(time_indices, ['H', 'U'], node_indices)
+                self.assertFalse(f.open_time_major())
+                f.build_time_major(max_memory=100)  # blocks of one or two nodes
+                self.assertIsNotNone(f.time_major)
+                self.assertTrue(np.array_equal(f.read_vars_at_nodes(time_indices, ['H', 'U'], node_indices),
+                                               expected))
+            with Serafin.Read(path, 'fr') as f:
+                f.read_header()
+                self.assertIsNone(f.time_major)
+                values = f.read_vars_at_nodes(time_indices, ['H', 'U'], node_indices)
+                self.assertIsNotNone(f.time_major)  # the existing store is used by the node requests
+                self.assertEqual(values.dtype, f.header.np_float_type)
+                self.assertTrue(np.array_equal(values, expected))
+                self.assertTrue(np.array_equal(f.time_major.data[1], self.values[:, 1].T.astype(values.dtype)))
+
+            # a store of a file rewritten with the same size and modification time is ignored
+            stat = os.stat(path)
+            with open(path, 'r+b') as f:
+                f.seek(4)
+                f.write(b'OTHER')
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            with Serafin.Read(path, 'fr') as f:
+                f.read_header()
+                self.assertTrue(np.array_equal(f.read_vars_at_nodes(time_indices, ['H', 'U'], node_indices),
+                                               expected))
+                self.assertIsNone(f.time_major)
+
+    def test_copy_frames(self):
+        header = TestHeader()
+        for selection in (['U', 'V', 'H'], ['U', 'H'], ['H']):
+            header.nb_var = len(selection)
+            positions = [['U', 'V', 'H'].index(var_ID) for var_ID in selection]
+            header.var_names = [TestHeader().var_names[i] for i in positions]
+            header.var_units = [TestHeader().var_units[i] for i in positions]
+            time_indices = [0, 1, 2, 5, 11]
+            paths = [os.path.join(self.folder, 'copy.slf'), os.path.join(self.folder, 'ref.slf')]
+            with Serafin.Read(self.paths[True], 'fr') as f:
+                f.read_header()
+                f.get_time()
+                with Serafin.Write(paths[0], 'fr') as g:
+                    g.write_header(header)
+                    Serafin.Write.COPY_BUFFER_SIZE = 10  # several buffered copies if the copy in the kernel fails
+                    try:
+                        g.copy_frames(f, time_indices[:3], selection)
+                    finally:
+                        Serafin.Write.COPY_BUFFER_SIZE = 16 * 1024 * 1024
+                    g.copy_frames(f, time_indices[3:], selection)
+                with Serafin.Write(paths[1], 'fr') as g:
+                    g.write_header(header)
+                    for time_index in time_indices:
+                        g.write_entire_frame(header, f.time[time_index],
+                                             f.read_vars_in_frames([time_index], selection)[0])
+            contents = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+                os.remove(path)
+            self.assertEqual(contents[0], contents[1])
+
+    def test_write_frames_at_offsets(self):
+        header = TestHeader()
+        path = os.path.join(self.folder, 'parallel.slf')
+        with Serafin.Write(path, 'fr') as f:
+            f.write_header(header)
+            f.preallocate(header, 12)
+            header_size = f.header_size
+        for positions in (range(6, 12), range(0, 6)):  # disjoint frame ranges written by independent streams
+            with Serafin.Write(path, 'fr', preallocated=True) as f:
+                for time_index in reversed(positions):
+                    f.write_entire_frame_at(header, time_index, 0.5 * time_index, self.values[time_index])
+        with open(path, 'rb') as f, open(self.paths[True], 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+        # uneven chunks, with the header size given by the stream which wrote the header
+        os.remove(path)
+        with Serafin.Write(path, 'fr') as f:
+            f.write_header(header)
+            f.preallocate(header, 12)
+        for positions in (range(9, 12), range(0, 4), range(4, 9)):
+            with Serafin.Write(path, 'fr', preallocated=True, header_size=header_size) as f:
+                for time_index in positions:
+                    f.write_entire_frame_at(header, time_index, 0.5 * time_index, self.values[time_index])
+                self.assertEqual(f.header_size, header_size)
+        with open(path, 'rb') as f, open(self.paths[True], 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_map_frames(self):
+        for memory_map in (False, True):
+            with Serafin.Read(self.paths[True], 'fr', memory_map=memory_map) as f:
+                f.read_header()
+                time_indices = list(range(12)) * 5
+                for nb_threads in (1, 4):
+                    results = list(f.map_frames(lambda time_index: f.read_vars_in_frames([time_index], ['H', 'U']),
+                                                time_indices, nb_threads))
+                    self.assertEqual(len(results), len(time_indices))
+                    for time_index, values in zip(time_indices, results):
+                        self.assertTrue(np.array_equal(values[0], self.values[time_index, [2, 0]]))
+
+        # a single thread reads the frames in the calling thread
+        previous = Serafin.Read.NB_THREADS
+        Serafin.Read.NB_THREADS = 1
+        try:
+            with Serafin.Read(self.paths[True], 'fr') as f:
+                f.read_header()
+                threads = set(f.map_frames(lambda time_index: threading.get_ident(), range(12)))
+            self.assertEqual(threads, {threading.get_ident()})
+        finally:
+            Serafin.Read.NB_THREADS = previous
+
+    def test_frame_pipeline(self):
+        header = TestHeader()
+        path = os.path.join(self.folder, 'pipeline.slf')
+        with Serafin.Read(self.paths[True], 'fr') as f, Serafin.Write(path, 'fr') as g:
+            f.read_header()
+            f.get_time()
+            g.write_header(header)
+            FramePipeline(lambda time_index: f.read_vars_in_frames([time_index], f.header.var_IDs)[0],
+                          lambda time_index, values: 2 * values - values,
+                          lambda time_index, values: g.write_entire_frame(header, f.time[time_index], values),
+                          queue_size=1).run(range(12))
+        with open(path, 'rb') as f, open(self.paths[True], 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+        def fail(time_index, data):
+            if time_index == 5:
+                raise ValueError
+        for stages in ((lambda time_index: time_index, fail), (lambda time_index: time_index, None, fail),
+                       (lambda time_index: 1 // (5 - time_index), None)):
+            with self.assertRaises((ValueError, ZeroDivisionError)):
+                FramePipeline(*stages).run(range(12))
+
+    def test_calculations_in_frame(self):
+        with Serafin.Read(self.paths[True], 'fr') as f:
+            f.read_header()
+            equations = get_necessary_equations(f.header.var_IDs, ['M', 'H', 'U'], True)
+            read_var_IDs = get_read_var_IDs(equations, ['M', 'H', 'U'], True)
+            self.assertEqual(sorted(read_var_IDs), ['H', 'U', 'V'])
+            for time_index in range(12):
+                values = read_values_in_frame(f, time_index, read_var_IDs)
+                self.assertTrue(np.array_equal(values['V'], self.values[time_index, 1]))
+                output_values = do_calculations_in_frame(equations, f, time_index, ['M', 'H', 'U'], np.float64,
+                                                         True, None, values=values)
+                self.assertTrue(np.array_equal(output_values, do_calculations_in_frame(
+                    equations, f, time_index, ['M', 'H', 'U'], np.float64, True, None)))
+                self.assertTrue(np.allclose(output_values[0], np.sqrt(self.values[time_index, 0] ** 2 +
+                                                                      self.values[time_index, 1] ** 2)))
+                self.assertTrue(np.array_equal(output_values[1:], self.values[time_index, [2, 0]]))
+
+    def test_read_at_layer(self):
+        for memory_map in (False, True):
+            with Serafin.Read(self.path_3d, 'fr', memory_map=memory_map) as f:
+                f.read_header()
+                for iplan in (1, 2, 3):
+                    layer = slice((iplan - 1) * 4, iplan * 4)
+                    self.assertTrue(np.array_equal(f.read_var_in_frame_at_layer(3, 'U', iplan),
+                                                   self.values_3d[3, 1, layer]))
+                    self.assertTrue(np.array_equal(f.read_var_in_frame_at_layer(3, 'U', iplan),
+                                                   f.read_var_in_frame_as_3d(3, 'U')[iplan - 1]))
+                    self.assertTrue(np.array_equal(f.read_vars_in_frames_at_layer([4, 0], ['U', 'Z'], iplan),
+                                                   self.values_3d[[4, 0]][:, [1, 0], layer]))
+                for iplan in (0, 4):
+                    with self.assertRaises(Serafin.SerafinRequestError):
+                        f.read_var_in_frame_at_layer(0, 'U', iplan)
+
+    def test_scan(self):
+        for double_precision, path in self.paths.items():
+            scanner = Serafin.SerafinScanner(path, 'fr')
+            self.assertTrue(scanner.scan())
+            self.assertEqual(scanner.nb_frames, 12)
+
+            damaged_path = os.path.join(self.folder, 'damaged.slf')
+            shutil.copy(path, damaged_path)
+            frame_size = scanner.header.frame_size
+            with open(damaged_path, 'r+b') as f:
+                f.truncate(scanner.header.header_size + 10 * frame_size + frame_size // 2)  # crash in frame 10
+                f.seek(scanner.header.header_size + 7 * frame_size + frame_size - 4)
+                f.write(b'\x00' * 4)  # wrong end marker of the last variable of frame 7
+            with self.assertRaises(Serafin.SerafinValidationError):
+                with Serafin.Read(damaged_path, 'fr') as f:
+                    f.read_header()
+
+            scanner = Serafin.SerafinScanner(damaged_path, 'fr')
+            self.assertFalse(scanner.scan())
+            self.assertEqual((scanner.nb_complete_frames, scanner.nb_frames), (10, 7))
+            with Serafin.Read(damaged_path, 'fr', recover=True) as f:
+                f.read_header()
+                f.get_time()
+                self.assertEqual(f.header.nb_frames, 7)
+                self.assertEqual(f.time, [0.5 * i for i in range(7)])
+                self.assertTrue(np.allclose(f.read_vars_in_frames(range(7), f.header.var_IDs), self.values[:7]))
+
+            scanner.truncate()
+            self.assertEqual(os.path.getsize(damaged_path), scanner.header.header_size + 7 * frame_size)
+            self.assertTrue(Serafin.SerafinScanner(damaged_path, 'fr').scan())
+            with Serafin.Read(damaged_path, 'fr') as f:
+                f.read_header()
+                self.assertEqual(f.header.nb_frames, 7)
+
+    def test_copy(self):
+        with Serafin.Read(self.path_3d, 'fr') as f:
+            f.read_header()
+            header = f.header
+        new_header = header.copy()
+        for name in Serafin.SerafinHeader.MESH_ARRAYS:
+            self.assertIs(getattr(new_header, name), getattr(header, name))
+            with self.assertRaises(ValueError):
+                getattr(new_header, name)[0] = 0
+        new_header.var_IDs.append('W')
+        new_header.var_names[0] = bytes('VITESSE W', 'utf-8').ljust(16)
+        new_header.to_single_precision()
+        self.assertEqual(header.var_IDs, ['Z', 'U'])
+        self.assertEqual(header.var_names[0], bytes('COTE Z', 'utf-8').ljust(16))
+        self.assertEqual(header.float_type, 'd')
+        header_2d = new_header.copy_as_2d()
+        self.assertEqual(header_2d.x.tolist(), [3, 0, 6, 3])
+        self.assertEqual(header.nb_nodes, 12)
+
+    def test_lazy_header(self):
+        for path in list(self.paths.values()) + [self.path_3d]:
+            for fast in (True, False):
+                with open(path, 'rb') as f:
+                    ref_header = Serafin.SerafinHeader(f, os.path.getsize(path), 'fr', fast=fast)
+                with open(path, 'rb') as f:
+                    header = Serafin.SerafinHeader(f, os.path.getsize(path), 'fr', fast=fast, lazy=True)
+                self.assertIsNone(header._ikle)
+                self.assertEqual(header.summary(), ref_header.summary())
+                self.assertEqual(header.var_IDs, ref_header.var_IDs)
+
+                new_header = header.copy()
+                new_header.to_single_precision()
+                for name in Serafin.SerafinHeader.MESH_ARRAYS:
+                    self.assertTrue(np.array_equal(getattr(new_header, name), getattr(ref_header, name)))
+                    self.assertEqual(getattr(new_header, name).dtype, getattr(ref_header, name).dtype)
+                    self.assertIs(getattr(header, name), getattr(new_header, name))
+
+        with Serafin.Read(self.path_3d, 'fr', lazy=True) as f:
+            f.read_header()
+            f.get_time()
+            self.assertEqual(len(f.time), 5)
+            self.assertIsNone(f.header._x)
+            self.assertTrue(np.array_equal(f.read_var_in_frame(1, 'U'), self.values_3d[1, 1]))
+            self.assertEqual(f.header.copy_as_2d().ikle.tolist(), [1, 2, 4, 1, 3, 4, 2, 3, 4])
+
+    def test_shared_arrays(self):
+        with Serafin.Read(self.path_3d, 'fr') as f:
+            f.read_header()
+            header = f.header
+        with Serafin.Read(self.path_3d, 'fr', lazy=True) as f:
+            f.read_header()
+            lazy_header = f.header
+        lazy_header.x  # decoded by the mesh loader
+        previous = SharedArray.DIRECTORY, SharedArray.MIN_SIZE
+        SharedArray.DIRECTORY, SharedArray.MIN_SIZE = os.path.join(self.folder, 'shared'), 0
+        os.mkdir(SharedArray.DIRECTORY)
+        try:
+            # copies in the same process share the arrays, without any file
+            new_header = header.copy()
+            self.assertEqual(os.listdir(SharedArray.DIRECTORY), [])
+            for name in Serafin.SerafinHeader.MESH_ARRAYS:
+                self.assertIs(getattr(new_header, name), getattr(header, name))
+                self.assertNotIsInstance(getattr(new_header, name), np.memmap)
+
+            data = pickle.dumps(header)
+            self.assertEqual(len(os.listdir(SharedArray.DIRECTORY)), len(Serafin.SerafinHeader.MESH_ARRAYS))
+            self.assertNotIn(header.x.tobytes(), data)
+            SharedArray._paths.clear()  # as in another process
+            new_header = pickle.loads(data)
+            for name in Serafin.SerafinHeader.MESH_ARRAYS:
+                self.assertTrue(np.array_equal(getattr(new_header, name), getattr(header, name)))
+                self.assertIsInstance(getattr(new_header, name), np.memmap)
+                with self.assertRaises(ValueError):
+                    getattr(new_header, name)[0] = 0
+            # the mapped arrays are sent again as handles, the same mesh is stored once
+            self.assertLess(len(pickle.dumps(new_header.copy())), len(data) + 100)
+            new_lazy_header = pickle.loads(pickle.dumps(lazy_header))
+            self.assertEqual(len(os.listdir(SharedArray.DIRECTORY)), len(Serafin.SerafinHeader.MESH_ARRAYS))
+            self.assertTrue(np.array_equal(new_lazy_header.ikle_2d, header.ikle_2d))
+
+            # loaded in memory (main process), the files can be removed at once
+            SharedArray.MEMORY_MAP = False
+            SharedArray._paths.clear()
+            loaded_header = pickle.loads(pickle.dumps(Serafin.SerafinHeader.copy(lazy_header)))
+            self.assertNotIsInstance(loaded_header.x, np.memmap)
+            self.assertTrue(np.array_equal(loaded_header.x, header.x))
+        finally:
+            SharedArray.DIRECTORY, SharedArray.MIN_SIZE, SharedArray.MEMORY_MAP = previous + (True,)
+        self.assertTrue(np.array_equal(pickle.loads(pickle.dumps(header)).y, header.y))
+
+    def test_lazy_cache(self):
+        path = self.path_3d
+        previous = Serafin.Read.USE_CACHE, Serafin.SerafinIndex.DIRECTORY
+        Serafin.Read.USE_CACHE, Serafin.SerafinIndex.DIRECTORY = True, os.path.join(self.folder, 'cache')
+        try:
+            data = SerafinData('0', path, 'fr')
+            data.read()  # writes the cache file
+            self.assertEqual(len(os.listdir(Serafin.SerafinIndex.DIRECTORY)), 1)
+
+            data = SerafinData('0', path, 'fr')
+            data.read()  # lazy reading, with the time series of the cache file
+            self.assertIsInstance(data.header.mesh_loader, Serafin.SerafinMesh)
+            self.assertIsNone(data.header._x)
+            self.assertEqual(len(data.time), 5)
+            with Serafin.Read(path, 'fr', cache=False) as f:
+                f.read_header()
+                f.get_time()
+                self.assertEqual(data.time, f.time)
+                for name in Serafin.SerafinHeader.MESH_ARRAYS:
+                    self.assertTrue(np.array_equal(getattr(data.header, name), getattr(f.header, name)))
+        finally:
+            Serafin.Read.USE_CACHE, Serafin.SerafinIndex.DIRECTORY = previous
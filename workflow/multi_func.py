@@ -1,21 +1,30 @@
+import atexit
 import os
+import shutil
 import struct
+import tempfile
 from datetime import datetime
-from multiprocessing import Process, Queue
+from multiprocessing import Pool, Process, Queue, current_process
 import numpy as np
-from shapely.geometry import Polygon
 
+from conf.settings import MESH_CACHE_DIR, MESH_CACHE_SIZE, NCSIZE_PER_FILE
 from geom import BlueKenue, Shapefile
 from slf.datatypes import SerafinData, PolylineData, PointData, CSVData
 from slf.flux import TriangularVectorField, FluxCalculator
 from slf.interpolation import MeshInterpolator
+from slf.mesh_cache import MeshCache
 import slf.misc as operations
 from slf import Serafin
-from slf.variables import do_calculations_in_frame, get_available_variables, \
-                          get_necessary_equations, new_variables_from_US
+from slf.pipeline import FramePipeline
+from slf.shared_arrays import SharedArray
+from slf.variables import do_calculations_in_frame, get_available_variables, get_necessary_equations, \
+                          get_read_var_IDs, new_variables_from_US, read_values_in_frame
 from slf.volume import TruncatedTriangularPrisms, VolumeCalculator
 from workflow.util import process_output_options, process_geom_output_options, process_vtk_output_options
 
+# the worker processes share the mesh cache of the interface
+MeshCache.DIRECTORY, MeshCache.MAX_SIZE = MESH_CACHE_DIR, MESH_CACHE_SIZE * 1024 * 1024
+
 
 class Workers:
     def __init__(self, ncsize):
@@ -24,16 +33,25 @@ class Workers:
         self.stopped = False
         self.task_queue = Queue()
         self.done_queue = Queue()
-
+        self.shared_directory = None  # folder of the mesh arrays shared with the workers (see SharedArray)
+        self.shared_settings = None  # settings of SharedArray in the main process before start
         self.processes = []
-        for i in range(self.nb_processes):
-            self.processes.append(Process(target=worker, args=(self.task_queue, self.done_queue)))
 
     def add_tasks(self, tasks):
         for task in tasks:
             self.task_queue.put(task)
 
     def start(self):
+        # the mesh arrays go through the queues as handles to read-only files, written once for each mesh
+        self.shared_directory = tempfile.mkdtemp(prefix='PyTelTools-')
+        atexit.register(self.remove_shared_directory)  # unregistered by stop
+        self.shared_settings = SharedArray.DIRECTORY, SharedArray.MEMORY_MAP
+        SharedArray.DIRECTORY = self.shared_directory
+        SharedArray.MEMORY_MAP = False  # the main process does not keep the files open
+        for i in range(self.nb_processes):
+            # not daemonic, so that the workers can share the computation of a file (see NCSIZE_PER_FILE)
+            self.processes.append(Process(target=worker, daemon=False,
+                                          args=(self.task_queue, self.done_queue, self.shared_directory)))
         for p in self.processes:
             p.start()
         self.started = True
@@ -42,6 +60,15 @@ class Workers:
         for i in range(self.nb_processes):
             self.task_queue.put('STOP')
         self.stopped = True
+        if self.shared_directory is not None:
+            for p in self.processes:  # all the results are received, the workers release the files when they exit
+                p.join()
+            SharedArray.DIRECTORY, SharedArray.MEMORY_MAP = self.shared_settings
+            atexit.unregister(self.remove_shared_directory)
+            self.remove_shared_directory()
+
+    def remove_shared_directory(self):
+        shutil.rmtree(self.shared_directory, ignore_errors=True)
 
     def add_task(self, task):
         self.task_queue.put(task)
@@ -50,7 +77,8 @@ class Workers:
         return self.done_queue.get()
 
 
-def worker(input_queue, output_queue):
+def worker(input_queue, output_queue, shared_directory=None):
+    SharedArray.DIRECTORY, SharedArray.MEMORY_MAP = shared_directory, True
     for func, args in iter(input_queue.get, 'STOP'):
         result = func(*args)
         output_queue.put(result)
@@ -255,7 +283,7 @@ def select_time(node_id, fid, data, options):
         return False, node_id, fid, None, fail_message('cannot re-select time', 'Select Time', data.job_id)
 
     start_date, end_date, sampling_frequency = options
-    available_dates = list(map(lambda x: x + data.start_time, data.time_second))
+    available_dates = data.get_dates()
     if start_date in available_dates:
         start_index = available_dates.index(start_date)
     else:
@@ -275,7 +303,7 @@ def select_single_frame(node_id, fid, data, options):
         return False, node_id, fid, None, fail_message('cannot re-select time', 'Select Time', data.job_id)
 
     selected_date = options[0]
-    available_dates = list(map(lambda x: x + data.start_time, data.time_second))
+    available_dates = data.get_dates()
     if selected_date in available_dates:
         selected_index = available_dates.index(selected_date)
     else:
@@ -456,6 +484,19 @@ def write_slf(node_id, fid, data, options):
     return success, node_id, fid, new_data, message
 
 
+def split_frames(nb_frames, nb_processes=NCSIZE_PER_FILE):
+    """!
+    @brief Split the positions of the output frames into contiguous chunks, one per process
+    @param nb_frames <int>: number of output frames
+    @param nb_processes <int>: maximum number of processes sharing the computation
+    @return <[range]>: the non-empty chunks of positions
+    """
+    if current_process().daemon:
+        nb_processes = 1  # daemonic processes (e.g. of a multiprocessing.Pool) cannot start processes
+    bounds = np.linspace(0, nb_frames, max(1, min(nb_processes, nb_frames)) + 1).astype(int)
+    return [range(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if start < end]
+
+
 def write_simple_slf(input_data, filename):
     output_header = input_data.default_output_header()
     with Serafin.Read(input_data.filename, input_data.language) as input_stream:
@@ -464,15 +505,83 @@ def write_simple_slf(input_data, filename):
 
         with Serafin.Write(filename, input_data.language) as output_stream:
             output_stream.write_header(output_header)
-            for time_index in input_data.selected_time_indices:
-                # FIXME Optimization: Do calculations only on target layer and avoid reshaping afterwards
-                values = do_calculations_in_frame(input_data.equations, input_stream, time_index,
-                                                  input_data.selected_vars, output_header.np_float_type,
-                                                  is_2d=output_header.is_2d, us_equation=input_data.us_equation)
+            if input_data.has_raw_values() and input_stream.RAW_RECORDS:
+                output_stream.copy_frames(input_stream, input_data.selected_time_indices, input_data.selected_vars)
+                return True, success_message('Write Serafin', input_data.job_id)
+
+            chunks = split_frames(len(input_data.selected_time_indices))
+            if len(chunks) > 1:
+                # the frames are written at their offsets by several processes
+                output_stream.preallocate(output_header, len(input_data.selected_time_indices))
+                with Pool(len(chunks)) as pool:
+                    pool.starmap(write_simple_frames, [(input_data, filename, output_header,
+                                                        output_stream.header_size, positions)
+                                                       for positions in chunks])
+                return True, success_message('Write Serafin', input_data.job_id)
+
+            read_var_IDs = get_read_var_IDs(input_data.equations, input_data.selected_vars, output_header.is_2d)
+
+            def read(time_index):
+                return read_values_in_frame(input_stream, time_index, read_var_IDs)
+
+            def compute(time_index, values):
+                return do_calculations_in_frame(input_data.equations, input_stream, time_index,
+                                                input_data.selected_vars, output_header.np_float_type,
+                                                is_2d=output_header.is_2d, us_equation=input_data.us_equation,
+                                                values=values)
+
+            def write(time_index, values):
                 output_stream.write_entire_frame(output_header, input_data.time[time_index], values)
+
+            # the next frames are read and the previous ones are written while the current one is computed
+            FramePipeline(read, compute, write).run(input_data.selected_time_indices)
     return True, success_message('Write Serafin', input_data.job_id)
 
 
+def write_simple_frames(input_data, filename, output_header, header_size, positions):
+    """!
+    @brief Compute and write some frames of a preallocated output file (see write_simple_slf)
+    @param header_size <int>: size of the header of the output file
+    @param positions <range>: positions of the frames in the selected time indices
+    """
+    with Serafin.Read(input_data.filename, input_data.language) as input_stream, \
+            Serafin.Write(filename, input_data.language, preallocated=True,
+                          header_size=header_size) as output_stream:
+        input_stream.header = input_data.header
+        input_stream.time = input_data.time
+
+        read_var_IDs = get_read_var_IDs(input_data.equations, input_data.selected_vars, output_header.is_2d)
+
+        def read(position):
+            return read_values_in_frame(input_stream, input_data.selected_time_indices[position], read_var_IDs)
+
+        def compute(position, values):
+            return do_calculations_in_frame(input_data.equations, input_stream,
+                                            input_data.selected_time_indices[position], input_data.selected_vars,
+                                            output_header.np_float_type, is_2d=output_header.is_2d,
+                                            us_equation=input_data.us_equation, values=values)
+
+        def write(position, values):
+            time_index = input_data.selected_time_indices[position]
+            output_stream.write_entire_frame_at(output_header, position, input_data.time[time_index], values)
+
+        FramePipeline(read, compute, write).run(positions)
+
+
+def scalar_max_min_mean_in_frames(input_data, scalars, additional_equations, time_indices):
+    """!
+    @brief Compute the running max/min/sum of scalars on some frames (see write_max_min_mean)
+    @return <numpy 2D-array>: the running values of the scalars
+    """
+    with Serafin.Read(input_data.filename, input_data.language) as input_stream:
+        input_stream.header = input_data.header
+        input_stream.time = input_data.time
+        calculator = operations.ScalarMaxMinMeanCalculator(input_data.operator, input_stream, scalars,
+                                                           time_indices, additional_equations)
+        calculator.run()
+    return calculator.current_values
+
+
 def write_max_min_mean(input_data, filename):
     selected = [(var, input_data.selected_vars_names[var][0],
                       input_data.selected_vars_names[var][1]) for var in input_data.selected_vars]
@@ -505,7 +614,18 @@ def write_max_min_mean(input_data, filename):
                                                                       vectors, input_data.selected_time_indices,
                                                                       additional_equations)
         if has_scalar:
-            scalar_calculator.run()
+            chunks = split_frames(len(input_data.selected_time_indices))
+            if len(chunks) > 1:
+                # the running values of the scalars are computed on several processes then merged
+                with Pool(len(chunks)) as pool:
+                    results = pool.starmap(scalar_max_min_mean_in_frames,
+                                           [(input_data, scalars, additional_equations,
+                                             [input_data.selected_time_indices[i] for i in positions])
+                                            for positions in chunks])
+                for current_values in results:
+                    scalar_calculator.merge(current_values)
+            else:
+                scalar_calculator.run()
         if has_vector:
             vector_calculator.run()
 
@@ -627,10 +747,8 @@ def write_project_mesh(first_input, filename):
         common_frames = [(0, i) for i in second_input.selected_time_indices]
 
     else:
-        first_frames = [first_input.start_time + first_input.time_second[i]
-                        for i in first_input.selected_time_indices]
-        second_frames = [second_input.start_time + second_input.time_second[i]
-                         for i in second_input.selected_time_indices]
+        first_frames = first_input.get_dates(first_input.selected_time_indices)
+        second_frames = second_input.get_dates(second_input.selected_time_indices)
         common_frames = []
         for first_index, first_frame in zip(first_input.selected_time_indices, first_frames):
             for second_index, second_frame in zip(second_input.selected_time_indices, second_frames):
@@ -683,7 +801,17 @@ def write_project_mesh(first_input, filename):
 
             with Serafin.Write(filename, first_input.language) as out_stream:
                 out_stream.write_header(output_header)
-                calculator.run(out_stream, output_header)
+                chunks = split_frames(len(common_frames))
+                if len(chunks) > 1:
+                    # the frames are written at their offsets by several processes
+                    out_stream.preallocate(output_header, len(common_frames))
+                    with Pool(len(chunks)) as pool:
+                        pool.starmap(project_mesh_frames,
+                                     [(first_input, second_input, common_vars, is_inside, point_interpolators,
+                                       common_frames, filename, output_header, out_stream.header_size, positions)
+                                      for positions in chunks])
+                else:
+                    calculator.run(out_stream, output_header)
 
     message = success_message('Write Serafin', first_input.job_id,
                               'The mesh A has {} / {} nodes inside the mesh B'.format(sum(is_inside),
@@ -692,6 +820,24 @@ def write_project_mesh(first_input, filename):
     return True, message
 
 
+def project_mesh_frames(first_input, second_input, common_vars, is_inside, point_interpolators, common_frames,
+                        filename, output_header, header_size, positions):
+    """!
+    @brief Compute and write some frames of a preallocated output file (see write_project_mesh)
+    @param header_size <int>: size of the header of the output file
+    @param positions <range>: positions of the frames in the common frames
+    """
+    with Serafin.Read(first_input.filename, first_input.language) as first_in, \
+            Serafin.Read(second_input.filename, second_input.language) as second_in, \
+            Serafin.Write(filename, first_input.language, preallocated=True, header_size=header_size) as out_stream:
+        first_in.header, first_in.time = first_input.header, first_input.time
+        second_in.header, second_in.time = second_input.header, second_input.time
+        calculator = operations.ProjectMeshCalculator(first_in, second_in, common_vars, is_inside,
+                                                      point_interpolators, common_frames, first_input.operator,
+                                                      first_input.metadata['reference'])
+        calculator.run(out_stream, output_header, positions)
+
+
 def write_slf_layer_selection(input_data, filename):
     selected_vars = [var for var in input_data.selected_vars if var in input_data.header.var_IDs]
     output_header = input_data.header.copy_as_2d()
@@ -711,23 +857,30 @@ def write_slf_layer_selection(input_data, filename):
 
         with Serafin.Write(filename, input_data.language) as output_stream:
             output_stream.write_header(output_header)
-            for time_index in input_data.selected_time_indices:
-                values = do_calculations_in_frame(input_data.equations, input_stream, time_index,
-                                                  input_data.selected_vars, output_header.np_float_type,
-                                                  is_2d=output_header.is_2d, us_equation=input_data.us_equation)
-                new_shape = (values.shape[0], input_stream.header.nb_planes,
-                             values.shape[1] // input_stream.header.nb_planes)
-                values_at_layer = values.reshape(new_shape)[:, input_data.metadata['layer_selection'] - 1, :]
-                output_stream.write_entire_frame(output_header, input_data.time[time_index], values_at_layer)
+
+            iplan = input_data.metadata['layer_selection']
+            read_var_IDs = get_read_var_IDs(input_data.equations, input_data.selected_vars, output_header.is_2d)
+
+            def read(time_index):
+                # only the values of the selected layer are read and computed
+                return read_values_in_frame(input_stream, time_index, read_var_IDs, iplan)
+
+            def compute(time_index, values):
+                return do_calculations_in_frame(input_data.equations, input_stream, time_index,
+                                                input_data.selected_vars, output_header.np_float_type,
+                                                is_2d=output_header.is_2d, us_equation=input_data.us_equation,
+                                                iplan=iplan, values=values)
+
+            def write(time_index, values):
+                output_stream.write_entire_frame(output_header, input_data.time[time_index], values)
+
+            FramePipeline(read, compute, write).run(input_data.selected_time_indices)
 
     return True, success_message('Write Serafin', input_data.job_id)
 
 
 def construct_mesh(mesh):
-    for i, j, k in mesh.ikle:
-        t = Polygon([mesh.points[i], mesh.points[j], mesh.points[k]])
-        mesh.triangles[i, j, k] = t
-        mesh.index.insert(i, t.bounds, obj=(i, j, k))
+    mesh._construct_index()
 
 
 def compute_volume(node_id, fid, data, aux_data, options, csv_separator, format_string):
@@ -939,16 +1092,17 @@ def interpolate_points(node_id, fid, data, aux_data, options, csv_separator, for
         input_stream.header = data.header
         input_stream.time = data.time
 
+        # read only the time series at the nodes surrounding the points
+        nodes = [node for (i, j, k), interpolator in point_interpolators for node in (i, j, k)]
+        values = input_stream.read_vars_at_nodes(data.selected_time_indices, selected_vars, nodes)
+
         for index, index_time in enumerate(data.selected_time_indices):
             row = [str(data.time[index_time])]
 
-            var_values = []
-            for var in selected_vars:
-                var_values.append(input_stream.read_var_in_frame(index_time, var))
-
-            for (i, j, k), interpolator in point_interpolators:
+            for index_point, (_, interpolator) in enumerate(point_interpolators):
                 for index_var in range(nb_selected_vars):
-                    row.append(format_string.format(interpolator.dot(var_values[index_var][[i, j, k]])))
+                    point_values = values[index, index_var, 3*index_point:3*index_point+3]
+                    row.append(format_string.format(interpolator.dot(point_values)))
             csv_data.add_row(row)
 
     csv_data.write(filename, csv_separator)
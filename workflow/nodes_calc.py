@@ -526,9 +526,10 @@ class ComputeVolumeNode(TwoInOneOutNode):
             self.data.metadata = {'var': self.first_var, 'second var': self.second_var,
                                   'start time': self.in_data.start_time, 'language': self.in_data.language}
 
-            for i, time_index in enumerate(calculator.time_indices):
+            # the frames are read in advance by a pool of threads
+            frames = input_stream.map_frames(calculator.read_values_in_frame, calculator.time_indices)
+            for i, (time_index, values) in enumerate(zip(calculator.time_indices, frames)):
                 i_result = [str(calculator.input_stream.time[time_index])]
-                values = calculator.read_values_in_frame(time_index)
 
                 for j in range(len(calculator.polygons)):
                     weight = calculator.weights[j]
@@ -838,11 +839,10 @@ class ComputeFluxNode(TwoInOneOutNode):
                                   'language': self.in_data.language, 'start time': self.in_data.start_time,
                                   'var IDs': var_IDs}
 
-            for i, time_index in enumerate(calculator.time_indices):
+            # the frames are read in advance by a pool of threads
+            frames = input_stream.map_frames(calculator.read_values_in_frame, calculator.time_indices)
+            for i, (time_index, values) in enumerate(zip(calculator.time_indices, frames)):
                 i_result = [str(calculator.input_stream.time[time_index])]
-                values = []
-                for var_ID in calculator.var_IDs:
-                    values.append(calculator.input_stream.read_var_in_frame(time_index, var_ID))
 
                 for j in range(len(calculator.sections)):
                     intersections = calculator.intersections[j]
@@ -987,16 +987,18 @@ class InterpolateOnPointsNode(TwoInOneOutNode):
             input_stream.header = self.in_data.header
             input_stream.time = self.in_data.time
 
+            nodes = [node for (i, j, k), interpolator in point_interpolators for node in (i, j, k)]
+            values = input_stream.read_vars_at_nodes(self.in_data.selected_time_indices, selected_vars, nodes)
+
             for index, index_time in enumerate(self.in_data.selected_time_indices):
                 row = [str(self.in_data.time[index_time])]
 
-                var_values = []
-                for var in selected_vars:
-                    var_values.append(input_stream.read_var_in_frame(index_time, var))
+                var_values = values[index]
 
-                for (i, j, k), interpolator in point_interpolators:
+                for index_point, (_, interpolator) in enumerate(point_interpolators):
                     for index_var in range(nb_selected_vars):
-                        row.append(format_string.format(interpolator.dot(var_values[index_var][[i, j, k]])))
+                        point_values = var_values[index_var, 3*index_point:3*index_point+3]
+                        row.append(format_string.format(interpolator.dot(point_values)))
 
                 self.data.add_row(row)
                 self.progress_bar.setValue(100 * (index+1) / nb_frames)
@@ -136,11 +136,16 @@ class WriteSerafinNode(OneInOneOutNode):
             input_stream.time = input_data.time
             with Serafin.Write(self.filename, input_data.language) as output_stream:
                 output_stream.write_header(output_header)
+                copy_values = input_data.has_raw_values() and input_stream.RAW_RECORDS
                 for i, time_index in enumerate(input_data.selected_time_indices):
-                    values = do_calculations_in_frame(input_data.equations, input_stream, time_index,
-                                                      input_data.selected_vars, output_header.np_float_type,
-                                                      is_2d=output_header.is_2d, us_equation=input_data.us_equation)
-                    output_stream.write_entire_frame(output_header, input_data.time[time_index], values)
+                    if copy_values:
+                        output_stream.copy_frames(input_stream, [time_index], input_data.selected_vars)
+                    else:
+                        values = do_calculations_in_frame(input_data.equations, input_stream, time_index,
+                                                          input_data.selected_vars, output_header.np_float_type,
+                                                          is_2d=output_header.is_2d,
+                                                          us_equation=input_data.us_equation)
+                        output_stream.write_entire_frame(output_header, input_data.time[time_index], values)
 
                     self.progress_bar.setValue(100 * (i+1) / len(input_data.selected_time_indices))
                     QApplication.processEvents()
@@ -324,10 +329,8 @@ class WriteSerafinNode(OneInOneOutNode):
             return False
 
         # common frames
-        first_frames = [first_input.start_time + first_input.time_second[i]
-                        for i in first_input.selected_time_indices]
-        second_frames = [second_input.start_time + second_input.time_second[i]
-                         for i in second_input.selected_time_indices]
+        first_frames = first_input.get_dates(first_input.selected_time_indices)
+        second_frames = second_input.get_dates(second_input.selected_time_indices)
         common_frames = []
         for first_index, first_frame in zip(first_input.selected_time_indices, first_frames):
             for second_index, second_frame in zip(second_input.selected_time_indices, second_frames):
@@ -405,13 +408,11 @@ class WriteSerafinNode(OneInOneOutNode):
             with Serafin.Write(self.filename, input_data.language) as output_stream:
                 output_stream.write_header(output_header)
                 for i, time_index in enumerate(input_data.selected_time_indices):
-                    # FIXME Optimization: Do calculations only on target layer and avoid reshaping afterwards
-                    values = do_calculations_in_frame(input_data.equations, input_stream, time_index,
-                                                      input_data.selected_vars, output_header.np_float_type,
-                                                      is_2d=output_header.is_2d, us_equation=input_data.us_equation)
-                    new_shape = (values.shape[0], input_stream.header.nb_planes,
-                                 values.shape[1] // input_stream.header.nb_planes)
-                    values_at_layer = values.reshape(new_shape)[:,input_data.metadata['layer_selection'] - 1,:]
+                    values_at_layer = do_calculations_in_frame(input_data.equations, input_stream, time_index,
+                                                               input_data.selected_vars, output_header.np_float_type,
+                                                               is_2d=output_header.is_2d,
+                                                               us_equation=input_data.us_equation,
+                                                               iplan=input_data.metadata['layer_selection'])
                     output_stream.write_entire_frame(output_header, input_data.time[time_index], values_at_layer)
                     self.progress_bar.setValue(100 * (i+1) / len(input_data.selected_time_indices))
                     QApplication.processEvents()
@@ -517,7 +517,7 @@ class SelectTimeNode(OneInOneOutNode):
         self.selection.endValue.setReadOnly(True)
 
         self.selection.clearText()
-        slider.reinit(self.in_data.start_time, self.in_data.time_second, self.selection)
+        slider.reinit(self.in_data.start_time, self.in_data.time_second.tolist(), self.selection)
 
         if len(self.in_data.time) == 1:
             slider.setEnabled(False)
@@ -565,7 +565,7 @@ class SelectTimeNode(OneInOneOutNode):
         if len(self.in_data.selected_time_indices) != len(self.in_data.time):
             self.state = Node.NOT_CONFIGURED
         elif self.start_date is not None:
-            new_time = list(map(lambda x: x + self.in_data.start_time, self.in_data.time_second))
+            new_time = self.in_data.get_dates()
             if self.start_date in new_time:
                 self.start_index = new_time.index(self.start_date)
                 self.state = Node.READY
@@ -644,8 +644,7 @@ class SelectTimeNode(OneInOneOutNode):
             self._reset()
         if super().configure():
             self.start_index, self.end_index, self.sampling_frequency = self.new_options
-            self.start_date, self.end_date = self.in_data.start_time + self.in_data.time_second[self.start_index], \
-                                             self.in_data.start_time + self.in_data.time_second[self.end_index]
+            self.start_date, self.end_date = self.in_data.get_dates([self.start_index, self.end_index])
             self.reconfigure_downward()
 
     def save(self):
@@ -695,8 +694,7 @@ class SelectSingleFrameNode(OneInOneOutNode):
 
     def get_option_panel(self):
         self.slider = SimpleTimeDateSelection()
-        self.slider.initTime(self.in_data.time, list(map(lambda x: x + self.in_data.start_time,
-                                                         self.in_data.time_second)))
+        self.slider.initTime(self.in_data.time, self.in_data.get_dates())
         if self.selection > -1:
             self.slider.index.setText(str(self.selection+1))
             self.slider.slider.enterIndexEvent()
@@ -718,7 +716,7 @@ class SelectSingleFrameNode(OneInOneOutNode):
         if len(self.in_data.selected_time_indices) != len(self.in_data.time):
             self.state = Node.NOT_CONFIGURED
         elif self.date is not None:
-            new_time = list(map(lambda x: x + self.in_data.start_time, self.in_data.time_second))
+            new_time = self.in_data.get_dates()
             if self.date in new_time:
                 self.selection = new_time.index(self.date)
                 self.state = Node.READY
@@ -783,7 +781,7 @@ class SelectSingleFrameNode(OneInOneOutNode):
             self._reset()
         if super().configure():
             self.selection = self.new_option
-            self.date = self.in_data.start_time + self.in_data.time_second[self.selection]
+            self.date = self.in_data.get_dates([self.selection])[0]
             self.reconfigure_downward()
 
     def save(self):
@@ -852,7 +850,7 @@ class SelectSingleLayerNode(OneInOneOutNode):
         self.in_data = self.in_port.mother.parentItem().data
         self.state = Node.NOT_CONFIGURED
         if self.layer_selection > 0:
-            if self.layer_selection <= self.in_data.header.nb_planes + 1:
+            if self.layer_selection <= self.in_data.header.nb_planes:
                 self.state = Node.READY
         self.reconfigure_downward()
         self.update()
@@ -1297,16 +1297,13 @@ class VerticalProfilePlotViewer(TemporalPlotViewer):
             input_stream.header = self.data.header
             input_stream.time = self.data.time
 
-            point_y = np.empty((self.n, self.k))
-            point_values = np.empty((self.n, self.k))
+            # read only the vertical columns above the three nodes
+            nodes = [node + j * self.m for j in range(self.k) for node in (a, b, c)]
+            values = input_stream.read_vars_at_nodes(range(self.n), ['Z', self.current_var], nodes)
+            values = values.reshape((self.n, 2, self.k, 3))
 
-            for i in range(self.n):
-                z = input_stream.read_var_in_frame(i, 'Z').reshape((self.k, self.m))
-                values = input_stream.read_var_in_frame(i, self.current_var).reshape((self.k, self.m))
-
-                for j in range(self.k):
-                    point_y[i, j] = z[j, [a, b, c]].dot(interpolator)
-                    point_values[i, j] = values[j, [a, b, c]].dot(interpolator)
+            point_y = values[:, 0].dot(interpolator)
+            point_values = values[:, 1].dot(interpolator)
 
         y = point_y.flatten()
         z = point_values.flatten()
@@ -2059,16 +2056,13 @@ class MultiSaveVerticalProfileDialog(MultiInterpolationPlotDialog):
             input_stream.header = input_data.header
             input_stream.time = input_data.time
 
-            point_y = np.empty((n, k))
-            point_values = np.empty((n, k))
-
-            for i in range(n):
-                z = input_stream.read_var_in_frame(i, 'Z').reshape((k, m))
-                values = input_stream.read_var_in_frame(i, self.current_var).reshape((k, m))
+            # read only the vertical columns above the three nodes
+            nodes = [node + j * m for j in range(k) for node in (a, b, c)]
+            values = input_stream.read_vars_at_nodes(range(n), ['Z', self.current_var], nodes)
+            values = values.reshape((n, 2, k, 3))
 
-                for j in range(k):
-                    point_y[i, j] = z[j, [a, b, c]].dot(interpolator)
-                    point_values[i, j] = values[j, [a, b, c]].dot(interpolator)
+            point_y = values[:, 0].dot(interpolator)
+            point_values = values[:, 1].dot(interpolator)
 
         y = point_y.flatten()
         z = point_values.flatten()
@@ -2346,7 +2340,7 @@ class ScalarMapViewer(QWidget):
         else:
             self.current_var = self.data.header.var_IDs[0]
 
-        self.slider.initTime(self.data.time, list(map(lambda x: x + self.data.start_time, self.data.time_second)))
+        self.slider.initTime(self.data.time, self.data.get_dates())
         self.replot(True)
 
     def compute(self):
@@ -2455,7 +2449,7 @@ class VectorMapViewer(QWidget):
         self.mesh = input_mesh
         self.couples = couples
         self.current_couple = self.couples[0]
-        self.slider.initTime(self.data.time, list(map(lambda x: x + self.data.start_time, self.data.time_second)))
+        self.slider.initTime(self.data.time, self.data.get_dates())
         self.replot(True)
 
     def compute(self):